@@ -9,12 +9,19 @@ from urllib3.exceptions import ProtocolError
 
 # ******* Real estate API values ********************************
 CNY_COUNTY_LIST = ["Cayuga", "Cortland", "Madison", "Onondaga", "Oswego"]
+# Same counties for membership checks on every csv row, the list keeps its order for fetching by county
+CNY_COUNTY_SET = frozenset(CNY_COUNTY_LIST)
 OPEN_NY_BASE_URL = "data.ny.gov"
 MINIMUM_ASSESSMENT_YEAR = 2024
 OPEN_NY_ASSESSMENT_RATIOS_API_ID = "bsmp-6um6"
 OPEN_NY_PROPERTY_ASSESSMENTS_API_ID = "7vem-aaz7"
 OPEN_NY_LIMIT_PER_PAGE = 1000
-OPEN_NY_CALLS_PER_PERIOD = 3
+# Socrata guarantees each app token 1000 requests per rolling hour, shared by every Open NY call,
+# set OPEN_NY_CALLS_PER_HOUR to match a token granted a different quota
+OPEN_NY_CALLS_PER_HOUR = int(os.environ.get("OPEN_NY_CALLS_PER_HOUR", 1000))
+OPEN_NY_RATE_LIMIT_KEY = "open_ny_app_token"
+OPEN_NY_MAX_CONCURRENT_PAGES = 4
+OPEN_NY_PAGE_QUEUE_SIZE = 4
 ALL_PROPERTIES_STATE = "NY"
 RETRYABLE_ERRORS = (
     ConnectionError,  # Base class for connection-related errors
@@ -31,7 +38,11 @@ RETRYABLE_ERRORS = (
 # Census Bureau Batch size must be 10,000 - 1 so we send 10000
 US_CENSUS_BUREAU_BATCH_SIZE = 9999
 US_CENSUS_BUREAU_BATCH_URL = "https://geocoding.geo.census.gov/geocoder/locations/addressbatch"
-US_CENSUS_BUREAU_CALLS_PER_PERIOD = 3
+# The Census Bureau publishes no rate limit for the batch geocoder, each call geocodes a whole batch
+# and takes tens of seconds, so this only guards against runaway retries, set
+# US_CENSUS_BUREAU_CALLS_PER_MINUTE to change it
+US_CENSUS_BUREAU_CALLS_PER_MINUTE = int(os.environ.get("US_CENSUS_BUREAU_CALLS_PER_MINUTE", 10))
+US_CENSUS_BUREAU_MAX_CONCURRENT_BATCHES = 3
 
 # ******* File paths and names ***********************************
 CURRENT_FILE_PATH = os.path.abspath(__file__)
@@ -53,6 +64,13 @@ LOCAL_VERSION_PATH = os.path.join(GENERATED_DATA_DIR, "cny-real-estate-version.t
 GZIPPED_DB_NAME = f"{SQLITE_DB_NAME}.gz"
 GZIPPED_DB_LOCAL_PATH = os.path.join(GENERATED_DATA_DIR, GZIPPED_DB_NAME)
 
+# Rows per multi-row REPLACE INTO statement
+DB_INSERT_ROWS_PER_STATEMENT = 500
+# Bound parameters per statement, caps rows per statement at this divided by the column count
+DB_INSERT_MAX_BOUND_PARAMETERS = 32000
+# Chunks written between commits within insert_or_replace_into_database
+DB_INSERT_CHUNKS_PER_COMMIT = 10
+
 # ******* Table names *********************************************
 ASSESSMENT_RATIOS_TABLE = "municipality_assessment_ratios"
 NY_PROPERTY_ASSESSMENTS_TABLE = "ny_property_assessments"
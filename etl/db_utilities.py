@@ -2,12 +2,18 @@ import gzip
 import os
 import shutil
 import sqlite3
+from functools import lru_cache
+from itertools import chain
 from typing import List
+from typing import Optional
 from typing import Tuple
 
 import boto3
 
 from etl.constants import CREATE_TABLE_DEFINITIONS_FILE_PATH
+from etl.constants import DB_INSERT_CHUNKS_PER_COMMIT
+from etl.constants import DB_INSERT_MAX_BOUND_PARAMETERS
+from etl.constants import DB_INSERT_ROWS_PER_STATEMENT
 from etl.constants import DB_LOCAL_PATH
 from etl.constants import EXTRACTED_DATA_DIR
 from etl.constants import GENERATED_DATA_DIR
@@ -23,6 +29,9 @@ from etl.constants import ZIPCODE_CACHE_KEY
 from etl.constants import ZIPCODE_CACHE_LOCAL_PATH
 from etl.log_utilities import custom_logger
 
+# Database paths already switched to journal_mode=WAL, the mode is stored in the database file
+wal_enabled_db_paths = set()
+
 
 def ensure_data_directories_exist():
     """
@@ -55,9 +64,118 @@ def create_database():
         custom_logger(WARNING_LOG_LEVEL, f"Error creating the database: {str(e)}")
 
 
-def insert_or_replace_into_database(table_name: str, column_names: List[str], data: List[Tuple]) -> Tuple[int, int]:
+def apply_bulk_load_pragmas(db_connection: sqlite3.Connection):
+    """
+    Tune a connection for bulk inserts.  WAL turns each commit into an append to the
+    write-ahead log instead of a rollback journal fsync cycle.  The journal mode persists
+    in the database file so it is only set once per path, the other pragmas are per connection.
+    """
+    if DB_LOCAL_PATH not in wal_enabled_db_paths:
+        db_connection.execute("PRAGMA journal_mode=WAL")
+        wal_enabled_db_paths.add(DB_LOCAL_PATH)
+
+    db_connection.execute("PRAGMA synchronous=NORMAL")
+    db_connection.execute("PRAGMA temp_store=MEMORY")
+    db_connection.execute("PRAGMA cache_size=-65536")
+
+
+def checkpoint_database_journal():
+    """
+    Fold the write-ahead log back into the database file and switch to the default
+    rollback journal, so the database file is complete without its -wal and -shm files.
+    """
+    db_connection = sqlite3.connect(DB_LOCAL_PATH)
+
+    try:
+        db_connection.execute("PRAGMA journal_mode=DELETE")
+        wal_enabled_db_paths.discard(DB_LOCAL_PATH)
+    finally:
+        db_connection.close()
+
+
+def insert_rows_one_at_a_time(db_cursor: sqlite3.Cursor, sql_query: str, data: List[Tuple]) -> Tuple[int, int]:
+    """
+    Insert rows one at a time inside the already open transaction, wrapping each row
+    in a savepoint so a failed row is rolled back without losing the rows around it.
+
+    :param db_cursor: (sqlite3.Cursor): Cursor on a connection with an open transaction
+    :param sql_query: (str): Parameterized insert query
+    :param data: (list of tuple): List of data rows, where each row is a tuple of values
+    :return: (tuple of int): A tuple containing count of rows inserted and count of rows failed.
+    """
+    rows_inserted: int = 0
+    rows_failed: int = 0
+
+    for index, row in enumerate(data, start=1):
+        db_cursor.execute("SAVEPOINT insert_row")
+
+        try:
+            db_cursor.execute(sql_query, row)
+            rows_inserted += 1
+        except sqlite3.IntegrityError as ex:
+            db_cursor.execute("ROLLBACK TO insert_row")
+            custom_logger(
+                WARNING_LOG_LEVEL,
+                f"Row {index} failed to insert due to an integrity error: {ex}. Row data: {row}"
+            )
+            rows_failed += 1
+        except sqlite3.Error as ex:
+            db_cursor.execute("ROLLBACK TO insert_row")
+            custom_logger(
+                WARNING_LOG_LEVEL,
+                f"Row {index} failed to insert due to a general database error: {ex}. Row data: {row}"
+            )
+            rows_failed += 1
+
+        db_cursor.execute("RELEASE insert_row")
+
+    return rows_inserted, rows_failed
+
+
+def get_rows_per_statement(column_count: int) -> int:
+    """
+    Return the default rows per multi-row statement, DB_INSERT_ROWS_PER_STATEMENT capped so
+    a statement binds at most DB_INSERT_MAX_BOUND_PARAMETERS values.
+    """
+    return max(1, min(DB_INSERT_ROWS_PER_STATEMENT, DB_INSERT_MAX_BOUND_PARAMETERS // (column_count or 1)))
+
+
+def build_replace_into_query(table_name: str, column_names: Tuple[str, ...], row_count: int = 1) -> str:
+    """
+    Build the REPLACE INTO statement for a table and its columns with row_count rows in
+    its VALUES clause.
+    """
+    column_names_joined = ", ".join(column_names)
+    value_placeholders = ", ".join(["?"] * len(column_names))
+    values_rows = ", ".join([f"({value_placeholders})"] * row_count)
+
+    return f"REPLACE INTO {table_name} ({column_names_joined}) VALUES {values_rows}"
+
+
+@lru_cache(maxsize=32)
+def get_replace_into_queries(table_name: str, column_names: Tuple[str, ...]) -> Tuple[str, str]:
+    """
+    Return the one row REPLACE INTO statement for a table and its columns, and the statement for
+    a full chunk of get_rows_per_statement rows.  Cached per (table_name, column_names) so repeated
+    loads reuse them, a final partial chunk's statement is built once per load and not cached.
+    """
+    return (
+        build_replace_into_query(table_name, column_names, 1),
+        build_replace_into_query(table_name, column_names, get_rows_per_statement(len(column_names))))
+
+
+def insert_or_replace_into_database(
+        table_name: str,
+        column_names: List[str],
+        data: List[Tuple],
+        bulk_size: Optional[int] = None,
+        commit_size: int = DB_INSERT_CHUNKS_PER_COMMIT) -> Tuple[int, int]:
     """
-    Insert records into a specified SQLite database table with row-by-row error handling.
+    Insert records into a specified SQLite database table using explicit transactions.
+    Rows are sent in chunks of bulk_size, each chunk as one statement with a multi-row VALUES
+    clause so SQLite parses and steps it once, committing every commit_size chunks.
+    If any row in a chunk hits an integrity error that chunk is rolled back to its savepoint
+    and its rows are retried one at a time so the rest still insert.
     Note: uses REPLACE INTO instead of INSERT INTO to avoid duplicate key errors.  This
     will cause existing rows to be deleted and replaced with new data.
 
@@ -75,51 +193,106 @@ def insert_or_replace_into_database(table_name: str, column_names: List[str], da
     :param table_name: (str): Name of the target table
     :param column_names: (list of str): The list of columns to populate
     :param data: (list of tuple): List of data rows, where each row is a tuple of values
+    :param bulk_size: (int): Rows per statement, defaults to DB_INSERT_ROWS_PER_STATEMENT capped so the
+        chunk binds at most DB_INSERT_MAX_BOUND_PARAMETERS values
+    :param commit_size: (int): Number of chunks written between commits
     :return: (tuple of int): A tuple containing count of rows inserted and count of rows failed.
     """
-    rows_inserted: int = 0
-    rows_failed: int = 0
+    return insert_or_replace_into_database_tables([(table_name, column_names, data)], bulk_size, commit_size)[0]
 
-    try:
-        # Build the SQL query dynamically
-        column_names_joined = ", ".join(column_names)
-        value_placeholders = ", ".join(["?"] * len(column_names))
-        sql_query = f"REPLACE INTO {table_name} ({column_names_joined}) VALUES ({value_placeholders})"
 
-        # Start the database connection
-        with sqlite3.connect(DB_LOCAL_PATH) as db_connection:
+def insert_or_replace_into_database_tables(
+        tables: List[Tuple[str, List[str], List[Tuple]]],
+        bulk_size: Optional[int] = None,
+        commit_size: int = DB_INSERT_CHUNKS_PER_COMMIT) -> List[Tuple[int, int]]:
+    """
+    Insert records into several tables, in order, over one connection and transaction, so
+    related rows such as properties and their assessments are committed together with one
+    commit instead of one per table.  Chunks, commits and integrity error retries work as
+    in insert_or_replace_into_database, with commit_size counting chunks across all tables.
+
+    Example Usage:
+        insert_or_replace_into_database_tables([
+            ("properties", ["id", "swis_code"], [("ABC 123", "ABC")]),
+            ("ny_property_assessments", ["property_id", "roll_year"], [("ABC 123", 2024)]),
+        ])
+
+    :param tables: (list of tuple): (table_name, column_names, data) for each table to insert into
+    :param bulk_size: (int): Rows per statement, defaults to DB_INSERT_ROWS_PER_STATEMENT capped so the
+        chunk binds at most DB_INSERT_MAX_BOUND_PARAMETERS values
+    :param commit_size: (int): Number of chunks written between commits
+    :return: (list of tuple of int): Count of rows inserted and count of rows failed for each table.
+    """
+    rows_inserted = [0] * len(tables)
+    rows_failed = [0] * len(tables)
+    rows_committed = [0] * len(tables)
+    chunks_written = 0
+    db_connection = None
+
+    try:
+        # Start the database connection, transactions are managed explicitly below
+        with sqlite3.connect(DB_LOCAL_PATH, isolation_level=None) as db_connection:
+            apply_bulk_load_pragmas(db_connection)
             db_cursor = db_connection.cursor()
+            db_cursor.execute("BEGIN")
 
-            # Insert each row of data one at a time so if any fail the rest will still be inserted
-            for index, row in enumerate(data, start=1):
-
-                try:
-                    db_cursor.execute(sql_query, row)
-                    db_connection.commit()
-                    rows_inserted += 1
-                except sqlite3.IntegrityError as ex:
-                    custom_logger(
-                        WARNING_LOG_LEVEL,
-                        f"Row {index} failed to insert due to an integrity error: {ex}. Row data: {row}"
-                    )
-                    rows_failed += 1
-                except sqlite3.Error as ex:
-                    custom_logger(
-                        WARNING_LOG_LEVEL,
-                        f"Row {index} failed to insert due to a general database error: {ex}. Row data: {row}"
-                    )
-                    rows_failed += 1
+            for table_index, (table_name, column_names, data) in enumerate(tables):
+                column_names_key = tuple(column_names)
+                sql_query, full_chunk_query = get_replace_into_queries(table_name, column_names_key)
+                table_bulk_size = bulk_size or get_rows_per_statement(len(column_names))
 
-        custom_logger(
-            INFO_LOG_LEVEL,
-            f"rows_inserted: {rows_inserted}, rows_failed: {rows_failed}"
-        )
+                # A bulk_size other than the default builds its own full chunk statement
+                if table_bulk_size != get_rows_per_statement(len(column_names)):
+                    full_chunk_query = build_replace_into_query(table_name, column_names_key, table_bulk_size)
+
+                for chunk_start in range(0, len(data), table_bulk_size):
+                    chunk = data[chunk_start:chunk_start + table_bulk_size]
+                    db_cursor.execute("SAVEPOINT insert_chunk")
+
+                    try:
+                        chunk_query = full_chunk_query
+
+                        # Only the last chunk can be short of a full chunk
+                        if len(chunk) < table_bulk_size:
+                            chunk_query = build_replace_into_query(table_name, column_names_key, len(chunk))
+
+                        db_cursor.execute(chunk_query, list(chain.from_iterable(chunk)))
+                        rows_inserted[table_index] += len(chunk)
+                    except sqlite3.IntegrityError:
+                        # Undo only this chunk and retry it row by row so only the rows that fail are left out
+                        db_cursor.execute("ROLLBACK TO insert_chunk")
+                        chunk_inserted, chunk_failed = insert_rows_one_at_a_time(db_cursor, sql_query, chunk)
+                        rows_inserted[table_index] += chunk_inserted
+                        rows_failed[table_index] += chunk_failed
+
+                    db_cursor.execute("RELEASE insert_chunk")
+                    chunks_written += 1
+
+                    if chunks_written % commit_size == 0:
+                        db_cursor.execute("COMMIT")
+                        rows_committed = list(rows_inserted)
+                        db_cursor.execute("BEGIN")
+
+            db_cursor.execute("COMMIT")
+
+        for table_rows_inserted, table_rows_failed in zip(rows_inserted, rows_failed):
+            custom_logger(
+                INFO_LOG_LEVEL,
+                f"rows_inserted: {table_rows_inserted}, rows_failed: {table_rows_failed}"
+            )
 
     except sqlite3.Error as ex:
         custom_logger(WARNING_LOG_LEVEL, f"Unexpected database error occurred: {ex}")
-        rows_failed = len(data)
+        # Only rows from chunks committed before the error were saved
+        rows_inserted = rows_committed
+        rows_failed = [len(data) - committed for (_, _, data), committed in zip(tables, rows_committed)]
 
-    return rows_inserted, rows_failed
+    finally:
+        # Close now instead of when garbage collected, an open connection keeps the WAL in use
+        if db_connection is not None:
+            db_connection.close()
+
+    return list(zip(rows_inserted, rows_failed))
 
 
 def execute_db_query(
@@ -149,6 +322,7 @@ def execute_db_query(
     :return: List[Tuple] | None Query results or None if there's an error.
     """
     result = None
+    db_connection = None
 
     try:
         with sqlite3.connect(DB_LOCAL_PATH) as db_connection:
@@ -175,6 +349,49 @@ def execute_db_query(
             f"Query {query} failed, database error: {ex}."
         )
 
+    finally:
+        # Close now instead of when garbage collected, an open connection keeps the WAL in use
+        if db_connection is not None:
+            db_connection.close()
+
+    return result
+
+
+def execute_db_query_many(query: str, params_list: List[Tuple]) -> int | None:
+    """
+    Execute a parameterized non-SELECT query once for each set of parameters, over one
+    connection and in one transaction, instead of a connection and commit per row.
+
+    Example Usage:
+        rows_affected = execute_db_query_many(
+            "UPDATE table SET column = ? WHERE id = ?",
+            [("new_value", 1), ("other_value", 2)])
+
+    :param query: str An SQL query to execute.
+    :param params_list: List[Tuple] Parameters for each execution of the query.
+    :return: int | None Total number of rows affected or None if there's an error, nothing is committed on error.
+    """
+    result = None
+    db_connection = None
+
+    try:
+        with sqlite3.connect(DB_LOCAL_PATH) as db_connection:
+            db_cursor = db_connection.cursor()
+            db_cursor.executemany(query, params_list)
+            # Sum of rows affected by every execution
+            result = db_cursor.rowcount
+
+    except sqlite3.Error as ex:
+        custom_logger(
+            WARNING_LOG_LEVEL,
+            f"Query {query} failed, database error: {ex}."
+        )
+
+    finally:
+        # Close now instead of when garbage collected, an open connection keeps the WAL in use
+        if db_connection is not None:
+            db_connection.close()
+
     return result
 
 
@@ -289,6 +506,8 @@ def upload_database_to_s3():
         custom_logger(INFO_LOG_LEVEL, "Uploading database to S3...")
 
         try:
+            checkpoint_database_journal()
+
             # Compress database before uploading
             with open(DB_LOCAL_PATH, 'rb') as local_db:
                 with gzip.open(GZIPPED_DB_LOCAL_PATH, 'wb+') as zipped_db:
@@ -1,23 +1,55 @@
+import os
+from typing import Callable
+
 from etl.constants import *
 
 
+# GitHub Actions annotation for each log level, any other level is logged as a notice
+GITHUB_ANNOTATION_PREFIXES = {
+    ERROR_LOG_LEVEL: "::error::",
+    WARNING_LOG_LEVEL: "::warning::",
+}
+
+
+# Order of log levels, messages below LOG_LEVEL from the environment are skipped
+LOG_LEVEL_ORDER = {
+    DEBUG_LOG_LEVEL: 0,
+    INFO_LOG_LEVEL: 1,
+    WARNING_LOG_LEVEL: 2,
+    ERROR_LOG_LEVEL: 3,
+}
+minimum_log_level_order = LOG_LEVEL_ORDER.get(os.getenv("LOG_LEVEL", DEBUG_LOG_LEVEL).lower(), 0)
+
+
+def is_log_level_enabled(level: str) -> bool:
+    """Whether messages at level are logged, any other level is treated as info."""
+    return LOG_LEVEL_ORDER.get(level, LOG_LEVEL_ORDER[INFO_LOG_LEVEL]) >= minimum_log_level_order
+
+
 def custom_logger(level:str, message: str):
     """
     Enhanced print to log with GitHub Actions annotations.
     """
-    if level == ERROR_LOG_LEVEL:
-        print(f"::error::{message}")
-    elif level == WARNING_LOG_LEVEL:
-        print(f"::warning::{message}")
-    else:
-        print(f"::notice::{message}")
+    if not is_log_level_enabled(level):
+        return
+
+    print(f"{GITHUB_ANNOTATION_PREFIXES.get(level, '::notice::')}{message}")
+
+
+def custom_logger_lazy(level: str, build_message: Callable[[], str]):
+    """
+    Log like custom_logger, only building the message when level is enabled so
+    callers skip formatting messages that would not be logged.
+    """
+    if is_log_level_enabled(level):
+        custom_logger(level, build_message())
 
 
 def log_retry(details):
-    """Callback function for backoff to log retry attempts"""
-    custom_logger(
+    """Callback function for backoff to log retry attempts, only formatted when info messages are logged"""
+    custom_logger_lazy(
         INFO_LOG_LEVEL,
-        "Backing off {wait:0.1f} seconds after {tries} tries "
-        "calling function {target} with args {args} and kwargs "
-        "{kwargs}".format(**details)
+        lambda: "Backing off {wait:0.1f} seconds after {tries} tries "
+                "calling function {target} with args {args} and kwargs "
+                "{kwargs}".format(**details)
     )
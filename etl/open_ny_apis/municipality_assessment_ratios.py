@@ -1,5 +1,7 @@
-import json
+from contextlib import nullcontext
+from operator import itemgetter
 from typing import List
+from typing import Optional
 
 from backoff import expo
 from backoff import on_exception
@@ -11,14 +13,15 @@ from etl.constants import CNY_COUNTY_LIST
 from etl.constants import INFO_LOG_LEVEL
 from etl.constants import OPEN_NY_ASSESSMENT_RATIOS_API_ID
 from etl.constants import OPEN_NY_BASE_URL
-from etl.constants import OPEN_NY_CALLS_PER_PERIOD
+from etl.constants import OPEN_NY_CALLS_PER_HOUR
+from etl.constants import OPEN_NY_RATE_LIMIT_KEY
 from etl.constants import RETRYABLE_ERRORS
 from etl.constants import WARNING_LOG_LEVEL
 from etl.db_utilities import execute_db_query
 from etl.db_utilities import insert_or_replace_into_database
 from etl.log_utilities import custom_logger
 from etl.log_utilities import log_retry
-from etl.rate_limits import rate_per_minute
+from etl.rate_limits import rate_per_hour
 from etl.validation_models import MunicipalityAssessmentRatio
 
 
@@ -31,7 +34,8 @@ def check_if_county_assessment_ratio_exists(rate_year: int, county_name: str) ->
         INFO_LOG_LEVEL,
         f"Checking if assessment ratios for rate_year: {rate_year} and county_name: {county_name} exist in database...")
     do_county_ratios_for_year_exist = False
-    sql_query = f"SELECT * FROM {ASSESSMENT_RATIOS_TABLE} WHERE rate_year=? AND county_name=?"
+    # Only whether a row exists matters, stop at the first match instead of fetching every ratio
+    sql_query = f"SELECT 1 FROM {ASSESSMENT_RATIOS_TABLE} WHERE rate_year=? AND county_name=? LIMIT 1"
     results = execute_db_query(sql_query, params=(rate_year, county_name), fetch_results=True)
 
     if results:
@@ -47,17 +51,28 @@ def check_if_county_assessment_ratio_exists(rate_year: int, county_name: str) ->
     max_tries=3,
     on_backoff=log_retry
 )
-@rate_per_minute(calls_per_minute=OPEN_NY_CALLS_PER_PERIOD)
-def fetch_county_assessment_ratios(app_token: str, rate_year: int, county_name: str) -> List[dict] or None:
-    """Call Open NY APIs to fetch municipality assessment ratios for a given county and year using rate limiting."""
+@rate_per_hour(calls_per_hour=OPEN_NY_CALLS_PER_HOUR, key_name=OPEN_NY_RATE_LIMIT_KEY)
+def fetch_county_assessment_ratios(
+        app_token: str,
+        rate_year: int,
+        county_name: str,
+        client: Optional[Socrata] = None) -> List[dict] or None:
+    """
+    Call Open NY APIs to fetch municipality assessment ratios for a given county and year using rate limiting.
+    Uses client when given, otherwise a client is created and closed for this call only.
+    """
     assessment_ratios = None
     custom_logger(
         INFO_LOG_LEVEL,
         f"Fetching municipality assessment ratios for rate_year: {rate_year} and county_name: {county_name}")
 
     try:
-        with Socrata(OPEN_NY_BASE_URL, app_token=app_token, timeout=60) as client:
-            assessment_ratios = client.get(
+        # A given client is left open for the caller to reuse
+        client_context = nullcontext(client) if client is not None else Socrata(
+            OPEN_NY_BASE_URL, app_token=app_token, timeout=60)
+
+        with client_context as socrata_client:
+            assessment_ratios = socrata_client.get(
                 OPEN_NY_ASSESSMENT_RATIOS_API_ID,
                 rate_year=rate_year,
                 county_name=county_name
@@ -81,27 +96,31 @@ def fetch_municipality_assessment_ratios(app_token: str, query_year: int) -> Lis
     in the CNY_COUNTY_LIST.  Will get assessment ratios for all years from
     2009 to present, where data is available.  If the data is already in the
     database will skip it as this data does not change over time.
+    One client is shared by every county so its connection is kept alive between calls.
     """
     assessment_ratios = []
     custom_logger(INFO_LOG_LEVEL, f"Starting fetching municipality assessment ratios for {query_year}...")
 
-    for county in CNY_COUNTY_LIST:
+    with Socrata(OPEN_NY_BASE_URL, app_token=app_token, timeout=60) as client:
 
-        # Check if it exists before we call our rate limited function to speed up processing when we have the data
-        already_exists = check_if_county_assessment_ratio_exists(query_year, county)
+        for county in CNY_COUNTY_LIST:
 
-        if already_exists:
-            custom_logger(
-                INFO_LOG_LEVEL,
-                f"Found municipality assessment ratios for rate_year: {query_year} and county_name: {county}, skipping.")
-        else:
-            ratio_results = fetch_county_assessment_ratios(
-                app_token=app_token,
-                rate_year=query_year,
-                county_name=county)
+            # Check if it exists before we call our rate limited function to speed up processing when we have the data
+            already_exists = check_if_county_assessment_ratio_exists(query_year, county)
 
-            if ratio_results and isinstance(ratio_results, list):
-                assessment_ratios.extend(ratio_results)
+            if already_exists:
+                custom_logger(
+                    INFO_LOG_LEVEL,
+                    f"Found municipality assessment ratios for rate_year: {query_year} and county_name: {county}, skipping.")
+            else:
+                ratio_results = fetch_county_assessment_ratios(
+                    app_token=app_token,
+                    rate_year=query_year,
+                    county_name=county,
+                    client=client)
+
+                if ratio_results and isinstance(ratio_results, list):
+                    assessment_ratios.extend(ratio_results)
 
     custom_logger(INFO_LOG_LEVEL, f"Completed fetching municipality assessment ratios, {len(assessment_ratios)} found.")
 
@@ -110,8 +129,7 @@ def fetch_municipality_assessment_ratios(app_token: str, query_year: int) -> Lis
 
 def save_municipality_assessment_ratios(all_ratios: List[dict]):
     """Validate the municipality_assessment_ratios data and save valid data to database."""
-    validated_ratio_data = []
-    column_names = None
+    validated_ratio_rows = []
 
     for municipality_assessment_ratio in all_ratios:
         try:
@@ -125,13 +143,12 @@ def save_municipality_assessment_ratios(all_ratios: List[dict]):
                     WARNING_LOG_LEVEL,
                     f"Error in field {error["loc"][0]}. Message: {error["msg"]}")
         else:
-            ratio_data = json.loads(model.model_dump_json(by_alias=True))
-            validated_ratio_data.append(tuple(ratio_data.values()))
-
-            if not column_names:
-                column_names = list(ratio_data.keys())
+            validated_ratio_rows.append(model.model_dump(by_alias=True))
 
-    if validated_ratio_data:
+    if validated_ratio_rows:
+        # Every row has the same keys, pull their values out in column order with one itemgetter
+        column_names = list(validated_ratio_rows[0])
+        validated_ratio_data = list(map(itemgetter(*column_names), validated_ratio_rows))
         rows_inserted, rows_failed = insert_or_replace_into_database(ASSESSMENT_RATIOS_TABLE, column_names, validated_ratio_data)
         custom_logger(
             INFO_LOG_LEVEL,
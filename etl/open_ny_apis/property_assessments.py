@@ -1,10 +1,20 @@
+import math
 import os
-from pprint import pprint
+import queue
+import threading
+from collections import Counter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Callable
+from typing import Iterator
 from typing import List
 from typing import Optional
 
 from backoff import expo
 from backoff import on_exception
+from pydantic import TypeAdapter
 from pydantic import ValidationError
 from sodapy import Socrata
 
@@ -12,45 +22,68 @@ from etl.constants import CNY_COUNTY_LIST
 from etl.constants import INFO_LOG_LEVEL
 from etl.constants import NY_PROPERTY_ASSESSMENTS_TABLE
 from etl.constants import OPEN_NY_BASE_URL
-from etl.constants import OPEN_NY_CALLS_PER_PERIOD
+from etl.constants import OPEN_NY_CALLS_PER_HOUR
 from etl.constants import OPEN_NY_LIMIT_PER_PAGE
+from etl.constants import OPEN_NY_MAX_CONCURRENT_PAGES
+from etl.constants import OPEN_NY_PAGE_QUEUE_SIZE
 from etl.constants import OPEN_NY_PROPERTY_ASSESSMENTS_API_ID
+from etl.constants import OPEN_NY_RATE_LIMIT_KEY
 from etl.constants import PROPERTIES_TABLE
 from etl.constants import RETRYABLE_ERRORS
 from etl.constants import WARNING_LOG_LEVEL
 from etl.db_utilities import execute_db_query
-from etl.db_utilities import insert_or_replace_into_database
+from etl.db_utilities import insert_or_replace_into_database_tables
 from etl.log_utilities import custom_logger
 from etl.log_utilities import log_retry
 from etl.property_utilities import get_ny_property_classes_for_where_clause
-from etl.rate_limits import rate_per_minute
+from etl.rate_limits import rate_per_hour
 from etl.validation_models import NYPropertyAssessment
 
+# Validates a whole page of property assessments in a single call into pydantic-core
+property_assessments_adapter = TypeAdapter(List[NYPropertyAssessment])
 
+# Query parameters shared by every page request, only the county, roll year and offset change per page
+property_assessments_page_params = {
+    "roll_section": 1,
+    "limit": OPEN_NY_LIMIT_PER_PAGE,
+    "order": "swis_code,print_key_code ASC",
+}
+
+
+@lru_cache(maxsize=256)
 def check_if_property_assessments_exist(roll_year: int, county_name: str) -> bool:
     """
     Property assessments are only published once per year for each roll year.
     Use this to check if we already have the data and save a great many calls to the API.
+    Results are cached per (roll_year, county_name), saving new assessments clears the cache.
     """
     do_property_assessments_for_year_exist = False
     custom_logger(
         INFO_LOG_LEVEL,
         f"Checking if property assessments for roll_year: {roll_year} and county_name: {county_name} exist in database...")
-    sql_query = f"""SELECT COUNT(*) 
-                    FROM {NY_PROPERTY_ASSESSMENTS_TABLE} AS npa
-                    JOIN {PROPERTIES_TABLE} AS p ON npa.property_id = p.id
-                    WHERE npa.roll_year = ? AND p.county_name = ?"""
+    # EXISTS stops at the first matching row rather than counting every assessment for the county
+    sql_query = f"""SELECT EXISTS(
+                        SELECT 1
+                        FROM {NY_PROPERTY_ASSESSMENTS_TABLE} AS npa
+                        JOIN {PROPERTIES_TABLE} AS p ON npa.property_id = p.id
+                        WHERE npa.roll_year = ? AND p.county_name = ?
+                        LIMIT 1)"""
     results = execute_db_query(sql_query, params=(roll_year, county_name), fetch_results=True)
 
     if results and isinstance(results[0], tuple) and len(results[0]) == 1:
-        count = results[0][0]
-
-        if count > 0:
-            do_property_assessments_for_year_exist = True
+        do_property_assessments_for_year_exist = bool(results[0][0])
 
     return do_property_assessments_for_year_exist
 
 
+def get_open_ny_socrata_client(app_token: str) -> Socrata:
+    """
+    Create a Socrata client for Open NY.  Reuse one client across a thread's page requests so
+    its requests session keeps connections alive instead of a new TLS handshake per page.
+    """
+    return Socrata(OPEN_NY_BASE_URL, app_token=app_token, timeout=60)
+
+
 @on_exception(
     expo,
     RETRYABLE_ERRORS,
@@ -58,14 +91,20 @@ def check_if_property_assessments_exist(roll_year: int, county_name: str) -> boo
     max_tries=3,
     on_backoff=log_retry
 )
-@rate_per_minute(calls_per_minute=OPEN_NY_CALLS_PER_PERIOD)
+@rate_per_hour(calls_per_hour=OPEN_NY_CALLS_PER_HOUR, key_name=OPEN_NY_RATE_LIMIT_KEY)
 def fetch_property_assessments_page(
         app_token: str,
         roll_year: int,
         county_name: str,
         where_clause: str,
-        offset: int) -> Optional[List[dict]]:
+        offset: int,
+        client: Optional[Socrata] = None) -> Optional[List[dict]]:
+    """
+    Fetch one page of property assessments, using client when given, otherwise a
+    client is created and closed for this page only.
+    """
     result = None
+    owns_client = client is None
 
     try:
         custom_logger(
@@ -73,17 +112,17 @@ def fetch_property_assessments_page(
             f"Fetching property assessments for county_name: {county_name} starting at offset {offset}..."
         )
 
-        with Socrata(OPEN_NY_BASE_URL, app_token=app_token, timeout=60) as client:
-            result = client.get(
-                OPEN_NY_PROPERTY_ASSESSMENTS_API_ID,
-                roll_year=roll_year,
-                county_name=county_name,
-                roll_section=1,
-                limit=OPEN_NY_LIMIT_PER_PAGE,
-                offset=offset,
-                order="swis_code,print_key_code ASC",
-                where=where_clause
-            )
+        if owns_client:
+            client = get_open_ny_socrata_client(app_token)
+
+        result = client.get(
+            OPEN_NY_PROPERTY_ASSESSMENTS_API_ID,
+            roll_year=roll_year,
+            county_name=county_name,
+            offset=offset,
+            where=where_clause,
+            **property_assessments_page_params
+        )
 
     except RETRYABLE_ERRORS:
         # Let these propagate to be handled by the @on_exception decorator
@@ -95,69 +134,165 @@ def fetch_property_assessments_page(
             f"Failed fetching property assessments for county_name: {county_name} at offset {offset}. Error: {err}"
         )
 
+    finally:
+        if owns_client and client is not None:
+            client.close()
+
     return result
 
 
-def save_properties_and_assessments(all_properties: List[dict]) -> int:
+@on_exception(
+    expo,
+    RETRYABLE_ERRORS,
+    factor=20,
+    max_tries=3,
+    on_backoff=log_retry
+)
+@rate_per_hour(calls_per_hour=OPEN_NY_CALLS_PER_HOUR, key_name=OPEN_NY_RATE_LIMIT_KEY)
+def fetch_property_assessments_count(
+        client: Socrata,
+        roll_year: int,
+        county_name: str,
+        where_clause: str) -> Optional[int]:
     """
-    Validate properties data and saves valid data to related
-    database tables properties and ny_property_assessments.
+    Ask Open NY how many property assessments match for a county so every page
+    offset is known up front.  Return None if the count could not be fetched.
     """
-    total_properties_inserted = 0
-    validated_properties_data = []
-    validated_ny_property_assessment_data = []
-    properties_column_names = None
-    ny_property_assessment_column_names = None
+    total_count = None
 
-    for property_assessment in all_properties:
+    try:
+        result = client.get(
+            OPEN_NY_PROPERTY_ASSESSMENTS_API_ID,
+            select="count(*)",
+            roll_year=roll_year,
+            county_name=county_name,
+            roll_section=1,
+            where=where_clause
+        )
 
-        try:
-            model = NYPropertyAssessment(**property_assessment)
-        except ValidationError as err:
+        # Response is a single row with a single count column, e.g. [{"count": "2500"}]
+        if result and isinstance(result, list) and isinstance(result[0], dict) and result[0]:
+            total_count = int(next(iter(result[0].values())))
+
+    except RETRYABLE_ERRORS:
+        # Let these propagate to be handled by the @on_exception decorator
+        raise
+
+    except Exception as err:
+        custom_logger(
+            WARNING_LOG_LEVEL,
+            f"Failed fetching property assessments count for county_name: {county_name}. Error: {err}"
+        )
+
+    return total_count
+
+
+def validate_property_assessments(all_properties: List[dict]) -> List[NYPropertyAssessment]:
+    """
+    Validate a page of property assessments as one batch.  When some rows are invalid,
+    drop the rows the errors point at and validate the remaining rows as one more batch,
+    logging a summary of the errors instead of validating invalid rows again one at a time.
+    """
+    validated_models = []
+
+    try:
+        validated_models = property_assessments_adapter.validate_python(all_properties)
+    except ValidationError as err:
+        errors = err.errors()
+        invalid_indexes = {error["loc"][0] for error in errors}
+        valid_properties = [
+            property_assessment for index, property_assessment in enumerate(all_properties)
+            if index not in invalid_indexes]
+
+        if valid_properties:
+            validated_models = property_assessments_adapter.validate_python(valid_properties)
+
+        custom_logger(
+            WARNING_LOG_LEVEL,
+            f"Failed to validate {len(invalid_indexes)} of {len(all_properties)} property assessments:")
+
+        # Batch error locations are (row index, field, ...), count each field and message once per page
+        error_counts = Counter((error["loc"][1] if len(error["loc"]) > 1 else error["loc"][0], error["msg"])
+                               for error in errors)
+
+        for (field, message), count in error_counts.items():
             custom_logger(
                 WARNING_LOG_LEVEL,
-                f"Failed to validate property assessment:")
-            pprint(property_assessment)
+                f"- Error: Field: {field}. Message: {message}. Rows: {count}")
 
-            for error in err.errors():
-                custom_logger(
-                    WARNING_LOG_LEVEL,
-                    f"- Error: Field: {error["loc"][0]}. Message: {error["msg"]}")
-        else:
-            # Get data for saving to properties table
-            property_data = model.to_properties_row()
-            validated_properties_data.append(tuple(property_data.values()))
+    return validated_models
 
-            if not properties_column_names:
-                properties_column_names = list(property_data.keys())
 
-            # Get data for saving to ny_property_assessments table
-            ny_property_assessment_data = model.to_ny_property_assessments_row()
-            validated_ny_property_assessment_data.append(tuple(ny_property_assessment_data.values()))
+def deduplicate_property_assessments(all_properties: List[dict]) -> List[dict]:
+    """
+    Drop repeated parcels, which can show up when results shift between page requests,
+    so they are not validated and written twice.  A parcel is identified by swis_code and
+    print_key_code, the same pair the properties id is built from.  Rows missing either are
+    kept so validation reports them.
+    """
+    seen_parcels = set()
+    unique_properties = []
+
+    for property_assessment in all_properties:
+        swis_code = property_assessment.get("swis_code")
+        print_key_code = property_assessment.get("print_key_code")
 
-            if not ny_property_assessment_column_names:
-                ny_property_assessment_column_names = list(ny_property_assessment_data.keys())
+        if swis_code and print_key_code:
+            parcel = (swis_code, print_key_code)
 
-    # Insert into two related tables
-    if validated_properties_data and validated_ny_property_assessment_data:
-        # Save to properties table
-        rows_inserted, rows_failed = insert_or_replace_into_database(
-            PROPERTIES_TABLE,
-            properties_column_names,
-            validated_properties_data)
-        total_properties_inserted += rows_inserted
+            if parcel in seen_parcels:
+                continue
+
+            seen_parcels.add(parcel)
+
+        unique_properties.append(property_assessment)
+
+    num_duplicates = len(all_properties) - len(unique_properties)
+
+    if num_duplicates:
+        custom_logger(INFO_LOG_LEVEL, f"Deduplicated {num_duplicates} rows before validation.")
+
+    return unique_properties
+
+
+def save_properties_and_assessments(all_properties: List[dict]) -> int:
+    """
+    Validate properties data and saves valid data to related
+    database tables properties and ny_property_assessments.
+    """
+    total_properties_inserted = 0
+
+    if not all_properties:
         custom_logger(
             INFO_LOG_LEVEL,
-            f"Completed saving {len(validated_properties_data)} valid properties rows_inserted: {rows_inserted}, rows_failed: {rows_failed}.")
+            "No valid properties found, skipping saving to database.")
+        return total_properties_inserted
+
+    validated_models = validate_property_assessments(deduplicate_property_assessments(all_properties))
 
-        # Save to ny_property_assessments for related properties
-        rows_inserted, rows_failed = insert_or_replace_into_database(
-            NY_PROPERTY_ASSESSMENTS_TABLE,
-            ny_property_assessment_column_names,
-            validated_ny_property_assessment_data)
+    # Build insert rows straight from the models, sharing one column list per table
+    properties_column_names = list(NYPropertyAssessment.PROPERTIES_COLUMNS)
+    validated_properties_data = [model.to_properties_tuple() for model in validated_models]
+    ny_property_assessment_column_names = list(NYPropertyAssessment.NY_PROPERTY_ASSESSMENTS_COLUMNS)
+    validated_ny_property_assessment_data = [model.to_ny_property_assessments_tuple() for model in validated_models]
+
+    # Insert into two related tables in one transaction, so a database error saves neither
+    if validated_properties_data and validated_ny_property_assessment_data:
+        (properties_inserted, properties_failed), (assessments_inserted, assessments_failed) = \
+            insert_or_replace_into_database_tables([
+                (PROPERTIES_TABLE, properties_column_names, validated_properties_data),
+                (NY_PROPERTY_ASSESSMENTS_TABLE, ny_property_assessment_column_names, validated_ny_property_assessment_data),
+            ])
+        total_properties_inserted += properties_inserted
         custom_logger(
             INFO_LOG_LEVEL,
-            f"Completed saving {len(validated_ny_property_assessment_data)} valid ny_property_assessment_data rows_inserted: {rows_inserted}, rows_failed: {rows_failed}.")
+            f"Completed saving {len(validated_properties_data)} valid properties rows_inserted: {properties_inserted}, rows_failed: {properties_failed}.")
+        custom_logger(
+            INFO_LOG_LEVEL,
+            f"Completed saving {len(validated_ny_property_assessment_data)} valid ny_property_assessment_data rows_inserted: {assessments_inserted}, rows_failed: {assessments_failed}.")
+
+        if assessments_inserted:
+            check_if_property_assessments_exist.cache_clear()
 
     else:
         custom_logger(
@@ -167,13 +302,166 @@ def save_properties_and_assessments(all_properties: List[dict]) -> int:
     return total_properties_inserted
 
 
+@lru_cache(maxsize=4)
+def build_property_assessments_where_clause(property_class_clause: str) -> str:
+    """
+    Initial results were getting back too many properties of not relevant types, limit results with a WHERE.
+    Cached so every page request for a run sends the identical SoQL where string.
+    """
+    where_clause = "roll_section = 1"
+
+    if property_class_clause:
+        where_clause = f"{where_clause} AND {property_class_clause}"
+
+    return where_clause
+
+
+def iter_county_property_assessment_pages(
+        executor: ThreadPoolExecutor,
+        get_client: Callable[[], Socrata],
+        app_token: str,
+        roll_year: int,
+        county_name: str,
+        where_clause: str) -> Iterator[List[dict]]:
+    """
+    Yield each page of property assessments for a county in offset order.
+    When the county's total count is known, keep a window of concurrent page requests over its
+    offsets on the executor and stop at the first failed page.  Otherwise fetch the first page
+    alone, only fanning out to a window of concurrent page requests once it comes back full,
+    and stop at the first short, empty or failed page.
+    Each request uses the client get_client returns for the thread it runs on.
+    """
+    def fetch_county_page(offset: int) -> Optional[List[dict]]:
+        return fetch_property_assessments_page(
+            app_token=app_token,
+            roll_year=roll_year,
+            county_name=county_name,
+            where_clause=where_clause,
+            offset=offset,
+            client=get_client()
+        )
+
+    total_count = fetch_property_assessments_count(get_client(), roll_year, county_name, where_clause)
+
+    if total_count is not None:
+        custom_logger(
+            INFO_LOG_LEVEL,
+            f"Found {total_count} property assessments for county_name: {county_name}, "
+            f"fetching {math.ceil(total_count / OPEN_NY_LIMIT_PER_PAGE)} pages.")
+
+        # Sliding window of page requests over the known offsets, the oldest is yielded first and
+        # the next offset submitted after it so at most OPEN_NY_MAX_CONCURRENT_PAGES are in flight
+        # however slowly pages are consumed
+        page_offsets = iter(range(0, total_count, OPEN_NY_LIMIT_PER_PAGE))
+        pending_pages = deque(
+            executor.submit(fetch_county_page, offset)
+            for offset in islice(page_offsets, OPEN_NY_MAX_CONCURRENT_PAGES))
+        page_number = 0
+
+        try:
+            while pending_pages:
+                property_results = pending_pages.popleft().result()
+                page_number += 1
+
+                if not property_results or not isinstance(property_results, list):
+                    custom_logger(
+                        WARNING_LOG_LEVEL,
+                        f"Failed fetching page {page_number} of property assessments for "
+                        f"county_name: {county_name}, ending county early.")
+                    break
+
+                yield property_results
+
+                next_offset = next(page_offsets, None)
+
+                if next_offset is not None:
+                    pending_pages.append(executor.submit(fetch_county_page, next_offset))
+
+        finally:
+            # Pages past a failed page are not needed
+            for pending_page in pending_pages:
+                pending_page.cancel()
+
+    else:
+        # Sliding window of page requests, the oldest is yielded first and each full page
+        # submits the next offset so OPEN_NY_MAX_CONCURRENT_PAGES stay in flight
+        pending_pages = deque([executor.submit(fetch_county_page, 0)])
+        next_offset = OPEN_NY_LIMIT_PER_PAGE
+
+        try:
+            while pending_pages:
+                property_results = pending_pages.popleft().result()
+
+                if property_results and isinstance(property_results, list):
+                    yield property_results
+
+                if not property_results or len(property_results) < OPEN_NY_LIMIT_PER_PAGE:
+                    break
+
+                while len(pending_pages) < OPEN_NY_MAX_CONCURRENT_PAGES:
+                    pending_pages.append(executor.submit(fetch_county_page, next_offset))
+                    next_offset += OPEN_NY_LIMIT_PER_PAGE
+
+        finally:
+            # Pages past a short, empty or failed page are not needed
+            for pending_page in pending_pages:
+                pending_page.cancel()
+
+    custom_logger(
+        INFO_LOG_LEVEL,
+        f"No more property assessments for county_name: {county_name}, ending.")
+
+
+def put_page_unless_stopped(page_queue: queue.Queue, page: Optional[List[dict]], stop_fetching: threading.Event) -> bool:
+    """
+    Put a page on the bounded queue, waiting while it is full unless the consumer has stopped.
+    Return whether the page was queued.
+    """
+    queued = False
+
+    while not queued and not stop_fetching.is_set():
+        try:
+            page_queue.put(page, timeout=1)
+            queued = True
+        except queue.Full:
+            pass
+
+    return queued
+
+
+def produce_property_assessment_pages(
+        page_queue: queue.Queue,
+        stop_fetching: threading.Event,
+        executor: ThreadPoolExecutor,
+        get_client: Callable[[], Socrata],
+        app_token: str,
+        roll_year: int,
+        counties: List[str],
+        where_clause: str):
+    """
+    Queue every page of property assessments for each county, then None once there are no more.
+    Stop early if the consumer sets stop_fetching.
+    """
+    try:
+        for county in counties:
+            for property_results in iter_county_property_assessment_pages(
+                    executor, get_client, app_token, roll_year, county, where_clause):
+
+                if not put_page_unless_stopped(page_queue, property_results, stop_fetching):
+                    return
+
+    finally:
+        put_page_unless_stopped(page_queue, None, stop_fetching)
+
+
 def fetch_property_assessments(app_token: str, query_year: int) -> int:
     """
     Query Open NY APIs for property assessments for a given year for all counties
     in the CNY_COUNTY_LIST.  Only get properties with roll_section=1, meaning they are
     ordinary taxable property with a property class designated to be in the where clause.
     To save memory save each page of results to the database as it is fetched rather
-    than holding in memory.  Return number of properties saved to database.
+    than holding in memory, fetching carries on in the background while pages are saved.
+    Return number of properties saved to database.
     """
     num_properties_saved = 0
     num_properties_found = 0
@@ -186,15 +474,11 @@ def fetch_property_assessments(app_token: str, query_year: int) -> int:
         + (f" Forcing refresh of all assessments." if force_refresh else "")
     )
 
-    # Initial results were getting back too many properties of not relevant types, limit results with a WHERE
-    where_clause = "roll_section = 1"
-    property_class_clause = get_ny_property_classes_for_where_clause()
-
-    if property_class_clause:
-        where_clause = f"{where_clause} AND {property_class_clause}"
-
+    where_clause = build_property_assessments_where_clause(get_ny_property_classes_for_where_clause())
     custom_logger(INFO_LOG_LEVEL, f"\nwhere_clause built: {where_clause}\n")
 
+    counties_to_fetch = []
+
     for county in CNY_COUNTY_LIST:
 
         # First see if we already have data for this county and roll year as it is only published once a year
@@ -206,29 +490,48 @@ def fetch_property_assessments(app_token: str, query_year: int) -> int:
                 f"Property assessments for county_name: {county} in roll year {query_year} already exist, ending.")
             continue
 
-        else:
-            call_again = True
-            current_offset = 0
+        counties_to_fetch.append(county)
 
-            while call_again:
+    page_queue = queue.Queue(maxsize=OPEN_NY_PAGE_QUEUE_SIZE)
+    stop_fetching = threading.Event()
 
-                property_results = fetch_property_assessments_page(
-                    app_token=app_token,
-                    roll_year=query_year,
-                    county_name=county,
-                    where_clause=where_clause,
-                    offset=current_offset
-                )
+    # A Socrata client wraps one requests session, which is not documented as thread-safe, so each
+    # thread opens its own client and reuses its connections for every request that thread makes
+    thread_state = threading.local()
+    socrata_clients = []
 
-                if property_results and isinstance(property_results, list):
+    def get_thread_client() -> Socrata:
+        if not hasattr(thread_state, "client"):
+            thread_state.client = get_open_ny_socrata_client(app_token)
+            socrata_clients.append(thread_state.client)
+
+        return thread_state.client
+
+    try:
+        with (ThreadPoolExecutor(max_workers=OPEN_NY_MAX_CONCURRENT_PAGES) as executor,
+              ThreadPoolExecutor(max_workers=1) as producer_executor):
+
+            # Pages are fetched on a producer thread while this thread saves them, the bounded
+            # queue keeps at most OPEN_NY_PAGE_QUEUE_SIZE pages waiting in memory
+            producer = producer_executor.submit(
+                produce_property_assessment_pages,
+                page_queue, stop_fetching, executor, get_thread_client, app_token, query_year, counties_to_fetch,
+                where_clause)
+
+            try:
+                while (property_results := page_queue.get()) is not None:
                     num_properties_found += len(property_results)
                     num_properties_saved += save_properties_and_assessments(property_results)
-                    current_offset += OPEN_NY_LIMIT_PER_PAGE
-                else:
-                    call_again = False
-                    custom_logger(
-                        INFO_LOG_LEVEL,
-                        f"No more property assessments for county_name: {county}, ending.")
+            finally:
+                stop_fetching.set()
+
+            # Raise any error from fetching pages
+            producer.result()
+
+    finally:
+
+        for socrata_client in socrata_clients:
+            socrata_client.close()
 
     custom_logger(
         INFO_LOG_LEVEL,
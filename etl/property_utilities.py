@@ -1,5 +1,7 @@
 import os
 from datetime import datetime
+from functools import lru_cache
+from typing import Dict
 
 from etl.constants import DESIRED_PROPERTY_CATEGORIES
 from etl.constants import MINIMUM_ASSESSMENT_YEAR
@@ -33,27 +35,42 @@ def get_assessment_year_to_query():
     return rate_year
 
 
+@lru_cache(maxsize=1)
+def get_ny_property_class_index() -> Dict[int, dict]:
+    """
+    Index OPEN_NY_PROPERTY_CLASS_MAP by property_class so each lookup is a single dict get
+    instead of a scan of the whole map.  The first entry for a property_class wins, as it did
+    when scanning.  The property class map is static, so the index is cached for the life of the process.
+    """
+    property_class_index = {}
+
+    for item in OPEN_NY_PROPERTY_CLASS_MAP:
+        property_class_index.setdefault(item.get("property_class"), item)
+
+    return property_class_index
+
+
 def get_ny_property_category_for_property_class(property_class: int):
     """
     Look up property category for matching property_class in OPEN_NY_PROPERTY_CLASS_MAP.
     """
     return_property_category = OPC_DESCRIPTION
+    item = get_ny_property_class_index().get(property_class)
 
-    for item in OPEN_NY_PROPERTY_CLASS_MAP:
-
-        if item.get("property_class") == property_class:
-            property_category = item.get("property_category", OTHER_PROPERTY_CATEGORY)
-            return_property_category = PROPERTY_CATEGORY_DESCRIPTIONS.get(property_category, OPC_DESCRIPTION)
-            break
+    if item is not None:
+        property_category = item.get("property_category", OTHER_PROPERTY_CATEGORY)
+        return_property_category = PROPERTY_CATEGORY_DESCRIPTIONS.get(property_category, OPC_DESCRIPTION)
 
     return return_property_category
 
 
+@lru_cache(maxsize=1)
 def get_ny_property_classes_for_where_clause() -> str:
     """
     Create a string of property_class values to use in a WHERE clause when calling
     Open NY property assessment API.  Include all property classes with a
     property_category value in DESIRED_PROPERTY_CATEGORIES, comma separated and in quotes.
+    The property class map is static, so the result is cached for the life of the process.
     Example Return:
         'property_class IN (\"190\", \"200\", \"210\"...)'
     """
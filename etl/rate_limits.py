@@ -1,7 +1,11 @@
+from limits import RateLimitItem
+from limits import RateLimitItemPerHour
 from limits import RateLimitItemPerMinute
 from limits.storage import MemoryStorage
 from functools import wraps
+import math
 import time
+from typing import Optional
 
 from etl.constants import WARNING_LOG_LEVEL
 from etl.log_utilities import custom_logger
@@ -10,27 +14,31 @@ from etl.log_utilities import custom_logger
 storage_backend = MemoryStorage()
 
 
-def rate_per_minute(calls_per_minute):
-    """Decorator to enforce rate limits on API calls."""
-    limit = RateLimitItemPerMinute(calls_per_minute)
+def rate_limited(limit: RateLimitItem, key_name: Optional[str] = None):
+    """
+    Decorator to enforce a rate limit on API calls.  Functions passing the same key_name
+    share one limit, such as every call made with the same app token, otherwise each
+    function is limited on its own.
+    """
 
     def decorator(func):
 
         @wraps(func)
         def wrapper(*args, **kwargs):
 
-            # Use unique key, based on function name
-            key = f"rate_limiter:{func.__name__}"
+            # Use unique key, based on key name if shared else function name
+            key = f"rate_limiter:{key_name or func.__name__}"
 
             try:
 
-                # Increment rate limit
-                if not storage_backend.incr(key=key, expiry=limit.get_expiry(), elastic_expiry=False):
+                # Increment rate limit, incr returns the number of calls made in the current window
+                while storage_backend.incr(key=key, expiry=limit.get_expiry(), elastic_expiry=False) > limit.amount:
 
-                    # Exceeded rate limit, calculate remaining time
-                    time_to_reset = max(0, int(storage_backend.get_expiry(key) - time.time()))
+                    # Exceeded rate limit, calculate remaining time, rounding up so we never wake early
+                    time_to_reset = max(1, math.ceil(storage_backend.get_expiry(key) - time.time()))
 
-                    # Instead of raising an exception, wait for limit to reset
+                    # Instead of raising an exception, wait for limit to reset then try for a slot again,
+                    # the storage backend locks per key so threads sharing this limit can not overrun it
                     custom_logger(WARNING_LOG_LEVEL, f"Rate limit exceeded. Waiting {time_to_reset} seconds.")
                     time.sleep(time_to_reset)
 
@@ -44,3 +52,13 @@ def rate_per_minute(calls_per_minute):
         return wrapper
 
     return decorator
+
+
+def rate_per_minute(calls_per_minute, key_name: Optional[str] = None):
+    """Decorator to enforce a per minute rate limit on API calls."""
+    return rate_limited(RateLimitItemPerMinute(calls_per_minute), key_name)
+
+
+def rate_per_hour(calls_per_hour, key_name: Optional[str] = None):
+    """Decorator to enforce a per hour rate limit on API calls."""
+    return rate_limited(RateLimitItemPerHour(calls_per_hour), key_name)
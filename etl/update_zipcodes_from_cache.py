@@ -8,6 +8,7 @@ from etl.constants import WARNING_LOG_LEVEL
 from etl.constants import ZIPCODE_CACHE_LOCAL_PATH
 from etl.db_utilities import download_zipcodes_cache_from_s3
 from etl.db_utilities import execute_db_query
+from etl.db_utilities import execute_db_query_many
 from etl.db_utilities import upload_zipcodes_cache_to_s3
 from etl.log_utilities import custom_logger
 
@@ -26,7 +27,8 @@ def get_zipcodes_cache_as_json() -> dict | None:
         if os.path.exists(ZIPCODE_CACHE_LOCAL_PATH):
             custom_logger(INFO_LOG_LEVEL, "Loading zipcodes cache from S3 as JSON...")
 
-            with open(ZIPCODE_CACHE_LOCAL_PATH, "r") as zipcodes_file:
+            # Parse the raw bytes, json detects their UTF-8 encoding so no text mode decode is needed
+            with open(ZIPCODE_CACHE_LOCAL_PATH, "rb") as zipcodes_file:
                 zipcodes_cache = json.load(zipcodes_file)
 
     except (OSError, json.JSONDecodeError) as error:
@@ -50,11 +52,13 @@ def update_property_zipcodes_in_db_from_cache(zipcodes_cache: Dict[str, str]) ->
     WHERE id = ? 
     """
 
-    for property_id, zipcode in zipcodes_cache.items():
-        rowcount = execute_db_query(query, (zipcode, property_id), fetch_results=False)
+    if zipcodes_cache:
+        # One transaction for every cached zipcode rather than a connection and commit per property
+        params_list = [(zipcode, property_id) for property_id, zipcode in zipcodes_cache.items()]
+        rowcount = execute_db_query_many(query, params_list)
 
         if rowcount:
-            number_updated += rowcount
+            number_updated = rowcount
 
     return number_updated
 
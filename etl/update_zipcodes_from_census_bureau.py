@@ -1,12 +1,17 @@
+import csv
 import json
 import os
 import re
-from csv import DictWriter
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
 from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 
 import requests
 from backoff import expo
@@ -19,12 +24,14 @@ from etl.constants import PROPERTIES_TABLE
 from etl.constants import RETRYABLE_ERRORS
 from etl.constants import US_CENSUS_BUREAU_BATCH_SIZE
 from etl.constants import US_CENSUS_BUREAU_BATCH_URL
-from etl.constants import US_CENSUS_BUREAU_CALLS_PER_PERIOD
+from etl.constants import US_CENSUS_BUREAU_CALLS_PER_MINUTE
+from etl.constants import US_CENSUS_BUREAU_MAX_CONCURRENT_BATCHES
 from etl.constants import WARNING_LOG_LEVEL
 from etl.constants import ZIPCODE_CACHE_LOCAL_PATH
 from etl.db_utilities import download_database_from_s3
 from etl.db_utilities import ensure_data_directories_exist
 from etl.db_utilities import execute_db_query
+from etl.db_utilities import execute_db_query_many
 from etl.db_utilities import upload_database_to_s3
 from etl.db_utilities import upload_zipcodes_cache_to_s3
 from etl.log_utilities import custom_logger
@@ -33,6 +40,22 @@ from etl.rate_limits import rate_per_minute
 from etl.update_zipcodes_from_cache import get_zipcodes_cache_as_json
 from etl.update_zipcodes_from_cache import update_property_zipcodes_in_db_from_cache
 
+# CSV header columns in the order the geocoder batch api requires
+geocoder_batch_csv_header = ("Unique ID", "Street address", "City", "State", "ZIP")
+
+# Compiled once for sanitize_address_string
+parentheses_pattern = re.compile(r"\s*\(.*?\)")  # Anything in parentheses
+off_prefix_pattern = re.compile(r"^\s*[oO][fF]{2}\b")  # 'off' (any case) at the start of a string
+# Single character substitutions, made in one pass with str.translate
+address_character_substitutions = str.maketrans({
+    "/": " - ",  # Replace slash with space dash space
+    "&": " - ",  # Replace ampersand with space dash space
+    "'": None,  # Remove single quotes
+    "\"": None,  # Remove double quotes
+    "+": None,  # Remove '+'
+})
+whitespace_pattern = re.compile(r"\s+")
+
 
 def get_csv_file_path() -> str:
     """Make csv file path with a timestamp.  Returns full path to file."""
@@ -42,9 +65,10 @@ def get_csv_file_path() -> str:
     return os.path.join(EXTRACTED_DATA_DIR, temp_file_name)
 
 
-def create_csv_batch_file(data: List[Dict[str, Any]]) -> Optional[str]:
+def create_csv_batch_file(data: List[Tuple[Any, ...]]) -> Optional[str]:
     """
     Write properties without ZIP codes as batch CSV file to send to geocoder batch api.
+    Each row is a tuple of values in header order, written as is without building a dict per row.
     Returns name of created CSV file or None if no csv written.
     """
     batch_file_path = None
@@ -53,13 +77,11 @@ def create_csv_batch_file(data: List[Dict[str, Any]]) -> Optional[str]:
 
         if data:
 
-            # Define CSV header columns in required order
-            header = ["Unique ID", "Street address", "City", "State", "ZIP"]
             batch_file_path = get_csv_file_path()
 
             with open(batch_file_path, mode="w+", newline="", encoding="utf-8") as csv_file:
-                writer = DictWriter(csv_file, fieldnames=header, lineterminator="\n")
-                writer.writeheader()
+                writer = csv.writer(csv_file, lineterminator="\n")
+                writer.writerow(geocoder_batch_csv_header)
                 writer.writerows(data)
 
     except Exception as error:
@@ -68,10 +90,12 @@ def create_csv_batch_file(data: List[Dict[str, Any]]) -> Optional[str]:
     return batch_file_path
 
 
+@lru_cache(maxsize=8192)
 def sanitize_address_string(address: str) -> str:
     """
     Some characters in addresses cause geocoder errors.
     Remove any parentheses, and all text inside, from a given string.
+    Cached, as condo units and multi-parcel lots repeat the same street address.
 
     Example address 1: '1634 Clark St Rd (Parking/Residual)'
     Return 1: '1634 Clark St Rd'
@@ -82,79 +106,69 @@ def sanitize_address_string(address: str) -> str:
     Example address 4: 'off Watkins Rd'
     Return 4: 'Watkins Rd'
     """
-    substitutions = {
-        r"\s*\(.*?\)": "",  # Remove anything in parentheses
-        r"/": " - ",  # Replace slash with space dash space
-        r"&": " - ",  # Replace ampersand with space dash space
-        r"['\"]": "",  # Remove single and double quotes
-        r"\+": "",  # Remove '+'
-        r"^\s*[oO][fF]{2}\b": ""  # Remove 'off' (any case) at the start of a string
-    }
-
-    # Perform all substitutions
-    for pattern, replacement in substitutions.items():
-        address = re.sub(pattern, replacement, address)
+    # Nothing to sanitize in a blank address
+    if not address or address.isspace():
+        return ""
+
+    # Remove anything in parentheses before characters inside them are replaced
+    address = parentheses_pattern.sub("", address)
+    address = address.translate(address_character_substitutions)
+    # Last, as removing parentheses or quotes can leave 'off' at the start
+    address = off_prefix_pattern.sub("", address)
 
     # Normalize spaces created by substitutions or present in the input
-    address = re.sub(r"\s+", " ", address)
+    address = whitespace_pattern.sub(" ", address)
 
     # Strip any trailing whitespace
     return address.strip()
 
 
-def get_all_properties_needing_zipcodes_from_database_write_as_csv() -> List[str | None]:
+def get_all_properties_needing_zipcodes_from_database_write_as_csv() -> Iterator[str]:
     """
     Fetch properties without ZIP codes from database in batches, write each batch to
-    a CSV file using `create_address_batch_file`, and return a list of file names.
+    a CSV file using `create_address_batch_file`, and yield each file name as it is written
+    so a caller can submit a batch while the next one is still being generated.
     """
-    batch_file_paths = []
-    offset = 0
+    # Ids are non-empty text, so every id sorts after the empty string
+    last_id = ""
     batch_number = 1
+    # Seek past the last id of the previous batch on the primary key rather than
+    # an OFFSET, which makes SQLite step over every earlier row again for each batch
     query = f"""
         SELECT id, address_street, municipality_name, address_state
         FROM {PROPERTIES_TABLE} 
-        WHERE address_zip IS NULL OR address_zip = ''
+        WHERE address_zip IS NULL AND id > ?
         ORDER BY id
-        LIMIT ? OFFSET ?
+        LIMIT ?
     """
     custom_logger(INFO_LOG_LEVEL, "Fetching properties without zipcodes...")
 
     while True:
         results = execute_db_query(
             query=query,
-            params=(US_CENSUS_BUREAU_BATCH_SIZE, offset),
+            params=(last_id, US_CENSUS_BUREAU_BATCH_SIZE),
             fetch_results=True)
 
         # No more results to fetch
         if not results:
             break
 
-        batch_data = []
-
-        for row in results:
-            # temp_unique_id = map_property_id_to_temp_unique_id(row[0])
-            sanitized_street_address = sanitize_address_string(row[1])
-            batch_data.append(
-                {
-                    "Unique ID": row[0],
-                    "Street address": sanitized_street_address,
-                    "City": row[2],
-                    "State": row[3],
-                    "ZIP": ""
-                }
-            )
+        # Unique ID, Street address, City, State and an empty ZIP for the geocoder to fill in
+        batch_data = [
+            (property_id, sanitize_address_string(address_street), municipality_name, address_state, "")
+            for property_id, address_street, municipality_name, address_state in results
+        ]
 
         batch_file_path = create_csv_batch_file(batch_data)
 
         if batch_file_path:
-            batch_file_paths.append(batch_file_path)
-            offset += US_CENSUS_BUREAU_BATCH_SIZE
+            last_id = results[-1][0]
             custom_logger(
                 INFO_LOG_LEVEL,
                 f"Batch {batch_number} csv created with {len(batch_data)} properties at {batch_file_path}.")
             batch_number += 1
 
-    return batch_file_paths
+            yield batch_file_path
 
 
 def parse_geocoder_response(raw_response: str) -> List[Dict]:
@@ -168,17 +182,16 @@ def parse_geocoder_response(raw_response: str) -> List[Dict]:
     custom_logger(INFO_LOG_LEVEL, "Parsing geocoder response...")
 
     try:
-        # Split response into rows on line breaks
-        lines = raw_response.strip().split("\n")
-
-        for line in lines:
+        # Rows are "Unique ID","Input address","Match","Exact","Matched address",... with the
+        # ZIP code last in the matched address, e.g. "123 MAIN ST, SYRACUSE, NY, 13202", so read
+        # quoted fields with the csv module rather than splitting addresses apart on their commas
+        lines = raw_response.strip().splitlines()
 
-            # Split line into individual columns on commas
-            columns = line.split(",")
+        for columns in csv.reader(lines):
 
-            if len(columns) >= 11 and columns[5].strip('"') == "Match" and columns[6].strip('"') == "Exact":
-                property_id = columns[0].strip('"')
-                zip_code = columns[10].strip('"').split(",")[-1].strip()
+            if len(columns) >= 5 and columns[2] == "Match" and columns[3] == "Exact":
+                property_id = columns[0]
+                zip_code = columns[4].split(",")[-1].strip()
 
                 if property_id and zip_code:
 
@@ -202,12 +215,14 @@ def parse_geocoder_response(raw_response: str) -> List[Dict]:
     max_tries=3,
     on_backoff=log_retry
 )
-@rate_per_minute(calls_per_minute=US_CENSUS_BUREAU_CALLS_PER_PERIOD)
-def get_zipcodes_from_geocoder_as_batch(batch_file_path) -> Optional[str]:
+@rate_per_minute(calls_per_minute=US_CENSUS_BUREAU_CALLS_PER_MINUTE)
+def get_zipcodes_from_geocoder_as_batch(batch_file_path, session: Optional[requests.Session] = None) -> Optional[str]:
     """
-    Submit csv batch file to Census Bureau Geocoding API.
+    Submit csv batch file to Census Bureau Geocoding API.  Post with session when given, so
+    batches submitted one after another reuse its connection instead of a new TLS handshake each.
     Returns dictionary with job_id, result_url and batch_file (path to file sent) or None if there is an exception.
     """
+    http_client = session if session is not None else requests
     raw_response = None
     custom_logger(INFO_LOG_LEVEL, f"Submitting batch file: {batch_file_path}")
 
@@ -219,7 +234,7 @@ def get_zipcodes_from_geocoder_as_batch(batch_file_path) -> Optional[str]:
         form_data = {
             "benchmark": "Public_AR_Current"
         }
-        response = requests.post(
+        response = http_client.post(
             US_CENSUS_BUREAU_BATCH_URL,
             data=form_data,
             files=files,
@@ -236,7 +251,7 @@ def get_zipcodes_from_geocoder_as_batch(batch_file_path) -> Optional[str]:
 
 
 def update_property_zipcodes_with_geocoder_response(parsed_geo_response: List[Dict[str, str]]) -> int:
-    """Update properties in database with geocoded ZIP codes, return number of updated properties."""
+    """Update properties in database with geocoded ZIP codes in one transaction, return number of updated properties."""
     number_updated = 0
 
     try:
@@ -246,15 +261,15 @@ def update_property_zipcodes_with_geocoder_response(parsed_geo_response: List[Di
         WHERE id = ? 
         """
 
-        for row in parsed_geo_response:
-            property_id = row.get("property_id")
-            zip_code = row.get("zip_code")
+        params_list = [(row.get("zip_code"), row.get("property_id")) for row in parsed_geo_response
+                       if row.get("property_id") and row.get("zip_code")]
 
-            if property_id and zip_code:
-                rowcount = execute_db_query(query, (zip_code, property_id), fetch_results=False)
+        # One transaction for the whole response rather than a connection and commit per property
+        if params_list:
+            rowcount = execute_db_query_many(query, params_list)
 
-                if rowcount:
-                    number_updated += rowcount
+            if rowcount:
+                number_updated = rowcount
 
         custom_logger(INFO_LOG_LEVEL, f"Updated {number_updated} properties with ZIP codes.")
     except Exception as error:
@@ -280,6 +295,13 @@ def update_null_zipcodes_workflow():
         ensure_data_directories_exist()
 
         try:
+            # Missing zipcodes loaded as empty strings before they were stored as NULL, so convert any
+            # left for the batch query to find, looked up through idx_properties_zip rather than a scan
+            number_normalized = execute_db_query(
+                query=f"UPDATE {PROPERTIES_TABLE} SET address_zip = NULL WHERE address_zip = ''",
+                fetch_results=False)
+            custom_logger(INFO_LOG_LEVEL, f"Normalized {number_normalized} empty zipcodes to NULL.")
+
             # Get current zipcode cache from S3 or an empty dict
             zipcode_cache = get_zipcodes_cache_as_json()
 
@@ -287,28 +309,54 @@ def update_null_zipcodes_workflow():
             number_updated = update_property_zipcodes_in_db_from_cache(zipcode_cache)
             custom_logger(INFO_LOG_LEVEL, f"Updated {number_updated} zipcodes from cache.")
 
-            batch_file_paths = get_all_properties_needing_zipcodes_from_database_write_as_csv()
+            # requests does not document Session as thread-safe, so each worker thread opens its own
+            # and reuses its connections to the geocoder for every batch that thread submits
+            worker_state = threading.local()
+            geocoder_sessions = []
+
+            def submit_batch_file(batch_file_path: str) -> Optional[str]:
+                raw_response = None
 
-            for batch_file_path in batch_file_paths:
+                if not hasattr(worker_state, "geocoder_session"):
+                    worker_state.geocoder_session = requests.Session()
+                    geocoder_sessions.append(worker_state.geocoder_session)
 
                 try:
-                    raw_response = get_zipcodes_from_geocoder_as_batch(batch_file_path)
+                    raw_response = get_zipcodes_from_geocoder_as_batch(
+                        batch_file_path, session=worker_state.geocoder_session)
                 except Exception as error:
                     custom_logger(
                         WARNING_LOG_LEVEL,
                         f"Error unable to get zips for batch file {batch_file_path}: {str(error)}")
-                else:
-                    if raw_response:
-                        parsed_response = parse_geocoder_response(raw_response)
-                        update_property_zipcodes_with_geocoder_response(parsed_response)
 
-                        # Update the zipcode cache - even if save to db failed next time zips are loaded from cache we want these
-                        for row in parsed_response:
-                            property_id = row.get("property_id")
-                            zip_code = row.get("zip_code")
+                return raw_response
+
+            try:
+                with ThreadPoolExecutor(max_workers=US_CENSUS_BUREAU_MAX_CONCURRENT_BATCHES) as executor:
+                    # Each batch file is submitted as soon as it is written, so uploads overlap writing the
+                    # rest.  Only the geocoder requests run concurrently, sharing its rate limit, responses
+                    # are saved in batch order on this thread, after every batch is read, so there is one
+                    # database writer and no update moves rows under the batch query
+                    batch_file_paths = get_all_properties_needing_zipcodes_from_database_write_as_csv()
+
+                    for raw_response in executor.map(submit_batch_file, batch_file_paths):
+
+                        if raw_response:
+                            parsed_response = parse_geocoder_response(raw_response)
+                            update_property_zipcodes_with_geocoder_response(parsed_response)
+
+                            # Update the zipcode cache - even if save to db failed next time zips are loaded from cache we want these
+                            for row in parsed_response:
+                                property_id = row.get("property_id")
+                                zip_code = row.get("zip_code")
+
+                                if property_id and zip_code:
+                                    zipcode_cache[property_id] = zip_code
+
+            finally:
 
-                            if property_id and zip_code:
-                                zipcode_cache[property_id] = zip_code
+                for geocoder_session in geocoder_sessions:
+                    geocoder_session.close()
 
         except Exception as error:
             custom_logger(WARNING_LOG_LEVEL, f"Error in update null zipcodes workflow: {str(error)}")
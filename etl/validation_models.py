@@ -1,6 +1,7 @@
 from decimal import Decimal
 from typing import ClassVar
 from typing import Optional
+from typing import Tuple
 
 from pydantic import BaseModel, Field
 from pydantic import field_serializer
@@ -45,6 +46,31 @@ class MunicipalityAssessmentRatio(BaseModel):
 
 class NYPropertyAssessment(BaseModel):
     STATE: ClassVar[str] = ALL_PROPERTIES_STATE
+    PROPERTIES_COLUMNS: ClassVar[Tuple[str, ...]] = (
+        "id",
+        "swis_code",
+        "print_key_code",
+        "municipality_code",
+        "municipality_name",
+        "county_name",
+        "school_district_code",
+        "school_district_name",
+        "address_street",
+        "address_state",
+        "address_zip"
+    )
+    NY_PROPERTY_ASSESSMENTS_COLUMNS: ClassVar[Tuple[str, ...]] = (
+        "property_id",
+        "roll_year",
+        "property_class",
+        "property_class_description",
+        "property_category",
+        "front",
+        "depth",
+        "full_market_value",
+        "assessment_land",
+        "assessment_total"
+    )
 
     roll_year: int = Field(
         ge=MINIMUM_ASSESSMENT_YEAR,
@@ -213,6 +239,26 @@ class NYPropertyAssessment(BaseModel):
                 and parcel_state == mailing_state
         )
 
+    def to_properties_tuple(self) -> tuple:
+        """
+        Return values for a row in `properties` table, ordered as PROPERTIES_COLUMNS,
+        ready to be passed straight to an insert without building a dict first.
+        """
+        return (
+            self.generate_properties_id(),
+            self.swis_code,
+            self.print_key_code,
+            self.municipality_code,
+            self.municipality_name,
+            self.county_name,
+            self.school_district_code,
+            self.school_district_name,
+            self.generate_address_street(),
+            self.generate_address_state(),
+            # Store a missing zipcode as NULL, never an empty string
+            (self.mailing_address_zip or None) if self.is_owner_occupied() else None
+        )
+
     def to_properties_row(self) -> dict:
         """
         Return data for a row in `properties` table from full record.
@@ -230,19 +276,25 @@ class NYPropertyAssessment(BaseModel):
              "address_state": "NY"
          }
         """
-        return {
-            "id": self.generate_properties_id(),
-            "swis_code": self.swis_code,
-            "print_key_code": self.print_key_code,
-            "municipality_code": self.municipality_code,
-            "municipality_name": self.municipality_name,
-            "county_name": self.county_name,
-            "school_district_code": self.school_district_code,
-            "school_district_name": self.school_district_name,
-            "address_street": self.generate_address_street(),
-            "address_state": self.generate_address_state(),
-            "address_zip": self.mailing_address_zip if self.is_owner_occupied() else None
-        }
+        return dict(zip(self.PROPERTIES_COLUMNS, self.to_properties_tuple()))
+
+    def to_ny_property_assessments_tuple(self) -> tuple:
+        """
+        Return values for a row in `ny_property_assessments` table, ordered as
+        NY_PROPERTY_ASSESSMENTS_COLUMNS.
+        """
+        return (
+            self.generate_properties_id(),
+            self.roll_year,
+            self.property_class,
+            self.property_class_description,
+            self.generate_property_category(),
+            self.front,
+            self.depth,
+            self.full_market_value,
+            self.assessment_land,
+            self.assessment_total
+        )
 
     def to_ny_property_assessments_row(self) -> dict:
         """
@@ -261,18 +313,7 @@ class NYPropertyAssessment(BaseModel):
              "assessment_total": 98900,
          }
         """
-        return {
-            "property_id": self.generate_properties_id(),
-            "roll_year": self.roll_year,
-            "property_class": self.property_class,
-            "property_class_description": self.property_class_description,
-            "property_category": self.generate_property_category(),
-            "front": self.front,
-            "depth": self.depth,
-            "full_market_value": self.full_market_value,
-            "assessment_land": self.assessment_land,
-            "assessment_total": self.assessment_total
-        }
+        return dict(zip(self.NY_PROPERTY_ASSESSMENTS_COLUMNS, self.to_ny_property_assessments_tuple()))
 
     class ConfigDict:
         # Ignore all fields not defined
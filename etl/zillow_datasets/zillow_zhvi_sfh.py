@@ -1,14 +1,15 @@
 import csv
 from datetime import datetime
-from io import StringIO
+from io import TextIOWrapper
 from typing import Optional
 
 import requests
 from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from pydantic import ValidationError
 
 from etl.constants import ALL_PROPERTIES_STATE
-from etl.constants import CNY_COUNTY_LIST
+from etl.constants import CNY_COUNTY_SET
 from etl.constants import INFO_LOG_LEVEL
 from etl.constants import WARNING_LOG_LEVEL
 from etl.db_utilities import insert_or_replace_into_database
@@ -26,6 +27,12 @@ ZILLOW_HEADERS = {
     'Upgrade-Insecure-Requests': '1',
 }
 TIMEOUT_SECONDS = 30
+# Records accumulated across csv rows before they are inserted together
+ZILLOW_ZHVI_RECORDS_PER_INSERT = 5000
+ZILLOW_ZHVI_DROPDOWN_ID = "median-home-value-zillow-home-value-index-zhvi-dropdown-2"
+
+# Only the dropdown with the download URLs is built into the soup, the rest of the page is skipped while parsing
+zillow_zhvi_dropdown_strainer = SoupStrainer("select", attrs={"id": ZILLOW_ZHVI_DROPDOWN_ID})
 
 
 def get_current_download_url(session=None) -> Optional[str]:
@@ -47,8 +54,13 @@ def get_current_download_url(session=None) -> Optional[str]:
         response = session.get(ZILLOW_DATA_PAGE_URL, headers=ZILLOW_HEADERS, timeout=TIMEOUT_SECONDS)
 
         if response.ok:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            dropdown2 = soup.find('select', id='median-home-value-zillow-home-value-index-zhvi-dropdown-2')
+            # The data page is served as UTF-8, so BeautifulSoup need not detect the encoding
+            soup = BeautifulSoup(
+                response.content,
+                'html.parser',
+                from_encoding="utf-8",
+                parse_only=zillow_zhvi_dropdown_strainer)
+            dropdown2 = soup.find('select', id=ZILLOW_ZHVI_DROPDOWN_ID)
 
             if dropdown2:
                 city_option = None
@@ -113,20 +125,29 @@ def parse_csv_row_into_valid_location_for_db(csv_row: dict) -> Optional[dict]:
     return validated_record
 
 
+def is_cny_csv_row(location_row: dict) -> bool:
+    """
+    Return True if the raw csv row county and state are a Central New York county, else False.
+    A cheap check on the unvalidated strings so only the few CNY rows are validated with the model.
+    """
+    county_name = location_row.get("CountyName", "").replace(" County", "").strip()
+
+    return county_name in CNY_COUNTY_SET and location_row.get("State") == ALL_PROPERTIES_STATE
+
+
 def is_cny_county(validated_location: dict) -> bool:
     """Return True if county name and state are a Central New York county to save to database, else False."""
-    return validated_location["county_name"] in CNY_COUNTY_LIST and validated_location["state"] == ALL_PROPERTIES_STATE
+    return validated_location["county_name"] in CNY_COUNTY_SET and validated_location["state"] == ALL_PROPERTIES_STATE
 
 
-def prepare_db_records(csv_row: dict, validated_location: dict) -> list[tuple]:
+def get_date_columns(csv_header: list[str]) -> list[tuple[int, str]]:
     """
-    Transform validated cny records into database-ready list of tuples to store for each date and related data point.
-    If no dates with data return an empty list.
+    Find all headings in the csv header row that are dates and return a list of tuples of each column index
+    and its date formatted as YYYY-MM to store, so the dates are parsed once rather than again for every row.
     """
-    db_records = []
+    date_columns = []
 
-    # Csv dict reader creates a dictionary with each key being a heading.  Find all keys that are dates.
-    for column, value in csv_row.items():
+    for index, column in enumerate(csv_header):
 
         try:
             date = datetime.strptime(column.strip(), "%Y-%m-%d")
@@ -135,23 +156,48 @@ def prepare_db_records(csv_row: dict, validated_location: dict) -> list[tuple]:
             continue
         else:
             # Store date as YYYY-MM
-            store_date = f"{date.year}-{date.month:02d}"
+            date_columns.append((index, f"{date.year}-{date.month:02d}"))
+
+    return date_columns
+
+
+def prepare_db_records(csv_row: list[str], validated_location: dict, date_columns: list[tuple[int, str]]) -> list[tuple]:
+    """
+    Transform validated cny records into database-ready list of tuples to store for each date and related data point.
+    If no dates with data return an empty list.
+    """
+    db_records = []
 
-            # Store values as floats for ease of data analysis
-            data_value = float(value) if value else None
+    for index, store_date in date_columns:
+        value = csv_row[index]
 
-            if data_value:
-                db_records.append((
-                    validated_location["municipality_name"],
-                    validated_location["county_name"],
-                    validated_location["state"],
-                    store_date,
-                    data_value,
-                ))
+        # Store values as floats for ease of data analysis, converted cell by cell since only CNY rows
+        # reach here, rather than typing every row of the national file up front
+        data_value = float(value) if value else None
+
+        if data_value:
+            db_records.append((
+                validated_location["municipality_name"],
+                validated_location["county_name"],
+                validated_location["state"],
+                store_date,
+                data_value,
+            ))
 
     return db_records
 
 
+def store_db_records(db_records: list[tuple]) -> int:
+    """Insert or replace prepared records into the zillow_home_value_index_sfh table and return count inserted."""
+    rows_inserted, rows_failed = insert_or_replace_into_database(
+        table_name="zillow_home_value_index_sfh",
+        column_names=["municipality_name", "county_name", "state", "date", "home_value_index"],
+        data=db_records
+    )
+
+    return rows_inserted
+
+
 def get_free_zillow_zhvi_sfh(session=None):
     data_description = "Zillow Home Value Index Single Family Homes"
 
@@ -164,32 +210,59 @@ def get_free_zillow_zhvi_sfh(session=None):
     if current_url:
         # Use session, if passed, to ease testing
         session = session or requests
-        response = session.get(current_url)
-
-        if response.ok:
-            reader = csv.DictReader(StringIO(response.text))
-            num_records_stored = 0
-
-            for row in reader:
-                validated_record_location = parse_csv_row_into_valid_location_for_db(row)
-                is_cny_record = is_cny_county(validated_record_location)
-
-                if is_cny_record:
-                    records_to_store = prepare_db_records(row, validated_record_location)
-
-                    if records_to_store:
-                        rows_inserted, rows_failed = insert_or_replace_into_database(
-                            table_name="zillow_home_value_index_sfh",
-                            column_names=["municipality_name", "county_name", "state", "date", "home_value_index"],
-                            data=records_to_store
-                        )
-                        num_records_stored += rows_inserted
-
-            custom_logger(
-                INFO_LOG_LEVEL,
-                f"Completed fetching {data_description} and stored {num_records_stored} valid records.")
-        else:
-            custom_logger(
-                WARNING_LOG_LEVEL,
-                f"Failed fetching {data_description}. Status code: {response.status_code}. Error: {response.text}"
-            )
+        # Stream the download so the csv is parsed a chunk of lines at a time rather than held in memory whole.
+        # Requests already sends Accept-Encoding gzip, and a streamed timeout limits each read, not the whole download.
+        with session.get(current_url, stream=True, timeout=TIMEOUT_SECONDS) as response:
+
+            if response.ok:
+                # Read the raw stream through a C text decoder instead of splitting and decoding lines in
+                # iter_lines, urllib3 still undoes the gzip transfer encoding when decode_content is set
+                response.raw.decode_content = True
+                csv_file = TextIOWrapper(response.raw, encoding="utf-8", newline="")
+
+                # Read rows as lists by position, only the location columns are built into a dict to validate.
+                # Streamed rather than loaded into a DataFrame and melted, so the national file is never held
+                # whole and rows outside CNY are skipped before any of their date cells are touched
+                reader = csv.reader(csv_file)
+                csv_header = next(reader, [])
+                date_columns = get_date_columns(csv_header)
+                date_column_indexes = {index for index, _ in date_columns}
+                location_columns = [
+                    (index, column) for index, column in enumerate(csv_header) if index not in date_column_indexes
+                ]
+                num_records_stored = 0
+                records_to_store = []
+
+                for row in reader:
+                    # Skip blank lines, such as one at the end of the file
+                    if not row:
+                        continue
+
+                    location_row = {column: row[index] for index, column in location_columns}
+
+                    # Skip rows outside CNY before paying for model validation
+                    if not is_cny_csv_row(location_row):
+                        continue
+
+                    validated_record_location = parse_csv_row_into_valid_location_for_db(location_row)
+                    is_cny_record = is_cny_county(validated_record_location)
+
+                    if is_cny_record:
+                        records_to_store.extend(prepare_db_records(row, validated_record_location, date_columns))
+
+                        # Insert records of many rows together rather than once per row
+                        if len(records_to_store) >= ZILLOW_ZHVI_RECORDS_PER_INSERT:
+                            num_records_stored += store_db_records(records_to_store)
+                            records_to_store = []
+
+                if records_to_store:
+                    num_records_stored += store_db_records(records_to_store)
+
+                custom_logger(
+                    INFO_LOG_LEVEL,
+                    f"Completed fetching {data_description} and stored {num_records_stored} valid records.")
+            else:
+                custom_logger(
+                    WARNING_LOG_LEVEL,
+                    f"Failed fetching {data_description}. Status code: {response.status_code}. Error: {response.text}"
+                )
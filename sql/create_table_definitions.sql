@@ -52,6 +52,12 @@ CREATE TABLE IF NOT EXISTS properties
 CREATE INDEX IF NOT EXISTS idx_properties_zip
     ON properties (address_zip);
 
+-- Add a partial index of only properties missing a zip code, in id order, to optimize
+-- fetching them in batches for the geocoder, it shrinks as zip codes are filled in
+CREATE INDEX IF NOT EXISTS idx_properties_null_zip
+    ON properties (id)
+    WHERE address_zip IS NULL;
+
 -- Add an index to optimize filtering by school district code
 CREATE INDEX IF NOT EXISTS idx_properties_school_district_code
     ON properties (school_district_code);
@@ -0,0 +1,11 @@
+import pytest
+
+from etl.rate_limits import storage_backend
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Start every test with empty rate limit windows so decorated API calls never wait on earlier tests."""
+    storage_backend.reset()
+    yield
+    storage_backend.reset()
@@ -22,6 +22,7 @@ from etl.db_utilities import download_database_from_s3
 from etl.db_utilities import download_zipcodes_cache_from_s3
 from etl.db_utilities import ensure_data_directories_exist
 from etl.db_utilities import execute_db_query
+from etl.db_utilities import execute_db_query_many
 from etl.db_utilities import get_s3_client
 from etl.db_utilities import insert_or_replace_into_database
 from etl.db_utilities import upload_database_to_s3
@@ -102,11 +103,16 @@ class TestInsertOrReplaceIntoDatabase:
         assert actual_inserted == 1
         assert actual_failed == 0
         mock_custom_logger.assert_called_once_with(INFO_LOG_LEVEL, f"rows_inserted: 1, rows_failed: 0")
-        mock_sql.connect.assert_called_with(DB_LOCAL_PATH)
+        mock_sql.connect.assert_called_with(DB_LOCAL_PATH, isolation_level=None)
         mock_conn.cursor.assert_called_once()
-        mock_cursor.execute.assert_called_with(f'REPLACE INTO {table_name} ({col1}, {col2}) VALUES (?, ?)', data_row)
-        mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_not_called()
+        assert mock_cursor.execute.call_args_list == [
+            call("BEGIN"),
+            call("SAVEPOINT insert_chunk"),
+            call(f'REPLACE INTO {table_name} ({col1}, {col2}) VALUES (?, ?)', list(data_row)),
+            call("RELEASE insert_chunk"),
+            call("COMMIT"),
+        ]
+        mock_conn.close.assert_called_once()
 
     @patch('etl.db_utilities.custom_logger')
     @patch('etl.db_utilities.sqlite3.connect')
@@ -162,12 +168,11 @@ class TestInsertOrReplaceIntoDatabase:
         assert actual_inserted == 1
         assert actual_failed == 0
         mock_custom_logger.assert_called_once_with(INFO_LOG_LEVEL, f"rows_inserted: 1, rows_failed: 0")
-        mock_sql.connect.assert_called_once_with(DB_LOCAL_PATH)
+        mock_sql.connect.assert_called_once_with(DB_LOCAL_PATH, isolation_level=None)
         mock_conn.cursor.assert_called_once()
-        mock_cursor.execute.assert_called_with(
+        mock_cursor.execute.assert_any_call(
             f'REPLACE INTO {table_name} ({col1}, {col2}, {col3}, {col4}, {col5}) VALUES (?, ?, ?, ?, ?)',
-            data_row)
-        mock_conn.commit.assert_called_once()
+            list(data_row))
 
 
 class TestExecuteDbQuery:
@@ -252,6 +257,39 @@ class TestExecuteDbQuery:
         mock_custom_logger.assert_called_once_with(WARNING_LOG_LEVEL, f"Query {query} failed, database error: {ex}.")
 
 
+class TestExecuteDbQueryMany:
+
+    @patch("etl.db_utilities.sqlite3.connect")
+    def test_execute_db_query_many_rowcount(self, mock_connect):
+        """Test that all parameters are executed in one call and the total row count is returned."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 2
+        mock_connect.return_value.__enter__.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        query = "UPDATE test_table SET name = ? WHERE id = ?"
+        params_list = [("John Doe", 1), ("Jane Doe", 2)]
+
+        result = execute_db_query_many(query, params_list)
+
+        assert result == 2
+        mock_connect.assert_called_once_with(DB_LOCAL_PATH)
+        mock_cursor.executemany.assert_called_once_with(query, params_list)
+        mock_conn.close.assert_called_once()
+
+    @patch('etl.db_utilities.custom_logger')
+    @patch('etl.db_utilities.sqlite3.connect')
+    def test_execute_db_query_many_exception(self, mock_connect, mock_custom_logger):
+        ex = "Database error"
+        mock_connect.side_effect = sqlite3.Error(ex)
+        query = "UPDATE test_table SET name = ? WHERE id = ?"
+
+        result = execute_db_query_many(query, [("John Doe", 1)])
+
+        assert result is None
+        mock_custom_logger.assert_called_once_with(WARNING_LOG_LEVEL, f"Query {query} failed, database error: {ex}.")
+
+
 class TestGetS3Client:
 
     def test_get_s3_client_success(self, monkeypatch):
@@ -504,6 +542,7 @@ class TestCreateOrUpdateVersionFileAndUpload:
 
 class TestUploadDatabaseToS3:
 
+    @patch('etl.db_utilities.checkpoint_database_journal')
     @patch('etl.db_utilities.create_or_update_version_file_and_upload')
     @patch('etl.db_utilities.get_s3_client')
     @patch('os.path.exists')
@@ -520,6 +559,7 @@ class TestUploadDatabaseToS3:
             mock_path_exists,
             mock_get_s3_client,
             mock_create_version_file,
+            mock_checkpoint,
     ):
         mock_s3_client = MagicMock()
         mock_get_s3_client.return_value = mock_s3_client
@@ -530,6 +570,7 @@ class TestUploadDatabaseToS3:
         upload_database_to_s3()
 
         mock_logger.assert_any_call(INFO_LOG_LEVEL, "Uploading database to S3...")
+        mock_checkpoint.assert_called_once()
         mock_file_open.assert_called_once_with(DB_LOCAL_PATH, 'rb')
         mock_gzip_open.assert_called_once_with(GZIPPED_DB_LOCAL_PATH, 'wb+')
         mock_copyfileobj.assert_called_once_with(mock_file_open_instance, mock_gzip_open_instance)
@@ -544,6 +585,7 @@ class TestUploadDatabaseToS3:
             f"Successfully uploaded {GZIPPED_DB_LOCAL_PATH} to s3://{S3_BUCKET_NAME}/{GZIPPED_DB_NAME}",
         )
 
+    @patch('etl.db_utilities.checkpoint_database_journal')
     @patch('etl.db_utilities.create_or_update_version_file_and_upload')
     @patch('etl.db_utilities.get_s3_client')
     @patch('gzip.open')
@@ -558,6 +600,7 @@ class TestUploadDatabaseToS3:
             mock_gzip_open,
             mock_get_s3_client,
             mock_create_version_file,
+            mock_checkpoint,
     ):
         mock_s3_client = MagicMock()
         mock_s3_client.upload_file.side_effect = Exception("Simulated S3 upload failure")
@@ -567,6 +610,7 @@ class TestUploadDatabaseToS3:
 
         mock_logger.assert_any_call(WARNING_LOG_LEVEL, "Failed to upload database to S3: Simulated S3 upload failure")
 
+    @patch('etl.db_utilities.checkpoint_database_journal')
     @patch('etl.db_utilities.get_s3_client')
     @patch('gzip.open')
     @patch('builtins.open', new_callable=mock_open)
@@ -579,6 +623,7 @@ class TestUploadDatabaseToS3:
             mock_file_open,
             mock_gzip_open,
             mock_get_s3_client,
+            mock_checkpoint,
     ):
         mock_s3_client = MagicMock()
         mock_get_s3_client.return_value = mock_s3_client
@@ -1,10 +1,16 @@
 import os
+from unittest.mock import call
 from unittest.mock import patch
 
 import pytest
 import sqlite3
 
+from etl.db_utilities import build_replace_into_query
+from etl.db_utilities import checkpoint_database_journal
+from etl.db_utilities import get_replace_into_queries
 from etl.db_utilities import insert_or_replace_into_database
+from etl.db_utilities import insert_or_replace_into_database_tables
+from etl.db_utilities import wal_enabled_db_paths
 from etl.constants import WARNING_LOG_LEVEL
 from etl.constants import INFO_LOG_LEVEL
 
@@ -15,23 +21,41 @@ test_table_name = "test_table"
 
 @pytest.fixture
 def setup_database():
-    """Create a test database and return its connection, clean up after testing."""
+    """Create a test database, clean up after testing."""
+    # Tests with a mocked connection can leave the path marked as already switched to WAL
+    wal_enabled_db_paths.discard(test_db_path)
+
     with patch("etl.db_utilities.DB_LOCAL_PATH", test_db_path):
-        with sqlite3.connect(test_db_path) as connection:
-            cursor = connection.cursor()
-            cursor.execute(f"""
-                CREATE TABLE {test_table_name} (
-                    id INTEGER PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    age INTEGER NOT NULL
-                )
-            """)
-            connection.commit()
+        connection = sqlite3.connect(test_db_path)
+        cursor = connection.cursor()
+        cursor.execute(f"""
+            CREATE TABLE {test_table_name} (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                age INTEGER NOT NULL
+            )
+        """)
+        connection.commit()
+        # Closed before the test so no idle connection blocks leaving WAL mode
+        connection.close()
+
+        yield
+
+    wal_enabled_db_paths.discard(test_db_path)
 
-            yield
+    for path in (test_db_path, f"{test_db_path}-wal", f"{test_db_path}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
 
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
+
+def get_journal_mode_in_test_database():
+    """Helper function to read the journal mode, closing the connection so it does not hold the WAL open."""
+    connection = sqlite3.connect(test_db_path)
+
+    try:
+        return connection.execute("PRAGMA journal_mode").fetchone()[0]
+    finally:
+        connection.close()
 
 
 def get_data_in_test_database():
@@ -60,6 +84,134 @@ def test_successful_insertion(setup_database):
     assert rows == data
 
 
+def test_replace_into_query_cached_across_calls(setup_database):
+    """Test repeated inserts into the same table and columns reuse one cache entry, whatever their row counts."""
+    get_replace_into_queries.cache_clear()
+
+    insert_or_replace_into_database(test_table_name, test_column_names, [(1, "Alice", 30)])
+    insert_or_replace_into_database(test_table_name, test_column_names, [(2, "Bob", 25), (3, "Carol", 40)])
+
+    # Partial chunks of one and two rows are built without adding cache entries
+    assert get_replace_into_queries.cache_info().misses == 1
+    assert get_replace_into_queries.cache_info().hits == 1
+    assert get_replace_into_queries.cache_info().currsize == 1
+    assert build_replace_into_query(test_table_name, tuple(test_column_names), 2) == \
+        f"REPLACE INTO {test_table_name} (id, name, age) VALUES (?, ?, ?), (?, ?, ?)"
+    assert get_data_in_test_database() == [(1, "Alice", 30), (2, "Bob", 25), (3, "Carol", 40)]
+
+
+def test_insertion_in_chunks(setup_database):
+    """Test rows are written with one statement per chunk and committed every commit_size chunks."""
+    data = [(row_id, f"Person {row_id}", 20 + row_id) for row_id in range(1, 6)]
+
+    with patch("etl.db_utilities.sqlite3.connect", wraps=sqlite3.connect) as mock_connect:
+        rows_inserted, rows_failed = insert_or_replace_into_database(
+            test_table_name, test_column_names, data, bulk_size=2, commit_size=2)
+
+    mock_connect.assert_called_once_with(test_db_path, isolation_level=None)
+    assert rows_inserted == 5
+    assert rows_failed == 0
+    assert get_data_in_test_database() == data
+
+
+def test_insertion_in_chunks_multi_row_statements():
+    """Test each chunk gets its own multi-row VALUES statement, with a commit after every commit_size chunks."""
+    data = [(row_id, f"Person {row_id}", 20 + row_id) for row_id in range(1, 6)]
+
+    with patch("etl.db_utilities.sqlite3.connect", autospec=True) as mock_connect, \
+            patch("etl.db_utilities.DB_LOCAL_PATH", test_db_path), \
+            patch("etl.db_utilities.custom_logger"):
+        mock_cursor = mock_connect.return_value.__enter__.return_value.cursor.return_value
+        rows_inserted, rows_failed = insert_or_replace_into_database(
+            test_table_name, test_column_names, data, bulk_size=2, commit_size=2)
+
+        two_row_query = f"REPLACE INTO {test_table_name} (id, name, age) VALUES (?, ?, ?), (?, ?, ?)"
+        one_row_query = f"REPLACE INTO {test_table_name} (id, name, age) VALUES (?, ?, ?)"
+        insert_calls = [
+            execute_call for execute_call in mock_cursor.execute.call_args_list if len(execute_call.args) == 2]
+        assert insert_calls == [
+            call(two_row_query, [1, "Person 1", 21, 2, "Person 2", 22]),
+            call(two_row_query, [3, "Person 3", 23, 4, "Person 4", 24]),
+            call(one_row_query, [5, "Person 5", 25]),
+        ]
+        mock_cursor.executemany.assert_not_called()
+        assert [execute_call.args[0] for execute_call in mock_cursor.execute.call_args_list].count("COMMIT") == 2
+        assert rows_inserted == 5
+        assert rows_failed == 0
+
+
+def test_chunk_integrity_error_keeps_other_chunks(setup_database):
+    """Test a constraint failure in one chunk only leaves out the failing row, not other chunks."""
+    data = [(1, "Alice", 30), (2, "Bob", 25), (3, None, 35), (4, "Dana", 40)]
+
+    with patch("etl.db_utilities.custom_logger"):
+        rows_inserted, rows_failed = insert_or_replace_into_database(
+            test_table_name, test_column_names, data, bulk_size=2)
+
+    assert rows_inserted == 3
+    assert rows_failed == 1
+    assert get_data_in_test_database() == [(1, "Alice", 30), (2, "Bob", 25), (4, "Dana", 40)]
+
+
+def test_insert_into_several_tables_in_one_transaction(setup_database):
+    """Test rows for several tables are written over one connection with a single commit."""
+    connection = sqlite3.connect(test_db_path)
+    connection.execute("CREATE TABLE test_scores (person_id INTEGER PRIMARY KEY, score INTEGER NOT NULL)")
+    connection.commit()
+    connection.close()
+    people = [(1, "Alice", 30), (2, "Bob", 25)]
+    scores = [(1, 90), (2, None)]
+
+    with patch("etl.db_utilities.sqlite3.connect", wraps=sqlite3.connect) as mock_connect, \
+            patch("etl.db_utilities.custom_logger") as mock_logger:
+        results = insert_or_replace_into_database_tables([
+            (test_table_name, test_column_names, people),
+            ("test_scores", ["person_id", "score"], scores),
+        ])
+
+    mock_connect.assert_called_once_with(test_db_path, isolation_level=None)
+    assert results == [(2, 0), (1, 1)]
+    assert get_data_in_test_database() == people
+    mock_logger.assert_any_call(INFO_LOG_LEVEL, "rows_inserted: 2, rows_failed: 0")
+    mock_logger.assert_any_call(INFO_LOG_LEVEL, "rows_inserted: 1, rows_failed: 1")
+
+
+def test_insert_into_several_tables_error_saves_neither():
+    """Test a database error before the single commit leaves every table unsaved."""
+    def execute(query, *args):
+        if query == "COMMIT":
+            raise sqlite3.Error("Simulated error")
+
+    with patch("etl.db_utilities.sqlite3.connect", autospec=True) as mock_connect, \
+            patch("etl.db_utilities.DB_LOCAL_PATH", test_db_path), \
+            patch("etl.db_utilities.custom_logger") as mock_logger:
+        mock_cursor = mock_connect.return_value.__enter__.return_value.cursor.return_value
+        mock_cursor.execute.side_effect = execute
+        results = insert_or_replace_into_database_tables([
+            (test_table_name, test_column_names, [(1, "Alice", 30)]),
+            ("test_scores", ["person_id", "score"], [(1, 90), (2, 80)]),
+        ])
+
+    mock_logger.assert_called_once_with(WARNING_LOG_LEVEL, "Unexpected database error occurred: Simulated error")
+    assert results == [(0, 1), (0, 2)]
+
+
+def test_bulk_load_pragmas_applied(setup_database):
+    """Test inserting switches the database to WAL and checkpointing switches it back for upload."""
+    insert_or_replace_into_database(test_table_name, test_column_names, [(1, "Alice", 30)])
+
+    assert get_journal_mode_in_test_database() == "wal"
+    assert test_db_path in wal_enabled_db_paths
+
+    checkpoint_database_journal()
+
+    assert get_journal_mode_in_test_database() == "delete"
+
+    assert test_db_path not in wal_enabled_db_paths
+    assert not os.path.exists(f"{test_db_path}-wal")
+    assert get_data_in_test_database() == [(1, "Alice", 30)]
+
+
 def test_replace_existing_row(setup_database):
     """Test inserting rows when there are duplicate primary keys."""
     data = [
@@ -117,57 +269,124 @@ def test_database_connect_sqlite3_error():
         assert rows_failed == 1
 
 
-def test_database_execute_sqlite3_error():
-    """Simulate a sqlite3 error when execute is called and ensure it is logged."""
+def test_integrity_error_rows_skipped(setup_database):
+    """Test a row failing a constraint is skipped while the other rows are still inserted."""
+    data = [
+        (1, "Alice", 30),
+        (2, None, 25),  # name is NOT NULL
+        (3, "Charlie", 35)
+    ]
+
+    with patch("etl.db_utilities.custom_logger") as mock_logger:
+        rows_inserted, rows_failed = insert_or_replace_into_database(test_table_name, test_column_names, data)
+
+    assert rows_inserted == 2
+    assert rows_failed == 1
+    assert get_data_in_test_database() == [(1, "Alice", 30), (3, "Charlie", 35)]
+    mock_logger.assert_any_call(
+        WARNING_LOG_LEVEL,
+        f"Row 2 failed to insert due to an integrity error: NOT NULL constraint failed: {test_table_name}.name. "
+        f"Row data: {data[1]}"
+    )
+
+
+def test_database_multi_row_statement_used_for_batch():
+    """Test all rows are sent with one multi-row VALUES statement inside a single explicit transaction."""
+    data = [(1, "Alice", 30), (2, "Bob", 25)]
+
+    with patch("etl.db_utilities.sqlite3.connect", autospec=True) as mock_connect, \
+            patch("etl.db_utilities.DB_LOCAL_PATH", test_db_path), \
+            patch("etl.db_utilities.custom_logger") as mock_logger:
+        mock_connection = mock_connect.return_value
+        mock_cursor = mock_connection.__enter__.return_value.cursor.return_value
+        rows_inserted, rows_failed = insert_or_replace_into_database(test_table_name, test_column_names, data)
+
+        mock_connect.assert_called_once_with(test_db_path, isolation_level=None)
+        assert mock_cursor.execute.call_args_list == [
+            call("BEGIN"),
+            call("SAVEPOINT insert_chunk"),
+            call(f"REPLACE INTO {test_table_name} (id, name, age) VALUES (?, ?, ?), (?, ?, ?)",
+                 [1, "Alice", 30, 2, "Bob", 25]),
+            call("RELEASE insert_chunk"),
+            call("COMMIT"),
+        ]
+        mock_logger.assert_called_once_with(INFO_LOG_LEVEL, "rows_inserted: 2, rows_failed: 0")
+        assert rows_inserted == 2
+        assert rows_failed == 0
+
+
+def test_database_chunk_statement_sqlite3_error():
+    """Simulate a sqlite3 error when a chunk statement is executed and ensure it is logged."""
     data = [(1, "Alice", 30)]
+    sql_query = f"REPLACE INTO {test_table_name} (id, name, age) VALUES (?, ?, ?)"
 
-    # Simulate an error in the execute function
+    def execute(query, *args):
+        if query == sql_query:
+            raise sqlite3.Error("Simulated error")
+
+    # Simulate an error executing the chunk statement
     with patch("etl.db_utilities.sqlite3.connect", autospec=True) as mock_connect, \
             patch("etl.db_utilities.DB_LOCAL_PATH", test_db_path), \
             patch("etl.db_utilities.custom_logger") as mock_logger:
         mock_connection = mock_connect.return_value
         mock_enter_connection = mock_connection.__enter__.return_value
         mock_cursor = mock_enter_connection.cursor.return_value
-        mock_cursor.execute.side_effect = sqlite3.Error("Simulated error")
+        mock_cursor.execute.side_effect = execute
         rows_inserted, rows_failed = insert_or_replace_into_database(test_table_name, test_column_names, data)
 
-        mock_connect.assert_called_once_with(test_db_path)
+        mock_connect.assert_called_once_with(test_db_path, isolation_level=None)
         mock_enter_connection.cursor.assert_called_once()
-        mock_cursor.execute.assert_called_once_with(
-            f"REPLACE INTO {test_table_name} (id, name, age) VALUES (?, ?, ?)",
-            data[0]
-        )
-        mock_logger.assert_any_call(
-            WARNING_LOG_LEVEL,
-            f"Row 1 failed to insert due to a general database error: Simulated error. Row data: {data[0]}"
-        )
+        mock_logger.assert_any_call(WARNING_LOG_LEVEL, "Unexpected database error occurred: Simulated error")
         assert rows_inserted == 0
         assert rows_failed == 1
 
 
-def test_database_execute_IntegrityError_error():
-    """Simulate an IntegrityError error when execute is called and ensure it is logged."""
-    data = [(1, "Alice", 30)]
+@pytest.mark.parametrize(
+    "row_error,expected_log",
+    [
+        (sqlite3.IntegrityError("Simulated error"), "Row 1 failed to insert due to an integrity error: Simulated error."),
+        (sqlite3.Error("Simulated error"), "Row 1 failed to insert due to a general database error: Simulated error."),
+    ]
+)
+def test_database_execute_error_after_IntegrityError(row_error, expected_log):
+    """Simulate an IntegrityError from the chunk statement, then an error inserting each row on its own, ensure it is logged."""
+    data = [(1, "Alice", 30), (2, "Bob", 25)]
+    chunk_query = f"REPLACE INTO {test_table_name} (id, name, age) VALUES (?, ?, ?), (?, ?, ?)"
+    sql_query = f"REPLACE INTO {test_table_name} (id, name, age) VALUES (?, ?, ?)"
+
+    def execute(query, *args):
+        if query == chunk_query:
+            raise sqlite3.IntegrityError("Simulated error")
+        if query == sql_query:
+            raise row_error
 
-    # Simulate an error in the execute function
     with patch("etl.db_utilities.sqlite3.connect", autospec=True) as mock_connect, \
             patch("etl.db_utilities.DB_LOCAL_PATH", test_db_path), \
             patch("etl.db_utilities.custom_logger") as mock_logger:
         mock_connection = mock_connect.return_value
         mock_enter_connection = mock_connection.__enter__.return_value
         mock_cursor = mock_enter_connection.cursor.return_value
-        mock_cursor.execute.side_effect = sqlite3.IntegrityError("Simulated error")
+        mock_cursor.execute.side_effect = execute
         rows_inserted, rows_failed = insert_or_replace_into_database(test_table_name, test_column_names, data)
 
-        mock_connect.assert_called_once_with(test_db_path)
+        mock_connect.assert_called_once_with(test_db_path, isolation_level=None)
         mock_enter_connection.cursor.assert_called_once()
-        mock_cursor.execute.assert_called_once_with(
-            f"REPLACE INTO {test_table_name} (id, name, age) VALUES (?, ?, ?)",
-            data[0]
-        )
-        mock_logger.assert_any_call(
-            WARNING_LOG_LEVEL,
-            f"Row 1 failed to insert due to an integrity error: Simulated error. Row data: {data[0]}"
-        )
+        assert mock_cursor.execute.call_args_list == [
+            call("BEGIN"),
+            call("SAVEPOINT insert_chunk"),
+            call(chunk_query, [1, "Alice", 30, 2, "Bob", 25]),
+            call("ROLLBACK TO insert_chunk"),
+            call("SAVEPOINT insert_row"),
+            call(sql_query, data[0]),
+            call("ROLLBACK TO insert_row"),
+            call("RELEASE insert_row"),
+            call("SAVEPOINT insert_row"),
+            call(sql_query, data[1]),
+            call("ROLLBACK TO insert_row"),
+            call("RELEASE insert_row"),
+            call("RELEASE insert_chunk"),
+            call("COMMIT"),
+        ]
+        mock_logger.assert_any_call(WARNING_LOG_LEVEL, f"{expected_log} Row data: {data[0]}")
         assert rows_inserted == 0
-        assert rows_failed == 1
+        assert rows_failed == 2
@@ -1,4 +1,5 @@
 import socket
+from unittest.mock import ANY
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
@@ -28,12 +29,17 @@ def test_check_if_county_assessment_ratio_exists_matching_record():
     """Test when there is a matching record for rate_year and county_name."""
     test_rate_year = 2024
     test_county_name = "Cayuga"
-    mocked_query_result = [(test_rate_year, "050100", "Auburn", test_county_name, 88.00)]
+    mocked_query_result = [(1,)]
 
-    with patch("etl.open_ny_apis.municipality_assessment_ratios.execute_db_query", return_value=mocked_query_result):
+    with patch("etl.open_ny_apis.municipality_assessment_ratios.execute_db_query",
+               return_value=mocked_query_result) as mock_query:
         does_ratio_exist = check_if_county_assessment_ratio_exists(test_rate_year, test_county_name)
 
         assert does_ratio_exist is True
+        mock_query.assert_called_once_with(
+            f"SELECT 1 FROM {ASSESSMENT_RATIOS_TABLE} WHERE rate_year=? AND county_name=? LIMIT 1",
+            params=(test_rate_year, test_county_name),
+            fetch_results=True)
 
 
 def test_fetch_county_assessment_ratios_success():
@@ -75,6 +81,21 @@ def test_fetch_county_assessment_ratios_success():
             f"Fetching municipality assessment ratios for rate_year: {rate_year} and county_name: {county_name}")
 
 
+def test_fetch_county_assessment_ratios_reuses_given_client():
+    """Test a given client is used without creating or closing a new one."""
+    with patch("etl.open_ny_apis.municipality_assessment_ratios.custom_logger"), \
+            patch("etl.open_ny_apis.municipality_assessment_ratios.Socrata") as mock_socrata_client:
+        mock_client = MagicMock()
+        mock_client.get.return_value = [{"county_name": "Cayuga"}]
+
+        result = fetch_county_assessment_ratios("app_token", 2024, "Cayuga", client=mock_client)
+
+        assert result == [{"county_name": "Cayuga"}]
+        mock_socrata_client.assert_not_called()
+        mock_client.get.assert_called_once()
+        mock_client.close.assert_not_called()
+
+
 def test_fetch_county_assessment_ratios_failure():
     """Test failure behavior when Socrata API raises an exception."""
     with patch("etl.open_ny_apis.municipality_assessment_ratios.custom_logger") as mock_custom_logger, \
@@ -179,6 +200,10 @@ def test_fetch_municipality_assessment_ratios_data_not_exists():
         results = fetch_municipality_assessment_ratios(app_token, MINIMUM_ASSESSMENT_YEAR)
         expected_call_count = len(CNY_COUNTY_LIST) * (2024 - MINIMUM_ASSESSMENT_YEAR + 1)
         assert mock_fetch_county_ratios.call_count == expected_call_count
+        mock_fetch_county_ratios.assert_any_call(
+            app_token=app_token, rate_year=MINIMUM_ASSESSMENT_YEAR, county_name=CNY_COUNTY_LIST[0], client=ANY)
+        shared_clients = {id(fetch_call.kwargs["client"]) for fetch_call in mock_fetch_county_ratios.call_args_list}
+        assert len(shared_clients) == 1
         assert len(results) == expected_call_count * len(fake_response)
         assert results[0] == fake_response[0]
         mock_logger.assert_any_call(
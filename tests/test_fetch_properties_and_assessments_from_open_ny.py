@@ -1,7 +1,13 @@
 import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from unittest.mock import ANY
 from unittest.mock import MagicMock
+from unittest.mock import call
 from unittest.mock import patch
 
+import pytest
 from pydantic import ValidationError
 
 from etl.constants import INFO_LOG_LEVEL
@@ -10,10 +16,71 @@ from etl.constants import OPEN_NY_LIMIT_PER_PAGE
 from etl.constants import OPEN_NY_PROPERTY_ASSESSMENTS_API_ID
 from etl.constants import PROPERTIES_TABLE
 from etl.constants import WARNING_LOG_LEVEL
+from etl.open_ny_apis.property_assessments import build_property_assessments_where_clause
 from etl.open_ny_apis.property_assessments import check_if_property_assessments_exist
+from etl.open_ny_apis.property_assessments import deduplicate_property_assessments
 from etl.open_ny_apis.property_assessments import fetch_property_assessments
+from etl.open_ny_apis.property_assessments import fetch_property_assessments_count
 from etl.open_ny_apis.property_assessments import fetch_property_assessments_page
+from etl.open_ny_apis.property_assessments import iter_county_property_assessment_pages
 from etl.open_ny_apis.property_assessments import save_properties_and_assessments
+from etl.open_ny_apis.property_assessments import validate_property_assessments
+
+_INVALID_KEYS = {"invalid", "invalid1", "invalid2"}
+
+VALID_PROPERTY_ASSESSMENT = {
+    "roll_year": "2024",
+    "county_name": "Onondaga",
+    "municipality_code": "311500",
+    "municipality_name": "Syracuse",
+    "school_district_code": "311500",
+    "school_district_name": "Syracuse",
+    "swis_code": "311500",
+    "property_class": "210",
+    "property_class_description": "One Family Year-Round Residence",
+    "print_key_code": "001.1-01-21.0",
+    "parcel_address_number": "833",
+    "parcel_address_street": "Hiawatha",
+    "parcel_address_suff": "Blvd",
+    "front": "29",
+    "depth": "111.7",
+    "full_market_value": "9760",
+    "assessment_land": "7550",
+    "assessment_total": "0"
+}
+
+
+class _PropertyAssessmentStub:
+    """Plain stand-in for a validated NYPropertyAssessment, much cheaper per row than a MagicMock."""
+
+    @staticmethod
+    def to_properties_tuple() -> tuple:
+        return "value1", "value2"
+
+    @staticmethod
+    def to_ny_property_assessments_tuple() -> tuple:
+        return "valueA", "valueB"
+
+
+def _pages_by_county_and_offset(pages: dict):
+    """
+    Side effect for a mocked fetch_property_assessments_page keyed on (county_name, offset),
+    pages are fetched concurrently so an ordered side_effect list is not reliable.
+    """
+    def fetch_page(**kwargs):
+        return pages.get((kwargs["county_name"], kwargs["offset"]), [])
+
+    return fetch_page
+
+
+def _page_call(county_name: str, offset: int):
+    return call(
+        app_token="fake_token",
+        roll_year=2024,
+        county_name=county_name,
+        where_clause='roll_section = 1 AND property_class IN ("210", "220")',
+        offset=offset,
+        client=ANY)
 
 
 def test_check_if_property_assessments_exist_no_matching_record():
@@ -21,6 +88,7 @@ def test_check_if_property_assessments_exist_no_matching_record():
     test_rate_year = 2024
     test_county_name = "Oswego"
     mocked_query_result = [(0,)]
+    check_if_property_assessments_exist.cache_clear()
 
     with patch("etl.open_ny_apis.property_assessments.execute_db_query", return_value=mocked_query_result):
         does_county_roll_year_exist = check_if_property_assessments_exist(test_rate_year, test_county_name)
@@ -32,19 +100,43 @@ def test_check_if_property_assessments_exist_matching_record():
     test_rate_year = 2024
     test_county_name = "Oswego"
     mocked_query_result = [(1,)]
+    check_if_property_assessments_exist.cache_clear()
 
     with patch("etl.open_ny_apis.property_assessments.execute_db_query", return_value=mocked_query_result):
         does_county_roll_year_exist = check_if_property_assessments_exist(test_rate_year, test_county_name)
         assert does_county_roll_year_exist is True
 
 
+def test_check_if_property_assessments_exist_caches_result():
+    """Test repeated checks for the same roll year and county_name only query the database once."""
+    check_if_property_assessments_exist.cache_clear()
+
+    with patch("etl.open_ny_apis.property_assessments.execute_db_query", return_value=[(1,)]) as mock_query:
+        assert check_if_property_assessments_exist(2024, "Oswego") is True
+        assert check_if_property_assessments_exist(2024, "Oswego") is True
+        mock_query.assert_called_once()
+
+    check_if_property_assessments_exist.cache_clear()
+
+
+@patch("etl.open_ny_apis.property_assessments.check_if_property_assessments_exist")
+def test_save_properties_and_assessments_clears_exists_cache(mock_check, mock_assessment_env):
+    """Test saving new properties invalidates cached existence checks."""
+    _, mock_insert_db, _ = mock_assessment_env
+    mock_insert_db.return_value = [(1, 0), (1, 0)]
+
+    save_properties_and_assessments([{"key1": "value1"}])
+
+    mock_check.cache_clear.assert_called_once()
+
+
 @patch("etl.open_ny_apis.property_assessments.Socrata")
 @patch("etl.open_ny_apis.property_assessments.custom_logger")
 def test_fetch_property_assessments_page_success(mock_custom_logger, mock_socrata):
     mock_response = [{"print_key_code": "123"}, {"print_key_code": "456"}]
     mock_client = MagicMock()
     mock_client.get.return_value = mock_response
-    mock_socrata.return_value.__enter__.return_value = mock_client
+    mock_socrata.return_value = mock_client
     app_token = "fake_token"
     roll_year = 2024
     county_name = "Oswego"
@@ -67,15 +159,31 @@ def test_fetch_property_assessments_page_success(mock_custom_logger, mock_socrat
         order="swis_code,print_key_code ASC",
         where=where_clause
     )
+    mock_client.close.assert_called_once()
     assert result == mock_response
 
 
+@patch("etl.open_ny_apis.property_assessments.Socrata")
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+def test_fetch_property_assessments_page_reuses_given_client(mock_custom_logger, mock_socrata):
+    """Test a passed in client is used as is and left open for the next page."""
+    mock_client = MagicMock()
+    mock_client.get.return_value = [{"print_key_code": "123"}]
+
+    result = fetch_property_assessments_page("fake_token", 2024, "Oswego", "where_clause_example", 0, client=mock_client)
+
+    mock_socrata.assert_not_called()
+    mock_client.get.assert_called_once()
+    mock_client.close.assert_not_called()
+    assert result == [{"print_key_code": "123"}]
+
+
 @patch("etl.open_ny_apis.property_assessments.Socrata")
 @patch("etl.open_ny_apis.property_assessments.custom_logger")
 def test_fetch_property_assessments_page_exception(mock_custom_logger, mock_socrata):
     mock_client = MagicMock()
     mock_client.get.side_effect = Exception("API Error")
-    mock_socrata.return_value.__enter__.return_value = mock_client
+    mock_socrata.return_value = mock_client
     app_token = "fake_token"
     roll_year = 2024
     county_name = "Oswego"
@@ -96,7 +204,7 @@ def test_fetch_property_assessments_page_exception(mock_custom_logger, mock_socr
 def test_fetch_property_assessments_page_empty_response(mock_custom_logger, mock_socrata):
     mock_client = MagicMock()
     mock_client.get.return_value = []
-    mock_socrata.return_value.__enter__.return_value = mock_client
+    mock_socrata.return_value = mock_client
     app_token = "fake_token"
     roll_year = 2024
     county_name = "Oswego"
@@ -122,7 +230,7 @@ def test_fetch_property_assessments_page_retryable_error():
         offset = 0
         mock_client_instance = MagicMock()
         mock_client_instance.get.side_effect = socket.timeout
-        mock_socrata_client.return_value.__enter__.return_value = mock_client_instance
+        mock_socrata_client.return_value = mock_client_instance
 
         try:
             fetch_property_assessments_page(app_token, roll_year, county_name, where_clause, offset)
@@ -132,25 +240,27 @@ def test_fetch_property_assessments_page_retryable_error():
             assert False, "Retryable error did not propagate as expected"
 
 
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count")
 @patch("etl.open_ny_apis.property_assessments.custom_logger")
 @patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
 @patch("etl.open_ny_apis.property_assessments.check_if_property_assessments_exist")
 @patch("etl.open_ny_apis.property_assessments.get_ny_property_classes_for_where_clause")
 @patch("etl.open_ny_apis.property_assessments.save_properties_and_assessments")
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_LIMIT_PER_PAGE", new=1)
 @patch("etl.open_ny_apis.property_assessments.CNY_COUNTY_LIST", new_callable=lambda: ["County1", "County2"])
 def test_open_ny_apis_fetch_property_assessments_success_returns_all(
-    mock_county_list, mock_save, mock_get_property_classes, mock_check_if_exist, mock_fetch_page, mock_logger):
-    """Test successful fetching for all counties."""
+    mock_county_list, mock_save, mock_get_property_classes, mock_check_if_exist, mock_fetch_page, mock_logger,
+    mock_count):
+    """Test successful fetching for all counties, every page offset is requested from the total count."""
     mock_get_property_classes.return_value = "property_class IN (\"210\", \"220\")"
     mock_check_if_exist.return_value = False
-    mock_fetch_page.side_effect = [
-        [{"key": "property1"}],  # County1 page 1
-        [{"key": "property2"}],  # County1 page 2
-        [],  # County1 no more data
-        [{"key": "property3"}],  # County2 page 1
-        [{"key": "property4"}],  # County2 page 2
-        []  # County2 no more data
-    ]
+    mock_count.return_value = 2
+    mock_fetch_page.side_effect = _pages_by_county_and_offset({
+        ("County1", 0): [{"key": "property1"}],
+        ("County1", 1): [{"key": "property2"}],
+        ("County2", 0): [{"key": "property3"}],
+        ("County2", 1): [{"key": "property4"}],
+    })
     mock_save.return_value = 2
     app_token = "fake_token"
     query_year = 2024
@@ -163,10 +273,20 @@ def test_open_ny_apis_fetch_property_assessments_success_returns_all(
     mock_get_property_classes.assert_called_once()
     mock_check_if_exist.assert_any_call(query_year, "County1")
     mock_check_if_exist.assert_any_call(query_year, "County2")
-    assert mock_fetch_page.call_count == 6
+    mock_count.assert_any_call(ANY, query_year, "County1", 'roll_section = 1 AND property_class IN ("210", "220")')
+    # Total count of 2 at 1 per page, so exactly offsets 0 and 1 per county
+    assert mock_fetch_page.call_count == 4
+    mock_fetch_page.assert_has_calls(
+        [_page_call(county, offset) for county in ("County1", "County2") for offset in range(2)],
+        any_order=True)
+    assert mock_save.call_count == 4
+    mock_save.assert_has_calls(
+        [call([{"key": "property1"}]), call([{"key": "property2"}]),
+         call([{"key": "property3"}]), call([{"key": "property4"}])])
     assert result == 8
 
 
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count")
 @patch("etl.open_ny_apis.property_assessments.custom_logger")
 @patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
 @patch("etl.open_ny_apis.property_assessments.check_if_property_assessments_exist")
@@ -174,16 +294,17 @@ def test_open_ny_apis_fetch_property_assessments_success_returns_all(
 @patch("etl.open_ny_apis.property_assessments.save_properties_and_assessments")
 @patch("etl.open_ny_apis.property_assessments.CNY_COUNTY_LIST", new_callable=lambda: ["County1", "County2"])
 def test_open_ny_apis_fetch_property_assessments_skip_counties_with_existing_data(
-    mock_county_list, mock_save, mock_get_property_classes, mock_check_if_exist, mock_fetch_page, mock_logger):
+    mock_county_list, mock_save, mock_get_property_classes, mock_check_if_exist, mock_fetch_page, mock_logger,
+    mock_count):
     """Test that counties with existing data are skipped."""
     mock_get_property_classes.return_value = "property_class IN (\"210\", \"220\")"
+    mock_count.return_value = 1
 
     # First county has data, second doesn't
     mock_check_if_exist.side_effect = [True, False]
-    mock_fetch_page.side_effect = [
-        [{"key": "property_from_county2"}],
-        []
-    ]
+    mock_fetch_page.side_effect = _pages_by_county_and_offset({
+        ("County2", 0): [{"key": "property_from_county2"}],
+    })
     mock_save.return_value = 1
     app_token = "fake_token"
     query_year = 2024
@@ -194,36 +315,49 @@ def test_open_ny_apis_fetch_property_assessments_skip_counties_with_existing_dat
         INFO_LOG_LEVEL,
         "Property assessments for county_name: County1 in roll year 2024 already exist, ending."
     )
-    # Skipped County1; only fetched for County2
-    assert mock_fetch_page.call_count == 2
+    # Skipped County1; only fetched for County2, a short first page means there are no more pages
+    assert mock_fetch_page.call_count == 1
     assert result == 1
 
 
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count")
 @patch("etl.open_ny_apis.property_assessments.custom_logger")
 @patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
 @patch("etl.open_ny_apis.property_assessments.check_if_property_assessments_exist")
 @patch("etl.open_ny_apis.property_assessments.get_ny_property_classes_for_where_clause")
 @patch("etl.open_ny_apis.property_assessments.save_properties_and_assessments")
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_MAX_CONCURRENT_PAGES", new=4)
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_LIMIT_PER_PAGE", new=1)
 @patch("etl.open_ny_apis.property_assessments.CNY_COUNTY_LIST", new_callable=lambda: ["County1"])
 def test_open_ny_apis_fetch_property_assessments_empty_responses_end_fetching(
-    mock_county_list, mock_save, mock_get_property_classes, mock_check_if_exist, mock_fetch_page, mock_logger):
-    """Test function handles None API responses gracefully."""
+    mock_county_list, mock_save, mock_get_property_classes, mock_check_if_exist, mock_fetch_page, mock_logger,
+    mock_count):
+    """
+    Test function handles None API responses gracefully when the total count is unavailable
+    and pages are fetched until one comes back short.
+    """
     mock_get_property_classes.return_value = "property_class IN (\"210\", \"220\")"
+    mock_count.return_value = None
     mock_check_if_exist.return_value = False
-    mock_fetch_page.side_effect = [
-        [{"key": "property1"}],
-        None
-    ]
+    mock_fetch_page.side_effect = _pages_by_county_and_offset({
+        ("County1", 0): [{"key": "property1"}],
+        ("County1", 1): None,
+        ("County1", 2): [{"key": "property3"}],
+    })
     mock_save.return_value = 1
     app_token = "fake_token"
     query_year = 2024
 
     result = fetch_property_assessments(app_token, query_year)
 
-    assert mock_fetch_page.call_count == 2
+    assert 2 <= mock_fetch_page.call_count <= 5
+    # Pages after a failed page are discarded
+    mock_save.assert_called_once_with([{"key": "property1"}])
+    mock_logger.assert_any_call(INFO_LOG_LEVEL, "No more property assessments for county_name: County1, ending.")
     assert result == 1
 
 
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count", return_value=1)
 @patch("etl.open_ny_apis.property_assessments.check_if_property_assessments_exist")
 @patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
 @patch("etl.open_ny_apis.property_assessments.save_properties_and_assessments")
@@ -235,15 +369,14 @@ def test_open_ny_apis_fetch_property_assessments_where_clause_construction(
         mock_get_property_classes,
         mock_save_properties,
         mock_fetch_page,
-        mock_check_if_exist):
+        mock_check_if_exist,
+        mock_count):
     mock_get_property_classes.return_value = 'property_class IN ("210", "220")'
     mock_check_if_exist.side_effect = [False, False]
-    mock_fetch_page.side_effect = [
-        [{"property": "data1"}],  # Response for first fetch (County 1, Page 1)
-        [],  # No more data for County 1
-        [{"property": "data2"}],  # Response for first fetch (County 2, Page 1)
-        []  # No more data for County 2
-    ]
+    mock_fetch_page.side_effect = _pages_by_county_and_offset({
+        ("Onondaga", 0): [{"property": "data1"}],  # Only page for County 1
+        ("Oswego", 0): [{"property": "data2"}],  # Only page for County 2
+    })
     mock_save_properties.side_effect = lambda data: len(data)
     app_token = "fake_token"
     query_year = 2024
@@ -255,20 +388,22 @@ def test_open_ny_apis_fetch_property_assessments_where_clause_construction(
         '\nwhere_clause built: roll_section = 1 AND property_class IN ("210", "220")\n'
     )
     mock_get_property_classes.assert_called_once()
-    assert mock_fetch_page.call_count == 4
+    assert mock_fetch_page.call_count == 2
     mock_fetch_page.assert_any_call(
         app_token=app_token,
         roll_year=query_year,
         county_name="Onondaga",
         where_clause='roll_section = 1 AND property_class IN ("210", "220")',
-        offset=0
+        offset=0,
+        client=ANY
     )
     mock_fetch_page.assert_any_call(
         app_token=app_token,
         roll_year=query_year,
         county_name="Oswego",
         where_clause='roll_section = 1 AND property_class IN ("210", "220")',
-        offset=0
+        offset=0,
+        client=ANY
     )
     assert mock_save_properties.call_count == 2
     mock_save_properties.assert_any_call([{"property": "data1"}])
@@ -276,129 +411,419 @@ def test_open_ny_apis_fetch_property_assessments_where_clause_construction(
     assert num_properties_saved == 2
 
 
-@patch("etl.open_ny_apis.property_assessments.NYPropertyAssessment")
-@patch("etl.open_ny_apis.property_assessments.insert_or_replace_into_database")
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count", return_value=None)
 @patch("etl.open_ny_apis.property_assessments.custom_logger")
-def test_save_properties_and_assessments_successful_validation_and_insertion(mock_logger, mock_insert_db, mock_model):
-    """Test when all properties are valid and inserted successfully."""
-    mock_instance = MagicMock()
-    mock_instance.to_properties_row.return_value = {"column1": "value1", "column2": "value2"}
-    mock_instance.to_ny_property_assessments_row.return_value = {"columnA": "valueA", "columnB": "valueB"}
-    mock_model.side_effect = lambda **kwargs: mock_instance
-    mock_insert_db.return_value = (10, 0)
-    all_properties = [{"key1": "value1"}, {"key2": "value2"}]
-
-    save_properties_and_assessments(all_properties)
-
-    mock_model.assert_called()
-    mock_instance.to_properties_row.assert_called()
-    mock_instance.to_ny_property_assessments_row.assert_called()
-    mock_insert_db.assert_any_call(
-        PROPERTIES_TABLE,
-        ["column1", "column2"],
-        [("value1", "value2"), ("value1", "value2")])
-    mock_insert_db.assert_any_call(
-        NY_PROPERTY_ASSESSMENTS_TABLE,
-        ["columnA", "columnB"],
-        [("valueA", "valueB"), ("valueA", "valueB")])
-    mock_logger.assert_any_call(INFO_LOG_LEVEL, "Completed saving 2 valid properties rows_inserted: 10, rows_failed: 0.")
-    mock_logger.assert_any_call(
-        INFO_LOG_LEVEL,
-        "Completed saving 2 valid ny_property_assessment_data rows_inserted: 10, rows_failed: 0.")
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_MAX_CONCURRENT_PAGES", new=2)
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_LIMIT_PER_PAGE", new=1)
+def test_iter_county_property_assessment_pages_yields_pages_in_offset_order(mock_fetch_page, mock_logger, mock_count):
+    """Test county pages are yielded one at a time in offset order until a short page when the count is unknown."""
+    mock_fetch_page.side_effect = _pages_by_county_and_offset({
+        ("Oswego", 0): [{"key": "property1"}],
+        ("Oswego", 1): [{"key": "property2"}],
+        ("Oswego", 2): [{"key": "property3"}],
+    })
 
+    mock_client = MagicMock()
 
-@patch("etl.open_ny_apis.property_assessments.NYPropertyAssessment")
-@patch("etl.open_ny_apis.property_assessments.insert_or_replace_into_database")
-@patch("etl.open_ny_apis.property_assessments.custom_logger")
-def test_save_properties_and_assessments_partial_validation_failure(mock_logger, mock_insert_db, mock_model):
-    """Test partial validation failure, where some properties are invalid."""
-    mock_instance = MagicMock()
-    mock_instance.to_properties_row.return_value = {"column1": "value1", "column2": "value2"}
-    mock_instance.to_ny_property_assessments_row.return_value = {"columnA": "valueA", "columnB": "valueB"}
-
-    def side_effect(**kwargs):
-        if "invalid" in kwargs["key1"]:
-            raise ValidationError.from_exception_data(
-                title='Validation Error',
-                line_errors=[{
-                    'loc': ('key1',),
-                    'msg': 'Invalid field',
-                    'type': 'value_error',
-                    'ctx': {'error': 'Invalid field'}
-                }]
-            )
-
-        return mock_instance
-
-    mock_model.side_effect = side_effect
-    mock_insert_db.return_value = (1, 0)
-    all_properties = [{"key1": "valid1"}, {"key1": "valid2"}, {"key1": "invalid"}]
-
-    save_properties_and_assessments(all_properties)
-
-    assert mock_model.call_count == 3
-    mock_logger.assert_any_call(INFO_LOG_LEVEL,
-                                "Completed saving 2 valid ny_property_assessment_data rows_inserted: 1, rows_failed: 0.")
-    mock_logger.assert_any_call(WARNING_LOG_LEVEL, "Failed to validate property assessment:")
-    mock_logger.assert_any_call(WARNING_LOG_LEVEL, "- Error: Field: key1. Message: Value error, Invalid field")
-    mock_insert_db.assert_any_call(
-        PROPERTIES_TABLE,
-        ["column1", "column2"],
-        [("value1", "value2"), ("value1", "value2")])
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pages = iter_county_property_assessment_pages(
+            executor, lambda: mock_client, "fake_token", 2024, "Oswego", "roll_section = 1")
+        first_page = next(pages)
+        remaining_pages = list(pages)
 
+    assert first_page == [{"key": "property1"}]
+    assert remaining_pages == [[{"key": "property2"}], [{"key": "property3"}]]
+    assert all(page_call.kwargs["client"] is mock_client for page_call in mock_fetch_page.call_args_list)
+    mock_logger.assert_called_once_with(INFO_LOG_LEVEL, "No more property assessments for county_name: Oswego, ending.")
 
-@patch("etl.open_ny_apis.property_assessments.NYPropertyAssessment")
-@patch("etl.open_ny_apis.property_assessments.insert_or_replace_into_database")
+
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count", return_value=None)
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_MAX_CONCURRENT_PAGES", new=2)
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_LIMIT_PER_PAGE", new=1)
+def test_iter_county_property_assessment_pages_window_stops_at_empty_page(mock_fetch_page, mock_logger, mock_count):
+    """Test the unknown count window keeps requests in flight past the first page and stops at an empty page."""
+    mock_fetch_page.side_effect = _pages_by_county_and_offset({
+        ("Oswego", 0): [{"key": "property1"}],
+        ("Oswego", 1): [{"key": "property2"}],
+    })
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pages = list(iter_county_property_assessment_pages(
+            executor, MagicMock(), "fake_token", 2024, "Oswego", "roll_section = 1"))
+
+    assert pages == [[{"key": "property1"}], [{"key": "property2"}]]
+    offsets = sorted(page_call.kwargs["offset"] for page_call in mock_fetch_page.call_args_list)
+    # The request after the empty page may have started before it was cancelled
+    assert offsets[:3] == [0, 1, 2]
+    assert set(offsets) <= {0, 1, 2, 3}
+
+
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count", return_value=5)
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_MAX_CONCURRENT_PAGES", new=2)
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_LIMIT_PER_PAGE", new=1)
+def test_iter_county_property_assessment_pages_known_count_window_waits_for_consumer(
+        mock_fetch_page, mock_logger, mock_count):
+    """Test only a window of pages is requested ahead of a consumer that has not asked for more."""
+    mock_fetch_page.side_effect = lambda **kwargs: [{"key": f"property{kwargs['offset']}"}]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pages = iter_county_property_assessment_pages(
+            executor, MagicMock(), "fake_token", 2024, "Oswego", "roll_section = 1")
+        first_page = next(pages)
+        # Let every request submitted so far finish before counting them
+        executor.shutdown(wait=True)
+        offsets = sorted(page_call.kwargs["offset"] for page_call in mock_fetch_page.call_args_list)
+        pages.close()
+
+    assert first_page == [{"key": "property0"}]
+    assert offsets == [0, 1]
+
+
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count", return_value=3)
 @patch("etl.open_ny_apis.property_assessments.custom_logger")
-def test_save_properties_and_assessments_all_validation_failures(mock_logger, mock_insert_db, mock_model):
-    """Test when all properties fail validation."""
-    mock_model.side_effect = ValidationError.from_exception_data(
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_MAX_CONCURRENT_PAGES", new=1)
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_LIMIT_PER_PAGE", new=1)
+def test_iter_county_property_assessment_pages_known_count_stops_at_failed_page(mock_fetch_page, mock_logger, mock_count):
+    """Test page offsets come from the total count and a failed page ends the county without the pages after it."""
+    mock_fetch_page.side_effect = _pages_by_county_and_offset({
+        ("Oswego", 0): [{"key": "property1"}],
+        ("Oswego", 1): None,
+        ("Oswego", 2): [{"key": "property3"}],
+    })
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pages = list(iter_county_property_assessment_pages(
+            executor, MagicMock(), "fake_token", 2024, "Oswego", "roll_section = 1"))
+
+    assert pages == [[{"key": "property1"}]]
+    # The page after the failed page is never requested
+    assert [page_call.kwargs["offset"] for page_call in mock_fetch_page.call_args_list] == [0, 1]
+    mock_logger.assert_any_call(INFO_LOG_LEVEL, "Found 3 property assessments for county_name: Oswego, fetching 3 pages.")
+    mock_logger.assert_any_call(
+        WARNING_LOG_LEVEL,
+        "Failed fetching page 2 of property assessments for county_name: Oswego, ending county early.")
+
+
+def _validation_error(invalid_indexes: List[int]) -> ValidationError:
+    return ValidationError.from_exception_data(
         title='Validation Error',
         line_errors=[{
-            'loc': ('key1',),
+            'loc': (index, 'key1'),
             'msg': 'Invalid field',
             'type': 'value_error',
             'ctx': {'error': 'Invalid field'}
-        }]
+        } for index in invalid_indexes]
     )
-    all_properties = [{"key1": "invalid1"}, {"key1": "invalid2"}]
 
-    save_properties_and_assessments(all_properties)
 
-    assert mock_model.call_count == 2
-    mock_logger.assert_any_call(INFO_LOG_LEVEL, "No valid properties found, skipping saving to database.")
-    mock_insert_db.assert_not_called()
+def _validate_unless_invalid(rows):
+    """Batch adapter side effect failing validation only for rows whose key1 is listed in _INVALID_KEYS."""
+    invalid_indexes = [index for index, row in enumerate(rows) if row.get("key1") in _INVALID_KEYS]
+
+    if invalid_indexes:
+        raise _validation_error(invalid_indexes)
+
+    return [_PropertyAssessmentStub() for _ in rows]
+
+
+@pytest.fixture
+def mock_assessment_env():
+    """Patch the logger, database insert, batch validation and model used by save_properties_and_assessments."""
+    with (patch("etl.open_ny_apis.property_assessments.custom_logger") as mock_logger,
+          patch("etl.open_ny_apis.property_assessments.insert_or_replace_into_database_tables") as mock_insert_db,
+          patch("etl.open_ny_apis.property_assessments.property_assessments_adapter") as mock_adapter,
+          patch("etl.open_ny_apis.property_assessments.NYPropertyAssessment") as mock_model):
+        mock_model.PROPERTIES_COLUMNS = ("column1", "column2")
+        mock_model.NY_PROPERTY_ASSESSMENTS_COLUMNS = ("columnA", "columnB")
+        mock_adapter.validate_python.side_effect = _validate_unless_invalid
+        yield mock_logger, mock_insert_db, mock_adapter
+
+
+@pytest.mark.parametrize(
+    "input_rows,insert_results,expected_validate_calls,expected_insert_calls,expected_logs",
+    [
+        pytest.param(
+            [{"key1": "value1"}, {"key2": "value2"}],
+            [(10, 0), (10, 0)],
+            1,
+            [call([
+                (PROPERTIES_TABLE, ["column1", "column2"], [("value1", "value2"), ("value1", "value2")]),
+                (NY_PROPERTY_ASSESSMENTS_TABLE, ["columnA", "columnB"], [("valueA", "valueB"), ("valueA", "valueB")]),
+            ])],
+            [
+                call(INFO_LOG_LEVEL, "Completed saving 2 valid properties rows_inserted: 10, rows_failed: 0."),
+                call(INFO_LOG_LEVEL, "Completed saving 2 valid ny_property_assessment_data rows_inserted: 10, rows_failed: 0."),
+            ],
+            id="success",
+        ),
+        pytest.param(
+            [{"key1": "valid1"}, {"key1": "valid2"}, {"key1": "invalid"}],
+            [(1, 0), (1, 0)],
+            2,
+            [call([
+                (PROPERTIES_TABLE, ["column1", "column2"], [("value1", "value2"), ("value1", "value2")]),
+                (NY_PROPERTY_ASSESSMENTS_TABLE, ["columnA", "columnB"], [("valueA", "valueB"), ("valueA", "valueB")]),
+            ])],
+            [
+                call(INFO_LOG_LEVEL, "Completed saving 2 valid ny_property_assessment_data rows_inserted: 1, rows_failed: 0."),
+                call(WARNING_LOG_LEVEL, "Failed to validate 1 of 3 property assessments:"),
+                call(WARNING_LOG_LEVEL, "- Error: Field: key1. Message: Value error, Invalid field. Rows: 1"),
+            ],
+            id="partial_validation_failure",
+        ),
+        pytest.param(
+            [{"key1": "invalid1"}, {"key1": "invalid2"}],
+            [],
+            1,
+            [],
+            [
+                call(WARNING_LOG_LEVEL, "Failed to validate 2 of 2 property assessments:"),
+                call(WARNING_LOG_LEVEL, "- Error: Field: key1. Message: Value error, Invalid field. Rows: 2"),
+                call(INFO_LOG_LEVEL, "No valid properties found, skipping saving to database."),
+            ],
+            id="all_validation_failures",
+        ),
+        pytest.param(
+            [],
+            [],
+            0,
+            [],
+            [call(INFO_LOG_LEVEL, "No valid properties found, skipping saving to database.")],
+            id="empty_input_list",
+        ),
+        pytest.param(
+            [{"key1": "valid"}],
+            [(0, 1), (0, 1)],
+            1,
+            [call([
+                (PROPERTIES_TABLE, ["column1", "column2"], [("value1", "value2")]),
+                (NY_PROPERTY_ASSESSMENTS_TABLE, ["columnA", "columnB"], [("valueA", "valueB")]),
+            ])],
+            [
+                call(INFO_LOG_LEVEL, "Completed saving 1 valid properties rows_inserted: 0, rows_failed: 1."),
+                call(INFO_LOG_LEVEL, "Completed saving 1 valid ny_property_assessment_data rows_inserted: 0, rows_failed: 1."),
+            ],
+            id="database_failure",
+        ),
+        pytest.param(
+            [{"key1": "valid1"}, {"key1": "valid2"}],
+            [(1, 1), (1, 1)],
+            1,
+            [call([
+                (PROPERTIES_TABLE, ["column1", "column2"], [("value1", "value2"), ("value1", "value2")]),
+                (NY_PROPERTY_ASSESSMENTS_TABLE, ["columnA", "columnB"], [("valueA", "valueB"), ("valueA", "valueB")]),
+            ])],
+            [call(INFO_LOG_LEVEL, "Completed saving 2 valid ny_property_assessment_data rows_inserted: 1, rows_failed: 1.")],
+            id="partial_database_failure",
+        ),
+    ]
+)
+def test_save_properties_and_assessments(
+        mock_assessment_env, input_rows, insert_results, expected_validate_calls, expected_insert_calls,
+        expected_logs):
+    """
+    Test validating and saving properties across success, validation failure and database failure scenarios.
+    Pages are validated through the (mocked) batch adapter, a page with invalid rows is validated once more without them.
+    """
+    mock_logger, mock_insert_db, mock_adapter = mock_assessment_env
+    mock_insert_db.return_value = insert_results
+
+    save_properties_and_assessments(input_rows)
+
+    assert mock_adapter.validate_python.call_count == expected_validate_calls
+    assert mock_insert_db.call_args_list == expected_insert_calls
+    for expected_log in expected_logs:
+        assert expected_log in mock_logger.call_args_list
 
 
 @patch("etl.open_ny_apis.property_assessments.NYPropertyAssessment")
-@patch("etl.open_ny_apis.property_assessments.insert_or_replace_into_database")
 @patch("etl.open_ny_apis.property_assessments.custom_logger")
-def test_save_properties_and_assessments_empty_input_list(mock_logger, mock_insert_db, mock_model):
-    """Test when the input list is empty."""
-    save_properties_and_assessments([])
+def test_validate_property_assessments_valid_page_validated_as_batch(mock_logger, mock_model):
+    """Test a fully valid page is validated in one batch without per-row model validation."""
+    second_property = {**VALID_PROPERTY_ASSESSMENT, "print_key_code": "001.1-01-22.0"}
 
-    mock_model.assert_not_called()
-    mock_insert_db.assert_not_called()
-    mock_logger.assert_any_call(INFO_LOG_LEVEL, "No valid properties found, skipping saving to database.")
+    result = validate_property_assessments([VALID_PROPERTY_ASSESSMENT, second_property])
+
+    mock_model.model_validate.assert_not_called()
+    mock_logger.assert_not_called()
+    assert [model.generate_properties_id() for model in result] == ["311500 001.1-01-21.0", "311500 001.1-01-22.0"]
 
 
-@patch("etl.open_ny_apis.property_assessments.NYPropertyAssessment")
-@patch("etl.open_ny_apis.property_assessments.insert_or_replace_into_database")
 @patch("etl.open_ny_apis.property_assessments.custom_logger")
-def test_save_properties_and_assessments_database_failure_handling(mock_logger, mock_insert_db, mock_model):
-    """Test when database insertion fails."""
-    mock_instance = MagicMock()
-    mock_instance.to_properties_row.return_value = {"column1": "value1", "column2": "value2"}
-    mock_instance.to_ny_property_assessments_row.return_value = {"columnA": "valueA", "columnB": "valueB"}
-    mock_model.side_effect = lambda **kwargs: mock_instance
-    mock_insert_db.return_value = (0, 1)
-    all_properties = [{"key1": "valid"}]
+def test_validate_property_assessments_invalid_rows_logged_as_summary(mock_logger):
+    """Test valid rows survive a partially invalid page and the batch errors are logged as a summary."""
+    invalid_property = {**VALID_PROPERTY_ASSESSMENT, "full_market_value": "-1"}
 
-    save_properties_and_assessments(all_properties)
+    result = validate_property_assessments([VALID_PROPERTY_ASSESSMENT, invalid_property])
 
-    mock_logger.assert_any_call(
-        INFO_LOG_LEVEL,
-        "Completed saving 1 valid properties rows_inserted: 0, rows_failed: 1.")
-    mock_logger.assert_any_call(
-        INFO_LOG_LEVEL,
-        "Completed saving 1 valid ny_property_assessment_data rows_inserted: 0, rows_failed: 1.")
+    assert len(result) == 1
+    assert result[0].full_market_value == 9760
+    assert mock_logger.call_args_list == [
+        call(WARNING_LOG_LEVEL, "Failed to validate 1 of 2 property assessments:"),
+        call(WARNING_LOG_LEVEL, "- Error: Field: full_market_value. Message: Input should be greater than or equal to 0. Rows: 1"),
+    ]
+
+
+def test_build_property_assessments_where_clause():
+    """Test where clause with and without property classes, repeated builds return the cached string."""
+    build_property_assessments_where_clause.cache_clear()
+
+    assert build_property_assessments_where_clause("") == "roll_section = 1"
+    where_clause = build_property_assessments_where_clause('property_class IN ("210")')
+    assert where_clause == 'roll_section = 1 AND property_class IN ("210")'
+    assert build_property_assessments_where_clause('property_class IN ("210")') is where_clause
+    assert build_property_assessments_where_clause.cache_info().hits == 1
+
+
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+def test_fetch_property_assessments_count_success(mock_logger):
+    """Test the count(*) query is made with the county filters and parsed to an int."""
+    mock_client = MagicMock()
+    mock_client.get.return_value = [{"count": "2500"}]
+
+    result = fetch_property_assessments_count(mock_client, 2024, "Oswego", "roll_section = 1")
+
+    mock_client.get.assert_called_once_with(
+        OPEN_NY_PROPERTY_ASSESSMENTS_API_ID,
+        select="count(*)",
+        roll_year=2024,
+        county_name="Oswego",
+        roll_section=1,
+        where="roll_section = 1"
+    )
+    assert result == 2500
+
+
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+def test_fetch_property_assessments_count_exception(mock_logger):
+    """Test a failed count query logs a warning and returns None."""
+    mock_client = MagicMock()
+    mock_client.get.side_effect = Exception("API Error")
+
+    result = fetch_property_assessments_count(mock_client, 2024, "Oswego", "roll_section = 1")
+
+    mock_logger.assert_called_once_with(
+        WARNING_LOG_LEVEL,
+        "Failed fetching property assessments count for county_name: Oswego. Error: API Error")
+    assert result is None
+
+
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+def test_deduplicate_property_assessments_drops_repeated_parcels(mock_logger):
+    """Test repeated swis_code and print_key_code pairs are dropped, same print_key_code in another municipality is kept."""
+    first = {"swis_code": "311500", "print_key_code": "001.-01-01.0", "owner": "first"}
+    repeat = {"swis_code": "311500", "print_key_code": "001.-01-01.0", "owner": "repeat"}
+    other_municipality = {"swis_code": "312000", "print_key_code": "001.-01-01.0"}
+    missing_key = {"swis_code": "311500"}
+
+    result = deduplicate_property_assessments([first, repeat, other_municipality, missing_key, missing_key])
+
+    assert result == [first, other_municipality, missing_key, missing_key]
+    mock_logger.assert_called_once_with(INFO_LOG_LEVEL, "Deduplicated 1 rows before validation.")
+
+
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+def test_deduplicate_property_assessments_no_duplicates(mock_logger):
+    """Test unique rows are returned unchanged without logging."""
+    all_properties = [VALID_PROPERTY_ASSESSMENT, {**VALID_PROPERTY_ASSESSMENT, "print_key_code": "001.1-01-22.0"}]
+
+    assert deduplicate_property_assessments(all_properties) == all_properties
+    mock_logger.assert_not_called()
+
+
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count", return_value=2)
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
+@patch("etl.open_ny_apis.property_assessments.check_if_property_assessments_exist", return_value=False)
+@patch("etl.open_ny_apis.property_assessments.get_ny_property_classes_for_where_clause", return_value="")
+@patch("etl.open_ny_apis.property_assessments.save_properties_and_assessments")
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_LIMIT_PER_PAGE", new=1)
+@patch("etl.open_ny_apis.property_assessments.CNY_COUNTY_LIST", new=["County1"])
+def test_open_ny_apis_fetch_property_assessments_saves_while_fetching(
+    mock_save, mock_get_property_classes, mock_check_if_exist, mock_fetch_page, mock_logger, mock_count):
+    """Test the first page is saved while the last page is still being fetched."""
+    first_page_saved = threading.Event()
+    saved_before_last_page_returned = []
+
+    def fetch_page(**kwargs):
+        if kwargs["offset"] == 1:
+            saved_before_last_page_returned.append(first_page_saved.wait(timeout=5))
+
+        return [{"key": f"property{kwargs['offset']}"}]
+
+    def save(property_results):
+        first_page_saved.set()
+        return len(property_results)
+
+    mock_fetch_page.side_effect = fetch_page
+    mock_save.side_effect = save
+
+    result = fetch_property_assessments("fake_token", 2024)
+
+    assert saved_before_last_page_returned == [True]
+    assert result == 2
+
+
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count", return_value=1)
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page", side_effect=socket.timeout)
+@patch("etl.open_ny_apis.property_assessments.check_if_property_assessments_exist", return_value=False)
+@patch("etl.open_ny_apis.property_assessments.get_ny_property_classes_for_where_clause", return_value="")
+@patch("etl.open_ny_apis.property_assessments.save_properties_and_assessments")
+@patch("etl.open_ny_apis.property_assessments.CNY_COUNTY_LIST", new=["County1"])
+def test_open_ny_apis_fetch_property_assessments_raises_fetch_errors(
+    mock_save, mock_get_property_classes, mock_check_if_exist, mock_fetch_page, mock_logger, mock_count):
+    """Test an error raised while fetching pages on the producer thread is raised to the caller."""
+    with pytest.raises(socket.timeout):
+        fetch_property_assessments("fake_token", 2024)
+
+    mock_save.assert_not_called()
+
+
+@patch("etl.open_ny_apis.property_assessments.get_open_ny_socrata_client")
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_count", return_value=2)
+@patch("etl.open_ny_apis.property_assessments.custom_logger")
+@patch("etl.open_ny_apis.property_assessments.fetch_property_assessments_page")
+@patch("etl.open_ny_apis.property_assessments.check_if_property_assessments_exist", return_value=False)
+@patch("etl.open_ny_apis.property_assessments.get_ny_property_classes_for_where_clause", return_value="")
+@patch("etl.open_ny_apis.property_assessments.save_properties_and_assessments", return_value=1)
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_MAX_CONCURRENT_PAGES", new=2)
+@patch("etl.open_ny_apis.property_assessments.OPEN_NY_LIMIT_PER_PAGE", new=1)
+@patch("etl.open_ny_apis.property_assessments.CNY_COUNTY_LIST", new=["County1"])
+def test_open_ny_apis_fetch_property_assessments_client_per_thread(
+    mock_save, mock_get_property_classes, mock_check_if_exist, mock_fetch_page, mock_logger, mock_count,
+    mock_get_client):
+    """Test each worker thread fetches pages with its own client and every client is closed at the end."""
+    created_clients = []
+
+    def create_client(app_token):
+        created_clients.append(MagicMock())
+        return created_clients[-1]
+
+    mock_get_client.side_effect = create_client
+    both_pages_in_flight = threading.Barrier(2, timeout=5)
+    page_clients = []
+
+    def fetch_page(**kwargs):
+        # Hold both page requests open at once so they run on two worker threads
+        both_pages_in_flight.wait()
+        page_clients.append((kwargs["client"], threading.get_ident()))
+        return [{"key": f"property{kwargs['offset']}"}]
+
+    mock_fetch_page.side_effect = fetch_page
+
+    fetch_property_assessments("fake_token", 2024)
+
+    # Two worker threads, each with a client no other thread used
+    assert len({thread_id for _, thread_id in page_clients}) == 2
+    assert len({id(client) for client, _ in page_clients}) == 2
+    assert all(client in created_clients for client, _ in page_clients)
+
+    for client in created_clients:
+        client.close.assert_called_once()
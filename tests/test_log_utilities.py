@@ -1,3 +1,4 @@
+from unittest.mock import MagicMock
 from unittest.mock import patch
 
 from etl.constants import DEBUG_LOG_LEVEL
@@ -5,6 +6,7 @@ from etl.constants import ERROR_LOG_LEVEL
 from etl.constants import INFO_LOG_LEVEL
 from etl.constants import WARNING_LOG_LEVEL
 from etl.log_utilities import custom_logger
+from etl.log_utilities import custom_logger_lazy
 from etl.log_utilities import log_retry
 
 
@@ -42,6 +44,30 @@ def test_custom_logger_warning_annotations():
         mock_print.assert_called_once_with(f"::warning::{message}")
 
 
+@patch("etl.log_utilities.minimum_log_level_order", new=2)
+def test_custom_logger_skips_levels_below_minimum():
+    """Test messages below the minimum log level are not printed."""
+    with patch("builtins.print") as mock_print:
+        custom_logger(INFO_LOG_LEVEL, "Skipped info message.")
+        custom_logger(WARNING_LOG_LEVEL, "Logged warning message.")
+        mock_print.assert_called_once_with("::warning::Logged warning message.")
+
+
+@patch("etl.log_utilities.minimum_log_level_order", new=2)
+def test_custom_logger_lazy_only_builds_enabled_messages():
+    """Test custom_logger_lazy does not build messages below the minimum log level."""
+    build_info_message = MagicMock(return_value="Skipped info message.")
+    build_error_message = MagicMock(return_value="Logged error message.")
+
+    with patch("builtins.print") as mock_print:
+        custom_logger_lazy(INFO_LOG_LEVEL, build_info_message)
+        custom_logger_lazy(ERROR_LOG_LEVEL, build_error_message)
+
+    build_info_message.assert_not_called()
+    build_error_message.assert_called_once()
+    mock_print.assert_called_once_with("::error::Logged error message.")
+
+
 def test_log_retry_logs_correct_message():
     """Test that log_retry logs the correct retry message using custom_logger."""
     retry_details = {
@@ -60,3 +86,12 @@ def test_log_retry_logs_correct_message():
     with patch("etl.log_utilities.custom_logger") as mock_logger:
         log_retry(retry_details)
         mock_logger.assert_called_once_with(INFO_LOG_LEVEL, expected_message)
+
+
+@patch("etl.log_utilities.minimum_log_level_order", new=2)
+def test_log_retry_skips_formatting_below_minimum_level():
+    """Test log_retry does not format or log its message when info messages are skipped."""
+    with patch("etl.log_utilities.custom_logger") as mock_logger:
+        # Missing keys would raise KeyError if the message were formatted
+        log_retry({})
+        mock_logger.assert_not_called()
@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock
+from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
@@ -7,6 +7,7 @@ from etl.constants import MINIMUM_ASSESSMENT_YEAR
 from etl.constants import WARNING_LOG_LEVEL
 from etl.property_utilities import get_assessment_year_to_query
 from etl.property_utilities import get_ny_property_category_for_property_class
+from etl.property_utilities import get_ny_property_class_index
 from etl.property_utilities import get_ny_property_classes_for_where_clause
 from etl.property_utilities import get_open_ny_app_token
 
@@ -48,12 +49,27 @@ PROPERTY_CATEGORY_DESCRIPTIONS = {
 }
 
 
+@pytest.fixture(scope="module")
+def patch_static_constants():
+    """Patch constants no test changes once for the whole module."""
+    with pytest.MonkeyPatch.context() as module_monkeypatch:
+        module_monkeypatch.setattr("etl.property_utilities.OPEN_NY_PROPERTY_CLASS_MAP", OPEN_NY_PROPERTY_CLASS_MAP)
+        module_monkeypatch.setattr("etl.property_utilities.OTHER_PROPERTY_CATEGORY", OTHER_PROPERTY_CATEGORY)
+        module_monkeypatch.setattr("etl.property_utilities.PROPERTY_CATEGORY_DESCRIPTIONS", PROPERTY_CATEGORY_DESCRIPTIONS)
+        yield
+
+
+pytestmark = pytest.mark.usefixtures("patch_static_constants")
+
+
 @pytest.fixture(autouse=True, scope="function")
 def patch_constants(monkeypatch):
-    monkeypatch.setattr("etl.property_utilities.OPEN_NY_PROPERTY_CLASS_MAP", OPEN_NY_PROPERTY_CLASS_MAP)
-    monkeypatch.setattr("etl.property_utilities.OTHER_PROPERTY_CATEGORY", OTHER_PROPERTY_CATEGORY)
     monkeypatch.setattr("etl.property_utilities.DESIRED_PROPERTY_CATEGORIES", DESIRED_PROPERTY_CATEGORIES)
-    monkeypatch.setattr("etl.property_utilities.PROPERTY_CATEGORY_DESCRIPTIONS", PROPERTY_CATEGORY_DESCRIPTIONS)
+    get_ny_property_classes_for_where_clause.cache_clear()
+    get_ny_property_class_index.cache_clear()
+    yield
+    get_ny_property_classes_for_where_clause.cache_clear()
+    get_ny_property_class_index.cache_clear()
 
 
 def test_ny_property_category_for_property_class_valid_property_class():
@@ -68,11 +84,11 @@ def test_ny_property_category_for_property_class_invalid_property_class():
     assert get_ny_property_category_for_property_class(999) == OPC_DESCRIPTION
 
 
-def test_ny_property_category_for_property_class_missing_category():
+def test_ny_property_category_for_property_class_missing_category(monkeypatch):
     """Test when property_category key is missing in ny class map category defaults to other."""
-    OPEN_NY_PROPERTY_CLASS_MAP.append({"property_class": 400})
+    monkeypatch.setattr(
+        "etl.property_utilities.OPEN_NY_PROPERTY_CLASS_MAP", OPEN_NY_PROPERTY_CLASS_MAP + [{"property_class": 400}])
     assert get_ny_property_category_for_property_class(400) == OPC_DESCRIPTION
-    OPEN_NY_PROPERTY_CLASS_MAP.pop()  # Clean up
 
 
 def test_ny_property_category_for_property_class_empty_property_class_map(monkeypatch):
@@ -81,6 +97,16 @@ def test_ny_property_category_for_property_class_empty_property_class_map(monkey
     assert get_ny_property_category_for_property_class(SFH_CLASS) == OPC_DESCRIPTION
 
 
+def test_ny_property_category_for_property_class_index_built_once():
+    """Test the property class map is indexed once and reused for later lookups."""
+    get_ny_property_category_for_property_class(SFH_CLASS)
+    get_ny_property_category_for_property_class(CP_CLASS)
+    get_ny_property_category_for_property_class(999)
+
+    assert get_ny_property_class_index.cache_info().misses == 1
+    assert get_ny_property_class_index.cache_info().hits == 2
+
+
 def test_ny_property_category_for_property_class_valid_where_clause():
     """Test valid WHERE clause created based on DESIRED_PROPERTY_CATEGORIES."""
     result = get_ny_property_classes_for_where_clause()
@@ -108,21 +134,30 @@ def test_ny_property_category_for_property_class_empty_desired_categories(monkey
     assert result == ""
 
 
-def test_get_open_ny_app_token_success():
+def test_ny_property_classes_for_where_clause_is_cached(monkeypatch):
+    """Test where clause is built once and reused on later calls."""
+    first_result = get_ny_property_classes_for_where_clause()
+    monkeypatch.setattr("etl.property_utilities.OPEN_NY_PROPERTY_CLASS_MAP", [])
+
+    assert get_ny_property_classes_for_where_clause() == first_result
+    assert get_ny_property_classes_for_where_clause.cache_info().hits == 1
+
+
+def test_get_open_ny_app_token_success(monkeypatch):
     """Test when the token is in the right environment variable."""
-    with patch("os.environ.get") as mock_env_get, \
-        patch("etl.property_utilities.custom_logger") as mock_custom_logger:
-        mock_env_get.side_effect = lambda key: {"OPEN_DATA_APP_TOKEN": "mock_app_token"}.get(key)
+    monkeypatch.setenv("OPEN_DATA_APP_TOKEN", "mock_app_token")
+
+    with patch("etl.property_utilities.custom_logger") as mock_custom_logger:
         token = get_open_ny_app_token()
         assert token == "mock_app_token"
         mock_custom_logger.assert_not_called()
 
 
-def test_get_open_ny_app_token_fails():
+def test_get_open_ny_app_token_fails(monkeypatch):
     """Test when the token is not in the right environment variable."""
-    with patch("os.environ.get") as mock_env_get, \
-        patch("etl.property_utilities.custom_logger") as mock_custom_logger:
-        mock_env_get.return_value = None
+    monkeypatch.delenv("OPEN_DATA_APP_TOKEN", raising=False)
+
+    with patch("etl.property_utilities.custom_logger") as mock_custom_logger:
         token = get_open_ny_app_token()
         assert token is None
         mock_custom_logger.assert_called_once_with(
@@ -133,9 +168,7 @@ def test_get_assessment_year_to_query_before_august_minimum_assessment_year():
     """Test get_assessment_year_to_query returns previous year when current month is before August,
     except in the case where the current year is the minimum assessment year."""
     with patch("etl.property_utilities.datetime") as mock_datetime:
-        now = MagicMock()
-        now.year = MINIMUM_ASSESSMENT_YEAR
-        now.month = 4
+        now = SimpleNamespace(year=MINIMUM_ASSESSMENT_YEAR, month=4)
         mock_datetime.now.return_value = now
         assessment_year = get_assessment_year_to_query()
         assert assessment_year == MINIMUM_ASSESSMENT_YEAR
@@ -144,9 +177,7 @@ def test_get_assessment_year_to_query_before_august_minimum_assessment_year():
 def test_get_assessment_year_to_query_before_august():
     """Test get_assessment_year_to_query returns previous year when current month is before August."""
     with patch("etl.property_utilities.datetime") as mock_datetime:
-        now = MagicMock()
-        now.year = 2025
-        now.month = 6
+        now = SimpleNamespace(year=2025, month=6)
         mock_datetime.now.return_value = now
         assessment_year = get_assessment_year_to_query()
         assert assessment_year == 2024
@@ -155,9 +186,7 @@ def test_get_assessment_year_to_query_before_august():
 def test_get_assessment_year_to_query_after_august():
     """Test get_assessment_year_to_query returns current year when current month is after August."""
     with patch("etl.property_utilities.datetime") as mock_datetime:
-        now = MagicMock()
-        now.year = 2025
-        now.month = 8
+        now = SimpleNamespace(year=2025, month=8)
         mock_datetime.now.return_value = now
         assessment_year = get_assessment_year_to_query()
         assert assessment_year == 2025
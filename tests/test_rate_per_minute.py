@@ -1,17 +1,20 @@
+from math import ceil
 from time import time
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
+from limits.storage import MemoryStorage
 
 from etl.constants import WARNING_LOG_LEVEL
+from etl.rate_limits import rate_per_hour
 from etl.rate_limits import rate_per_minute
 
 
 @patch("etl.rate_limits.storage_backend")
 def test_rate_per_minute_allows_execution(mock_storage_backend):
     """Test that the decorator allows function execution under the rate limit."""
-    mock_storage_backend.incr.return_value = True
+    mock_storage_backend.incr.return_value = 1
     mock_function = MagicMock(return_value="success")
     mock_function.__name__ = "mock_function"
 
@@ -23,14 +26,17 @@ def test_rate_per_minute_allows_execution(mock_storage_backend):
     assert result == "success"
 
 
-@patch("etl.rate_limits.storage_backend")
-@patch("etl.rate_limits.time.sleep", return_value=None)
-@patch("etl.rate_limits.custom_logger")
-def test_rate_per_minute_exceeded_limit(mock_logger, mock_sleep, mock_storage_backend):
+def test_rate_per_minute_exceeded_limit(monkeypatch):
     """Test that the decorator handles rate limit exceeded by waiting and logging."""
+    sleeps = []
+    logged = []
+    mock_storage_backend = MagicMock()
+    monkeypatch.setattr("etl.rate_limits.storage_backend", mock_storage_backend)
+    monkeypatch.setattr("etl.rate_limits.time.sleep", sleeps.append)
+    monkeypatch.setattr("etl.rate_limits.custom_logger", lambda level, message: logged.append((level, message)))
 
     # Rate limit exceeded first try, not the next
-    mock_storage_backend.incr.side_effect = [False, True]
+    mock_storage_backend.incr.side_effect = [11, 1]
     mock_expiry_time = time() + 4
     mock_storage_backend.get_expiry.return_value = mock_expiry_time
     mock_function = MagicMock(return_value="success")
@@ -40,11 +46,11 @@ def test_rate_per_minute_exceeded_limit(mock_logger, mock_sleep, mock_storage_ba
     result = decorated_function()
 
     # Calculate expected sleep time dynamically based on mocked expiry time
-    expected_sleep_time = max(0, int(mock_expiry_time - time()))
+    expected_sleep_time = max(1, ceil(mock_expiry_time - time()))
 
     mock_function.assert_called_once()
-    mock_sleep.assert_called_once_with(expected_sleep_time)
-    mock_logger.assert_called_with(WARNING_LOG_LEVEL, f"Rate limit exceeded. Waiting {expected_sleep_time} seconds.")
+    assert sleeps == [expected_sleep_time]
+    assert logged == [(WARNING_LOG_LEVEL, f"Rate limit exceeded. Waiting {expected_sleep_time} seconds.")]
     assert result == "success"
 
 
@@ -53,7 +59,7 @@ def test_rate_per_minute_raises_exception(mock_storage_backend):
     """
     Test that the decorator raises and propagates exceptions from the wrapped function.
     """
-    mock_storage_backend.incr.return_value = True
+    mock_storage_backend.incr.return_value = 1
     mock_function = MagicMock(side_effect=ValueError("Simulated exception"))
     mock_function.__name__ = "mock_function"
 
@@ -63,3 +69,54 @@ def test_rate_per_minute_raises_exception(mock_storage_backend):
         decorated_function()
 
     mock_function.assert_called_once()
+
+
+@patch("etl.rate_limits.custom_logger")
+def test_rate_per_minute_waits_once_limit_reached(mock_logger):
+    """Test calls past the limit wait for the window to reset before running."""
+    storage = MemoryStorage()
+    mock_function = MagicMock(return_value="success")
+    mock_function.__name__ = "mock_function"
+
+    with patch("etl.rate_limits.storage_backend", storage), \
+            patch("etl.rate_limits.time.sleep", side_effect=lambda seconds: storage.reset()) as mock_sleep:
+        decorated_function = rate_per_minute(2)(mock_function)
+        results = [decorated_function() for _ in range(3)]
+
+    assert results == ["success", "success", "success"]
+    assert mock_function.call_count == 3
+    mock_sleep.assert_called_once()
+    assert mock_sleep.call_args.args[0] >= 1
+
+
+@patch("etl.rate_limits.custom_logger")
+def test_rate_limit_shared_by_key_name(mock_logger):
+    """Test functions passing the same key_name count against one limit."""
+    storage = MemoryStorage()
+    first_function = MagicMock(return_value="first")
+    first_function.__name__ = "first_function"
+    second_function = MagicMock(return_value="second")
+    second_function.__name__ = "second_function"
+
+    with patch("etl.rate_limits.storage_backend", storage), \
+            patch("etl.rate_limits.time.sleep", side_effect=lambda seconds: storage.reset()) as mock_sleep:
+        decorated_first = rate_per_hour(2, key_name="shared")(first_function)
+        decorated_second = rate_per_hour(2, key_name="shared")(second_function)
+        results = [decorated_first(), decorated_second(), decorated_second()]
+
+    assert results == ["first", "second", "second"]
+    mock_sleep.assert_called_once()
+
+
+@patch("etl.rate_limits.storage_backend")
+def test_rate_per_hour_uses_hour_window(mock_storage_backend):
+    """Test the per hour decorator sets its window to an hour."""
+    mock_storage_backend.incr.return_value = 1
+    mock_function = MagicMock(return_value="success")
+    mock_function.__name__ = "mock_function"
+
+    result = rate_per_hour(1000)(mock_function)()
+
+    assert result == "success"
+    assert mock_storage_backend.incr.call_args.kwargs["expiry"] == 3600
+    assert mock_storage_backend.incr.call_args.kwargs["key"] == "rate_limiter:mock_function"
@@ -3,6 +3,8 @@ import re
 from unittest.mock import mock_open
 from unittest.mock import patch
 
+import pytest
+
 from etl.constants import INFO_LOG_LEVEL
 from etl.constants import PROPERTIES_TABLE
 from etl.constants import WARNING_LOG_LEVEL
@@ -11,10 +13,15 @@ from etl.update_zipcodes_from_cache import get_zipcodes_cache_as_json
 from etl.update_zipcodes_from_cache import update_property_zipcodes_in_db_from_cache
 from etl.update_zipcodes_from_cache import update_zipcode_cache
 
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 
 def normalize_query(query: str) -> str:
     """Remove extra spaces and newlines from a SQL query for consistent comparisons."""
-    return re.sub(r"\s+", " ", query).strip()
+    return WHITESPACE_PATTERN.sub(" ", query).strip()
+
+
+EXPECTED_UPDATE_ZIPCODE_QUERY = normalize_query(f"UPDATE {PROPERTIES_TABLE} SET address_zip = ? WHERE id = ?")
 
 
 class TestGetZipcodesCacheAsJSON:
@@ -29,6 +36,16 @@ class TestGetZipcodesCacheAsJSON:
         assert result == {"1001": "12345", "1002": "67890"}
         mock_logger.assert_called_once_with(INFO_LOG_LEVEL, "Loading zipcodes cache from S3 as JSON...")
 
+    @patch("etl.update_zipcodes_from_cache.download_zipcodes_cache_from_s3")
+    @patch("etl.update_zipcodes_from_cache.open", new_callable=mock_open, read_data=b'{"1001": "12345"}')
+    @patch("etl.update_zipcodes_from_cache.os.path.exists", return_value=True)
+    @patch("etl.update_zipcodes_from_cache.custom_logger")
+    def test_get_zipcodes_cache_as_json_parses_raw_bytes(self, mock_logger, mock_exists, mock_open_file, mock_download):
+        """Test the cache file is opened in binary mode and its raw bytes parsed."""
+        result = get_zipcodes_cache_as_json()
+        assert result == {"1001": "12345"}
+        mock_open_file.assert_called_once_with(ZIPCODE_CACHE_LOCAL_PATH, "rb")
+
     @patch("etl.update_zipcodes_from_cache.download_zipcodes_cache_from_s3")
     @patch("etl.update_zipcodes_from_cache.open", new_callable=mock_open)
     @patch("etl.update_zipcodes_from_cache.os.path.exists", return_value=True)
@@ -53,76 +70,45 @@ class TestGetZipcodesCacheAsJSON:
 
 class TestUpdatePropertyZipcodesInDBFromCache:
 
-    @patch("etl.update_zipcodes_from_cache.execute_db_query")
-    def test_update_property_zipcodes_in_db_from_cache_success(self, mock_execute):
-        """Test successfully updating properties in the database using the ZIP codes cache."""
-        mock_execute.return_value = 1
+    @pytest.mark.parametrize("rows_updated, expected_updated", [
+        (2, 2),
+        (1, 1),
+        (0, 0),
+    ], ids=["success", "partial_failure", "no_updates"])
+    @patch("etl.update_zipcodes_from_cache.execute_db_query_many")
+    def test_update_property_zipcodes_in_db_from_cache(self, mock_execute_many, rows_updated, expected_updated):
+        """Test every cached ZIP code is updated in one call, returning the number of properties updated."""
+        mock_execute_many.return_value = rows_updated
         zipcodes_cache = {"1001": "12345", "1002": "67890"}
 
         num_updated = update_property_zipcodes_in_db_from_cache(zipcodes_cache)
 
-        assert num_updated == 2
-        assert mock_execute.call_count == 2
-        expected_calls = [
-            (normalize_query(f"UPDATE {PROPERTIES_TABLE} SET address_zip = ? WHERE id = ?"), ("12345", "1001")),
-            (normalize_query(f"UPDATE {PROPERTIES_TABLE} SET address_zip = ? WHERE id = ?"), ("67890", "1002")),
-        ]
-        actual_calls = [
-            (normalize_query(call_args[0][0]), call_args[0][1])
-            for call_args in mock_execute.call_args_list
-        ]
-
-        assert actual_calls == expected_calls
-
-    @patch("etl.update_zipcodes_from_cache.execute_db_query")
-    def test_update_property_zipcodes_in_db_from_cache_partial_failure(self, mock_execute):
-        """Test updating the database with some failures in the ZIP codes cache updates."""
-        mock_execute.side_effect = [1, 0]
-        zipcodes_cache = {"1001": "12345", "1002": "67890"}
-        num_updated = update_property_zipcodes_in_db_from_cache(zipcodes_cache)
-        assert num_updated == 1
-        assert mock_execute.call_count == 2
-        expected_calls = [
-            (normalize_query(f"UPDATE {PROPERTIES_TABLE} SET address_zip = ? WHERE id = ?"), ("12345", "1001")),
-            (normalize_query(f"UPDATE {PROPERTIES_TABLE} SET address_zip = ? WHERE id = ?"), ("67890", "1002")),
-        ]
-        actual_calls = [
-            (normalize_query(call_args[0][0]), call_args[0][1])
-            for call_args in mock_execute.call_args_list
-        ]
-
-        assert actual_calls == expected_calls
-
-    @patch("etl.update_zipcodes_from_cache.execute_db_query")
-    def test_update_property_zipcodes_in_db_from_cache_no_updates(self, mock_execute):
-        """Test the case where no ZIP codes match database entries (zero updates)."""
-        mock_execute.return_value = 0
+        assert num_updated == expected_updated
+        mock_execute_many.assert_called_once()
+        query, params_list = mock_execute_many.call_args[0]
+        assert normalize_query(query) == EXPECTED_UPDATE_ZIPCODE_QUERY
+        assert params_list == [("12345", "1001"), ("67890", "1002")]
+
+    @patch("etl.update_zipcodes_from_cache.execute_db_query_many")
+    def test_update_property_zipcodes_in_db_from_cache_database_error(self, mock_execute_many):
+        """Test a database error, where nothing is committed, counts as zero updates."""
+        mock_execute_many.return_value = None
         zipcodes_cache = {"1001": "12345", "1002": "67890"}
 
         result = update_property_zipcodes_in_db_from_cache(zipcodes_cache)
 
         assert result == 0
-        assert mock_execute.call_count == 2
-        expected_calls = [
-            (normalize_query(f"UPDATE {PROPERTIES_TABLE} SET address_zip = ? WHERE id = ?"), ("12345", "1001")),
-            (normalize_query(f"UPDATE {PROPERTIES_TABLE} SET address_zip = ? WHERE id = ?"), ("67890", "1002")),
-        ]
-        actual_calls = [
-            (normalize_query(call_args[0][0]), call_args[0][1])
-            for call_args in mock_execute.call_args_list
-        ]
-
-        assert actual_calls == expected_calls
-
-    @patch("etl.update_zipcodes_from_cache.execute_db_query")
-    def test_update_property_zipcodes_in_db_from_cache_empty_cache(self, mock_execute):
+        mock_execute_many.assert_called_once()
+
+    @patch("etl.update_zipcodes_from_cache.execute_db_query_many")
+    def test_update_property_zipcodes_in_db_from_cache_empty_cache(self, mock_execute_many):
         """Test the behavior when the ZIP codes cache is empty."""
         zipcodes_cache = {}
 
         result = update_property_zipcodes_in_db_from_cache(zipcodes_cache)
 
         assert result == 0
-        mock_execute.assert_not_called()
+        mock_execute_many.assert_not_called()
 
 
 @patch("etl.update_zipcodes_from_cache.execute_db_query")
@@ -1,9 +1,13 @@
 import re
+import sqlite3
+import threading
+from unittest.mock import MagicMock
 from unittest.mock import mock_open
 from unittest.mock import patch
 
 import pytest
 
+from etl.constants import CREATE_TABLE_DEFINITIONS_FILE_PATH
 from etl.constants import INFO_LOG_LEVEL
 from etl.constants import WARNING_LOG_LEVEL
 from etl.update_zipcodes_from_census_bureau import create_csv_batch_file
@@ -56,8 +60,8 @@ def test_get_csv_file_path(mock_datetime):
 def test_create_csv_batch_file(mock_open_file, mock_get_csv_file_path):
     """Test that create_csv_batch_file writes data to a CSV file."""
     data = [
-        {"Unique ID": 1, "Street address": "123 Mock St", "City": "TestCity", "State": "NY", "ZIP": ""},
-        {"Unique ID": 2, "Street address": "456 Example Rd", "City": "SamplePlace", "State": "CA", "ZIP": ""}
+        (1, "123 Mock St", "TestCity", "NY", ""),
+        (2, "456 Example Rd", "SamplePlace", "CA", "")
     ]
 
     result = create_csv_batch_file(data)
@@ -82,7 +86,7 @@ def test_create_csv_batch_file_no_data(mock_logger):
 @patch("etl.update_zipcodes_from_census_bureau.custom_logger")
 def test_create_csv_batch_file_exception(mock_logger, mock_open_file, mock_get_csv_path):
     """Test that errors during CSV creation are logged."""
-    data = [{"Unique ID": 1, "Street address": "123 Mock St", "City": "TestCity", "State": "NY", "ZIP": ""}]
+    data = [(1, "123 Mock St", "TestCity", "NY", "")]
     result = create_csv_batch_file(data)
     assert result == "/tmp/error_file.csv"
     mock_logger.assert_called_once_with(
@@ -111,6 +115,8 @@ def test_create_csv_batch_file_exception(mock_logger, mock_open_file, mock_get_c
         # Cases with only "off"
         ("off", ""),  # Removes "off" without any other text
         ("123 off Main St", "123 off Main St"),  # Leaves "off" if not at the start
+        ("'off Main St'", "Main St"),  # Removes "off" left at the start by removing quotes
+        ("(Rear)off Main St", "Main St"),  # Removes "off" left at the start by removing parentheses
         # Miscellaneous edge cases
         ("No changes needed", "No changes needed"),  # Leaves valid addresses unchanged
         ("", ""),  # Empty string should return empty
@@ -125,6 +131,17 @@ def test_sanitize_address_string(input_address, expected_result):
     assert result == expected_result
 
 
+def test_sanitize_address_string_cached_for_repeated_address():
+    """Test a repeated address is sanitized once and then served from the cache."""
+    sanitize_address_string.cache_clear()
+
+    assert sanitize_address_string("12 Main St (Unit 1)") == "12 Main St"
+    assert sanitize_address_string("12 Main St (Unit 1)") == "12 Main St"
+
+    cache_info = sanitize_address_string.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (1, 1)
+
+
 @patch("etl.update_zipcodes_from_census_bureau.custom_logger")
 @patch("etl.update_zipcodes_from_census_bureau.execute_db_query")
 @patch("etl.update_zipcodes_from_census_bureau.create_csv_batch_file")
@@ -146,7 +163,7 @@ def test_get_all_properties_batches(
     mock_sanitize.side_effect = lambda x: x
     mock_create_csv.side_effect = ["/tmp/batch_1.csv", "/tmp/batch_2.csv"]
 
-    result = get_all_properties_needing_zipcodes_from_database_write_as_csv()
+    result = list(get_all_properties_needing_zipcodes_from_database_write_as_csv())
 
     assert len(result) == 2
     assert result == ["/tmp/batch_1.csv", "/tmp/batch_2.csv"]
@@ -154,10 +171,9 @@ def test_get_all_properties_batches(
     expected_query = """
                      SELECT id, address_street, municipality_name, address_state
                      FROM properties
-                     WHERE address_zip IS NULL \
-                        OR address_zip = ''
+                     WHERE address_zip IS NULL AND id > ?
                      ORDER BY id
-                     LIMIT ? OFFSET ? \
+                     LIMIT ? \
                      """
     expected_query_normalized = normalize_query(expected_query)
 
@@ -165,44 +181,23 @@ def test_get_all_properties_batches(
         actual_query = call_args.kwargs["query"]
         assert normalize_query(actual_query) == expected_query_normalized
 
+    # Each batch starts after the last id of the batch before it
+    assert [call_args.kwargs["params"] for call_args in mock_execute_query.call_args_list] == [("", 3), (3, 3), (4, 3)]
+
     mock_sanitize.assert_any_call("123 Mock St")
     mock_sanitize.assert_any_call("456 Fake Blvd")
     mock_sanitize.assert_any_call("789 Another Rd")
 
     mock_create_csv.assert_any_call(
         [
-            {
-                "Unique ID": 1,
-                "Street address": "123 Mock St",
-                "City": "Test City",
-                "State": "NY",
-                "ZIP": "",
-            },
-            {
-                "Unique ID": 2,
-                "Street address": "456 Fake Blvd",
-                "City": "Sample Town",
-                "State": "CA",
-                "ZIP": "",
-            },
-            {
-                "Unique ID": 3,
-                "Street address": "789 Example Ave",
-                "City": "Another City",
-                "State": "TX",
-                "ZIP": "",
-            },
+            (1, "123 Mock St", "Test City", "NY", ""),
+            (2, "456 Fake Blvd", "Sample Town", "CA", ""),
+            (3, "789 Example Ave", "Another City", "TX", ""),
         ]
     )
     mock_create_csv.assert_any_call(
         [
-            {
-                "Unique ID": 4,
-                "Street address": "789 Another Rd",
-                "City": "City A",
-                "State": "FL",
-                "ZIP": "",
-            },
+            (4, "789 Another Rd", "City A", "FL", ""),
         ]
     )
 
@@ -221,7 +216,7 @@ def test_get_all_properties_batches(
 def test_get_all_properties_no_results(mock_create_csv, mock_execute_query, mock_logger):
     mock_execute_query.return_value = []
 
-    result = get_all_properties_needing_zipcodes_from_database_write_as_csv()
+    result = list(get_all_properties_needing_zipcodes_from_database_write_as_csv())
 
     assert result == []
     mock_create_csv.assert_not_called()
@@ -243,20 +238,35 @@ def test_get_all_properties_csv_creation_failure(
     ]
     mock_create_csv.return_value = None
 
-    result = get_all_properties_needing_zipcodes_from_database_write_as_csv()
+    result = list(get_all_properties_needing_zipcodes_from_database_write_as_csv())
 
     assert result == []
     mock_create_csv.assert_called_once_with(
         [
-            {
-                "Unique ID": 1,
-                "Street address": "123 Mock St",
-                "City": "Test City",
-                "State": "NY",
-                "ZIP": "",
-            }
+            (1, "123 Mock St", "Test City", "NY", "")
         ]
     )
+
+
+@patch("etl.update_zipcodes_from_census_bureau.custom_logger")
+@patch("etl.update_zipcodes_from_census_bureau.execute_db_query")
+@patch("etl.update_zipcodes_from_census_bureau.create_csv_batch_file")
+def test_get_all_properties_yields_each_batch_file_as_written(mock_create_csv, mock_execute_query, mock_logger):
+    """Test a batch file path is yielded before the next batch is fetched from the database."""
+    mock_execute_query.side_effect = [
+        [(1, "123 Mock St", "Test City", "NY")],
+        [(2, "456 Fake Blvd", "Sample Town", "NY")],
+        [],
+    ]
+    mock_create_csv.side_effect = ["/tmp/batch_1.csv", "/tmp/batch_2.csv"]
+
+    batch_file_paths = get_all_properties_needing_zipcodes_from_database_write_as_csv()
+
+    mock_execute_query.assert_not_called()
+    assert next(batch_file_paths) == "/tmp/batch_1.csv"
+    assert mock_execute_query.call_count == 1
+    assert list(batch_file_paths) == ["/tmp/batch_2.csv"]
+    assert mock_execute_query.call_count == 3
     mock_logger.assert_any_call(INFO_LOG_LEVEL, "Fetching properties without zipcodes...")
 
 
@@ -266,8 +276,8 @@ def test_get_all_properties_csv_creation_failure(
     [
         (
                 # Valid property_id and zip_code combinations
-                '1,"Match","Exact",,,"Match","Exact",,,,12345\n'
-                '2,"Match","Exact",,,"Match","Exact",,,,67890\n',
+                '"1","123 Main St, Syracuse, NY, ","Match","Exact","123 MAIN ST, SYRACUSE, NY, 12345","-76.15,43.04","636406212","L"\n'
+                '"2","123 Main St, Syracuse, NY, ","Match","Exact","123 MAIN ST, SYRACUSE, NY, 67890","-76.15,43.04","636406212","L"\n',
                 [
                     {"property_id": "1", "zip_code": "12345"},
                     {"property_id": "2", "zip_code": "67890"},
@@ -276,27 +286,53 @@ def test_get_all_properties_csv_creation_failure(
         ),
         (
                 # Entry with missing property_id
-                ',"Match","Exact",,,"Match","Exact",,,,12345\n',
+                '"","123 Main St, Syracuse, NY, ","Match","Exact","123 MAIN ST, SYRACUSE, NY, 12345","-76.15,43.04","636406212","L"\n',
                 [],
                 "Successfully parsed 0 rows with exact match out of 1 responses from geocoder response.",
         ),
         (
                 # Entry with invalid/missing zip_code
-                '1,"Match","Exact",,,"Match","Exact",,,,,\n',
+                '"1","123 Main St, Syracuse, NY, ","Match","Exact","123 MAIN ST, SYRACUSE, NY, ","-76.15,43.04","636406212","L"\n',
                 [],
                 "Successfully parsed 0 rows with exact match out of 1 responses from geocoder response.",
         ),
         (
                 # Mixed valid and invalid entries
-                '1,"Match","Exact",,,"Match","Exact",,,,12345\n'
-                ',"Match","Exact",,,"Match","Exact",,,,67890\n'
-                '2,"Match","Exact",,,"Match","Exact",,,,34567\n',
+                '"1","123 Main St, Syracuse, NY, ","Match","Exact","123 MAIN ST, SYRACUSE, NY, 12345","-76.15,43.04","636406212","L"\n'
+                '"","123 Main St, Syracuse, NY, ","Match","Exact","123 MAIN ST, SYRACUSE, NY, 67890","-76.15,43.04","636406212","L"\n'
+                '"2","123 Main St, Syracuse, NY, ","Match","Exact","123 MAIN ST, SYRACUSE, NY, 34567","-76.15,43.04","636406212","L"\n',
                 [
                     {"property_id": "1", "zip_code": "12345"},
                     {"property_id": "2", "zip_code": "34567"},
                 ],
                 "Successfully parsed 2 rows with exact match out of 3 responses from geocoder response.",
         ),
+        (
+                # Only exact matches are kept, unmatched rows have fewer columns
+                '"1","123 Main St, Syracuse, NY, ","Match","Exact","123 MAIN ST, SYRACUSE, NY, 12345","-76.15,43.04","636406212","L"\n'
+                '"2","9 Nowhere Rd, Syracuse, NY, ","No_Match"\n'
+                '"3","123 Main St, Syracuse, NY, ","Match","Non_Exact","123 MAIN ST, SYRACUSE, NY, 67890","-76.15,43.04","636406212","L"\n',
+                [
+                    {"property_id": "1", "zip_code": "12345"},
+                ],
+                "Successfully parsed 1 rows with exact match out of 3 responses from geocoder response.",
+        ),
+        (
+                # Commas inside a quoted input address do not shift the columns
+                '"1","123 Main St, Apt 2, Syracuse, NY, ","Match","Exact","123 MAIN ST, SYRACUSE, NY, 12345","-76.15,43.04","636406212","L"\n',
+                [
+                    {"property_id": "1", "zip_code": "12345"},
+                ],
+                "Successfully parsed 1 rows with exact match out of 1 responses from geocoder response.",
+        ),
+        (
+                # Unquoted match and match type columns are read the same as quoted ones
+                '"1","123 Main St, Syracuse, NY, ",Match,Exact,"123 MAIN ST, SYRACUSE, NY, 12345","-76.15,43.04",636406212,L\n',
+                [
+                    {"property_id": "1", "zip_code": "12345"},
+                ],
+                "Successfully parsed 1 rows with exact match out of 1 responses from geocoder response.",
+        ),
         (
                 # Completely malformed response
                 'Invalid line,missing columns,another invalid line\n',
@@ -343,6 +379,22 @@ def test_get_zipcodes_from_geocoder_as_batch_success(mock_open_file, mock_logger
     mock_open_file.assert_called_once_with("/path/to/mock_file.csv", "rb")
 
 
+@patch("etl.update_zipcodes_from_census_bureau.requests.post")
+@patch("etl.update_zipcodes_from_census_bureau.custom_logger")
+@patch("builtins.open", new_callable=mock_open, read_data="mocked csv content")
+def test_get_zipcodes_from_geocoder_as_batch_uses_given_session(mock_open_file, mock_logger, mock_post):
+    """Test that get_zipcodes_from_geocoder_as_batch posts with the given session instead of a new connection."""
+    mock_session = MagicMock()
+    mock_session.post.return_value.ok = True
+    mock_session.post.return_value.content = b"property_id,zip_code\n1,12345"
+
+    result = get_zipcodes_from_geocoder_as_batch("/path/to/mock_file.csv", session=mock_session)
+
+    assert result == "property_id,zip_code\n1,12345"
+    mock_session.post.assert_called_once()
+    mock_post.assert_not_called()
+
+
 @patch("etl.update_zipcodes_from_census_bureau.requests.post", side_effect=Exception("Mocked API failure"))
 @patch("etl.update_zipcodes_from_census_bureau.custom_logger")
 @patch("builtins.open", new_callable=mock_open, read_data="mocked csv content")
@@ -357,32 +409,35 @@ def test_get_zipcodes_from_geocoder_as_batch_failure(mock_open_file, mock_logger
     mock_open_file.assert_called_once_with("/path/to/mock_file.csv", "rb")
 
 
-@patch("etl.update_zipcodes_from_census_bureau.execute_db_query", return_value=1)
+@patch("etl.update_zipcodes_from_census_bureau.execute_db_query_many", return_value=2)
 @patch("etl.update_zipcodes_from_census_bureau.custom_logger")
-def test_update_property_zipcodes_with_geocoder_response_success(mock_logger, mock_execute_query):
-    """Test the successful update of property ZIP codes."""
-    parsed_response = [{"property_id": "1", "zip_code": "12345"}]
+def test_update_property_zipcodes_with_geocoder_response_success(mock_logger, mock_execute_many):
+    """Test the successful update of property ZIP codes in one call, skipping rows missing a value."""
+    parsed_response = [
+        {"property_id": "1", "zip_code": "12345"},
+        {"property_id": "2", "zip_code": ""},
+        {"property_id": "3", "zip_code": "67890"},
+    ]
     number_updated = update_property_zipcodes_with_geocoder_response(parsed_response)
-    assert number_updated == 1
+    assert number_updated == 2
 
     # Normalize the expected and actual queries for consistent comparison
     expected_query = normalize_query("UPDATE properties SET address_zip = ? WHERE id = ?")
-    actual_query = normalize_query(mock_execute_query.call_args[0][0])
+    actual_query = normalize_query(mock_execute_many.call_args[0][0])
 
     assert actual_query == expected_query
-    mock_execute_query.assert_called_once_with(
-        mock_execute_query.call_args[0][0],
-        ("12345", "1"),
-        fetch_results=False
+    mock_execute_many.assert_called_once_with(
+        mock_execute_many.call_args[0][0],
+        [("12345", "1"), ("67890", "3")]
     )
     mock_logger.assert_called_once_with(
-        INFO_LOG_LEVEL, "Updated 1 properties with ZIP codes."
+        INFO_LOG_LEVEL, "Updated 2 properties with ZIP codes."
     )
 
 
-@patch("etl.update_zipcodes_from_census_bureau.execute_db_query", side_effect=Exception("Mocked DB error"))
+@patch("etl.update_zipcodes_from_census_bureau.execute_db_query_many", side_effect=Exception("Mocked DB error"))
 @patch("etl.update_zipcodes_from_census_bureau.custom_logger")
-def test_update_property_zipcodes_with_geocoder_response_failure(mock_logger, mock_execute_query):
+def test_update_property_zipcodes_with_geocoder_response_failure(mock_logger, mock_execute_many):
     """Test the handling of database update errors."""
     parsed_response = [{"property_id": "1", "zip_code": "12345"}]
     number_updated = update_property_zipcodes_with_geocoder_response(parsed_response)
@@ -400,3 +455,95 @@ def test_update_null_zipcodes_workflow_no_db(mock_logger, mock_path_exists):
     mock_logger.assert_any_call(
         WARNING_LOG_LEVEL, "No database file found, exiting workflow."
     )
+
+
+@patch("etl.update_zipcodes_from_census_bureau.execute_db_query", return_value=2)
+@patch("etl.update_zipcodes_from_census_bureau.upload_database_to_s3")
+@patch("etl.update_zipcodes_from_census_bureau.upload_zipcodes_cache_to_s3")
+@patch("etl.update_zipcodes_from_census_bureau.open", new_callable=mock_open, create=True)
+@patch("etl.update_zipcodes_from_census_bureau.update_property_zipcodes_with_geocoder_response")
+@patch("etl.update_zipcodes_from_census_bureau.parse_geocoder_response")
+@patch("etl.update_zipcodes_from_census_bureau.get_zipcodes_from_geocoder_as_batch")
+@patch("etl.update_zipcodes_from_census_bureau.get_all_properties_needing_zipcodes_from_database_write_as_csv")
+@patch("etl.update_zipcodes_from_census_bureau.update_property_zipcodes_in_db_from_cache", return_value=0)
+@patch("etl.update_zipcodes_from_census_bureau.get_zipcodes_cache_as_json")
+@patch("etl.update_zipcodes_from_census_bureau.ensure_data_directories_exist")
+@patch("etl.update_zipcodes_from_census_bureau.os.path.exists", return_value=True)
+@patch("etl.update_zipcodes_from_census_bureau.download_database_from_s3")
+@patch("etl.update_zipcodes_from_census_bureau.custom_logger")
+def test_update_null_zipcodes_workflow_submits_batches_concurrently_saves_in_order(
+        mock_logger, mock_download, mock_path_exists, mock_ensure_dirs, mock_get_cache, mock_update_from_cache,
+        mock_get_batches, mock_geocode, mock_parse, mock_update_from_response, mock_open_file,
+        mock_upload_cache, mock_upload_db, mock_execute_query):
+    """Test empty zipcodes are normalized to NULL first, every batch file is submitted on the executor
+    with its worker thread's own session, a failed batch is logged and skipped, and responses are
+    saved in batch order."""
+    mock_get_cache.return_value = {"0": "11111"}
+    batch_files = ["/tmp/batch_1.csv", "/tmp/batch_2.csv", "/tmp/batch_3.csv"]
+    mock_get_batches.return_value = iter(batch_files)
+
+    geocode_sessions = []
+
+    def geocode(batch_file_path, session):
+        geocode_sessions.append((session, threading.get_ident()))
+        if batch_file_path == "/tmp/batch_2.csv":
+            raise Exception("Mocked API failure")
+        return f"response for {batch_file_path}"
+
+    mock_geocode.side_effect = geocode
+    mock_parse.return_value = [{"property_id": "1", "zip_code": "12345"}]
+
+    update_null_zipcodes_workflow()
+
+    assert {geocode_call.args[0] for geocode_call in mock_geocode.call_args_list} == set(batch_files)
+    # A session is only ever used by the worker thread that opened it
+    sessions_by_thread = {}
+
+    for session, thread_id in geocode_sessions:
+        assert sessions_by_thread.setdefault(session, thread_id) == thread_id
+    assert [parse_call.args[0] for parse_call in mock_parse.call_args_list] == [
+        "response for /tmp/batch_1.csv", "response for /tmp/batch_3.csv"]
+    assert mock_update_from_response.call_count == 2
+    mock_logger.assert_any_call(
+        WARNING_LOG_LEVEL, "Error unable to get zips for batch file /tmp/batch_2.csv: Mocked API failure")
+    mock_execute_query.assert_called_once_with(
+        query="UPDATE properties SET address_zip = NULL WHERE address_zip = ''", fetch_results=False)
+    mock_logger.assert_any_call(INFO_LOG_LEVEL, "Normalized 2 empty zipcodes to NULL.")
+    mock_upload_cache.assert_called_once()
+    mock_upload_db.assert_called_once()
+
+
+@patch("etl.update_zipcodes_from_census_bureau.upload_database_to_s3")
+@patch("etl.update_zipcodes_from_census_bureau.upload_zipcodes_cache_to_s3")
+@patch("etl.update_zipcodes_from_census_bureau.get_zipcodes_from_geocoder_as_batch", return_value=None)
+@patch("etl.update_zipcodes_from_census_bureau.create_csv_batch_file", return_value="/tmp/batch_1.csv")
+@patch("etl.update_zipcodes_from_census_bureau.update_property_zipcodes_in_db_from_cache", return_value=0)
+@patch("etl.update_zipcodes_from_census_bureau.get_zipcodes_cache_as_json", return_value={})
+@patch("etl.update_zipcodes_from_census_bureau.ensure_data_directories_exist")
+@patch("etl.update_zipcodes_from_census_bureau.download_database_from_s3")
+@patch("etl.update_zipcodes_from_census_bureau.custom_logger")
+def test_update_null_zipcodes_workflow_batches_properties_saved_with_empty_zipcodes(
+        mock_logger, mock_download, mock_ensure_dirs, mock_get_cache, mock_update_from_cache,
+        mock_create_batch_file, mock_geocode, mock_upload_cache, mock_upload_db, tmp_path, monkeypatch):
+    """Test a property saved with an empty zipcode is normalized to NULL and sent to the geocoder."""
+    db_path = str(tmp_path / "test.db")
+    monkeypatch.setattr("etl.db_utilities.DB_LOCAL_PATH", db_path)
+    monkeypatch.setattr("etl.update_zipcodes_from_census_bureau.DB_LOCAL_PATH", db_path)
+
+    with open(CREATE_TABLE_DEFINITIONS_FILE_PATH, "r") as sql_file:
+        sql_script = sql_file.read()
+
+    db_connection = sqlite3.connect(db_path)
+    db_connection.executescript(sql_script)
+    db_connection.executemany(
+        "INSERT INTO properties VALUES (?, '311500', ?, '311500', 'Syracuse', 'Onondaga', '311500', 'Syracuse', "
+        "'1 Main St', 'NY', ?)",
+        [("311500 1", "1", ""), ("311500 2", "2", "13202")])
+    db_connection.commit()
+    db_connection.close()
+
+    update_null_zipcodes_workflow()
+
+    batch_data = mock_create_batch_file.call_args.args[0]
+    assert [row[0] for row in batch_data] == ["311500 1"]
+    mock_logger.assert_any_call(INFO_LOG_LEVEL, "Normalized 1 empty zipcodes to NULL.")
@@ -1,130 +1,34 @@
-import json
+from types import MappingProxyType
 
+import pytest
 from pydantic import ValidationError
 
 from etl.constants import MINIMUM_ASSESSMENT_YEAR
 from etl.validation_models import MunicipalityAssessmentRatio, NYPropertyAssessment
 from etl.validation_models import ZillowHomeValueIndexSFHCity
 
+MINIMUM_YEAR_ERROR_MESSAGE = f"Input should be greater than or equal to {MINIMUM_ASSESSMENT_YEAR}"
+FIELD_REQUIRED_ERROR_MESSAGE = "Field required"
+SWIS_CODE_TOO_SHORT_ERROR_MESSAGE = "String should have at least 6 characters"
 
-def test_valid_municipality_assessment_ratio_without_village_name():
-    valid_data = {
-        "rate_year": "2024",
-        "swis_code": "050100",
-        "type": "City",
-        "county_name": "Cayuga",
-        "municipality_name": "Auburn",
-        "residential_assessment_ratio": "88.00"
-    }
-    mar_model = MunicipalityAssessmentRatio(**valid_data)
-
-    assert mar_model.rate_year == 2024
-    assert mar_model.swis_code == "050100"
-    assert "type" not in mar_model
-    assert mar_model.county_name == "Cayuga"
-    assert mar_model.municipality_name == "Auburn"
-    assert mar_model.residential_assessment_ratio == 88.00
-
-
-def test_valid_municipality_assessment_ratio_with_village_name():
-    valid_data = {
-        "rate_year": "2024",
-        "swis_code": "050100",
-        "type": "City",
-        "county_name": "Cayuga",
-        "municipality_name": "Auburn",
-        "village_name": "Auburn",
-        "residential_assessment_ratio": "88.00"
-    }
-    mar_model = MunicipalityAssessmentRatio(**valid_data)
-
-    assert mar_model.rate_year == 2024
-    assert mar_model.swis_code == "050100"
-    assert mar_model.county_name == "Cayuga"
-    assert mar_model.municipality_name == "Auburn"
-    assert mar_model.residential_assessment_ratio == 88.00
-    assert "type" not in mar_model
-    assert "village_name" not in mar_model
-
-
-def test_valid_municipality_assessment_ratio_without_village_dumps_to_expected_json():
-    valid_data = {
-        "rate_year": "2024",
-        "swis_code": "050100",
-        "type": "City",
-        "county_name": "Cayuga",
-        "municipality_name": "Auburn",
-        "residential_assessment_ratio": "88.00"
-    }
-    mar_model = MunicipalityAssessmentRatio(**valid_data)
-
-    ratio_data = json.loads(mar_model.model_dump_json(by_alias=True))
-    assert list(ratio_data.keys()) == [
-        "rate_year",
-        "municipality_code",
-        "county_name",
-        "municipality_name",
-        "residential_assessment_ratio"
-    ]
-    assert tuple(ratio_data.values()) == (
-        2024,
-        "050100",
-        "Cayuga",
-        "Auburn",
-        88.00
-    )
 
-
-def test_valid_municipality_assessment_ratio_with_village_dumps_to_expected_json():
-    valid_data = {
+@pytest.fixture(scope="module")
+def base_mar_data():
+    """Valid municipality assessment ratio payload, read only, tests build variants with {**base_mar_data, ...}."""
+    return MappingProxyType({
         "rate_year": "2024",
         "swis_code": "050100",
         "type": "City",
         "county_name": "Cayuga",
         "municipality_name": "Auburn",
-        "village_name": "Auburn",
         "residential_assessment_ratio": "88.00"
-    }
-    mar_model = MunicipalityAssessmentRatio(**valid_data)
-
-    ratio_data = json.loads(mar_model.model_dump_json(by_alias=True))
-    assert list(ratio_data.keys()) == [
-        "rate_year",
-        "municipality_code",
-        "county_name",
-        "municipality_name",
-        "residential_assessment_ratio"
-    ]
-    assert tuple(ratio_data.values()) == (
-        2024,
-        "050100",
-        "Cayuga",
-        "Auburn",
-        88.00
-    )
+    })
 
 
-def test_invalid_municipality_assessment_ratio_rate_year():
-    invalid_data = {
-        "rate_year": "1980",
-        "swis_code": "050100",
-        "type": "City",
-        "county_name": "Cayuga",
-        "municipality_name": "Auburn",
-        "residential_assessment_ratio": "88.00"
-    }
-
-    try:
-        MunicipalityAssessmentRatio(**invalid_data)
-    except ValidationError as exc_info:
-        for error in exc_info.errors():
-            assert error["msg"] == f"Input should be greater than or equal to {MINIMUM_ASSESSMENT_YEAR}"
-            assert error["type"] == "greater_than_equal"
-            assert error["loc"][0] == "rate_year"
-
-
-def test_valid_ny_property_record_outputs_expected_data_for_two_tables():
-    valid_data = {
+@pytest.fixture(scope="module")
+def base_nypa_data():
+    """Valid NY property assessment payload without mailing address, read only, tests build variants with {**base_nypa_data, ...}."""
+    return MappingProxyType({
         "roll_year": "2024",
         "county_name": "Onondaga",
         "municipality_code": "311500",
@@ -138,282 +42,244 @@ def test_valid_ny_property_record_outputs_expected_data_for_two_tables():
         "parcel_address_number": "833",
         "parcel_address_street": "Hiawatha",
         "parcel_address_suff": "Blvd",
-        "mailing_address_number": "833",
-        "mailing_address_street": "Hiawatha",
-        "mailing_address_suff": "Blvd",
-        "mailing_address_city": "Syracuse",
-        "mailing_address_state": "NY",
-        "mailing_address_zip": "13208",
         "front": "29",
         "depth": "111.7",
-        "full_market_value": "9760",
-        "assessment_land": "7550",
-        "assessment_total": "0"
-    }
-    model = NYPropertyAssessment(**valid_data)
-    properties_record = model.to_properties_row()
-    assert properties_record["id"] == "311500 001.1-01-21.0"
-    assert properties_record["swis_code"] == "311500"
-    assert properties_record["print_key_code"] == "001.1-01-21.0"
-    assert properties_record["municipality_code"] == "311500"
-    assert properties_record["municipality_name"] == "Syracuse"
-    assert properties_record["county_name"] == "Onondaga"
-    assert properties_record["school_district_code"] == "311500"
-    assert properties_record["school_district_name"] == "Syracuse"
-    assert properties_record["address_street"] == "833 Hiawatha Blvd"
-    assert properties_record["address_state"] == NYPropertyAssessment.STATE
-    assert properties_record["address_zip"] == "13208"
-    assert len(properties_record) == 11
+        "full_market_value": "9760"
+    })
+
+
+@pytest.fixture(scope="module")
+def coerced_nypa_data(base_nypa_data):
+    """
+    base_nypa_data with the values already coerced to their field types, for tests of the row and
+    owner-occupied methods that build models with model_construct instead of validating again.
+    """
+    return MappingProxyType({
+        **base_nypa_data,
+        "roll_year": 2024,
+        "property_class": 311,
+        "front": 29,
+        "depth": 111.7,
+        "full_market_value": 9760
+    })
+
+
+expected_ratio_row = MappingProxyType({
+    "rate_year": 2024,
+    "municipality_code": "050100",
+    "county_name": "Cayuga",
+    "municipality_name": "Auburn",
+    "residential_assessment_ratio": 88.00
+})
+
+
+@pytest.fixture(scope="module", params=[None, "Auburn"], ids=["without_village", "with_village"])
+def mar_model(request, base_mar_data):
+    """Validated once per payload and shared by every test in TestValidMunicipalityAssessmentRatio."""
+    village_name = request.param
+    valid_data = {**base_mar_data, "village_name": village_name} if village_name else base_mar_data
+    return MunicipalityAssessmentRatio(**valid_data)
+
+
+class TestValidMunicipalityAssessmentRatio:
+    def test_model_fields(self, mar_model):
+        assert mar_model.rate_year == 2024
+        assert mar_model.swis_code == "050100"
+        assert mar_model.county_name == "Cayuga"
+        assert mar_model.municipality_name == "Auburn"
+        assert mar_model.residential_assessment_ratio == 88.00
+        # Keys in the payload that are not model fields are dropped, not kept as extras
+        assert "type" not in mar_model.model_fields_set
+        assert "village_name" not in mar_model.model_fields_set
+        assert not mar_model.model_extra
+
+    def test_dumps_to_expected_row(self, mar_model):
+        # Dumped as the rows saved to the database are, without a JSON round trip
+        ratio_data = mar_model.model_dump(by_alias=True)
+        assert ratio_data == expected_ratio_row
+        # Rows are saved in column order
+        assert tuple(ratio_data) == tuple(expected_ratio_row)
+        # Serialized from Decimal, which would compare equal to 88.00 as well
+        assert type(ratio_data["residential_assessment_ratio"]) is float
+
+
+def test_invalid_municipality_assessment_ratio_rate_year(base_mar_data):
+    invalid_data = {**base_mar_data, "rate_year": "1980"}
+
+    with pytest.raises(ValidationError) as exc_info:
+        MunicipalityAssessmentRatio(**invalid_data)
 
-    onypa_record = model.to_ny_property_assessments_row()
-    assert onypa_record["property_id"] == "311500 001.1-01-21.0"
-    assert onypa_record["roll_year"] == 2024
-    assert onypa_record["property_class"] == 311
-    assert onypa_record["property_class_description"] == "Residential Vacant Land"
-    assert onypa_record["property_category"] == "Lots and Land"
-    assert onypa_record["front"] == 29
-    assert onypa_record["depth"] == 111.7
-    assert onypa_record["full_market_value"] == 9760
-    assert onypa_record["assessment_land"] == 7550
-    assert onypa_record["assessment_total"] == 0
-    assert len(onypa_record) == 10
-
-    # Modify to simulate non-owner-occupied case
-    valid_data["mailing_address_number"] = "100"
-    model = NYPropertyAssessment(**valid_data)
-    properties_record = model.to_properties_row()
-    assert properties_record["address_zip"] is None
+    all_errors = exc_info.value.errors(include_url=False, include_context=False)
+    assert [(error["loc"][0], error["type"], error["msg"]) for error in all_errors] == [
+        ("rate_year", "greater_than_equal", MINIMUM_YEAR_ERROR_MESSAGE)
+    ]
 
 
-def test_valid_ny_property_record_outputs_expected_data_for_two_tables_missing_assessment_totals():
-    valid_data = {
-        "roll_year": "2024",
-        "county_name": "Onondaga",
-        "municipality_code": "311500",
-        "municipality_name": "Syracuse",
-        "school_district_code": "311500",
-        "school_district_name": "Syracuse",
-        "swis_code": "311500",
-        "property_class": "311",
-        "property_class_description": "Residential Vacant Land",
-        "print_key_code": "001.1-01-21.0",
-        "parcel_address_number": "833",
-        "parcel_address_street": "Hiawatha",
-        "parcel_address_suff": "Blvd",
-        "front": "29",
-        "depth": "111.7",
-        "full_market_value": "9760"
-    }
-    model = NYPropertyAssessment(**valid_data)
+owner_occupied_mailing_address = MappingProxyType({
+    "mailing_address_number": "833",
+    "mailing_address_street": "Hiawatha",
+    "mailing_address_suff": "Blvd",
+    "mailing_address_city": "Syracuse",
+    "mailing_address_state": "NY",
+    "mailing_address_zip": "13208"
+})
+
+
+@pytest.fixture(
+    scope="module",
+    params=[
+        ({**owner_occupied_mailing_address, "assessment_land": "7550", "assessment_total": "0"},
+         {"address_zip": "13208", "assessment_land": 7550, "assessment_total": 0}),
+        ({}, {"address_zip": None, "assessment_land": None, "assessment_total": None}),
+    ],
+    ids=["owner_occupied_with_assessments", "missing_assessment_totals"]
+)
+def record(request, base_nypa_data):
+    """Validated once per payload and shared, with its expected values, by every test in
+    TestValidNYPropertyRecordOutputsExpectedDataForTwoTables."""
+    extra_data, expected = request.param
+    return NYPropertyAssessment(**{**base_nypa_data, **extra_data}), expected
+
+
+expected_properties_row = MappingProxyType({
+    "id": "311500 001.1-01-21.0",
+    "swis_code": "311500",
+    "print_key_code": "001.1-01-21.0",
+    "municipality_code": "311500",
+    "municipality_name": "Syracuse",
+    "county_name": "Onondaga",
+    "school_district_code": "311500",
+    "school_district_name": "Syracuse",
+    "address_street": "833 Hiawatha Blvd",
+    "address_state": NYPropertyAssessment.STATE
+})
+expected_ny_property_assessments_row = MappingProxyType({
+    "property_id": "311500 001.1-01-21.0",
+    "roll_year": 2024,
+    "property_class": 311,
+    "property_class_description": "Residential Vacant Land",
+    "property_category": "Lots and Land",
+    "front": 29,
+    "depth": 111.7,
+    "full_market_value": 9760
+})
+
+
+class TestValidNYPropertyRecordOutputsExpectedDataForTwoTables:
+    def test_properties_row(self, record):
+        model, expected = record
+        assert model.to_properties_row() == {
+            **expected_properties_row,
+            "address_zip": expected["address_zip"]
+        }
+
+    def test_ny_property_assessments_row(self, record):
+        model, expected = record
+        assert model.to_ny_property_assessments_row() == {
+            **expected_ny_property_assessments_row,
+            "assessment_land": expected["assessment_land"],
+            "assessment_total": expected["assessment_total"]
+        }
+
+
+def test_valid_ny_property_record_not_owner_occupied_has_no_zip(coerced_nypa_data):
+    valid_data = {**coerced_nypa_data, **owner_occupied_mailing_address, "mailing_address_number": "100"}
+    model = NYPropertyAssessment.model_construct(**valid_data)
     properties_record = model.to_properties_row()
-    assert properties_record["id"] == "311500 001.1-01-21.0"
-    assert properties_record["swis_code"] == "311500"
-    assert properties_record["print_key_code"] == "001.1-01-21.0"
-    assert properties_record["municipality_code"] == "311500"
-    assert properties_record["municipality_name"] == "Syracuse"
-    assert properties_record["county_name"] == "Onondaga"
-    assert properties_record["school_district_code"] == "311500"
-    assert properties_record["school_district_name"] == "Syracuse"
-    assert properties_record["address_street"] == "833 Hiawatha Blvd"
-    assert properties_record["address_state"] == NYPropertyAssessment.STATE
     assert properties_record["address_zip"] is None
-    assert len(properties_record) == 11
 
-    onypa_record = model.to_ny_property_assessments_row()
-    assert onypa_record["property_id"] == "311500 001.1-01-21.0"
-    assert onypa_record["roll_year"] == 2024
-    assert onypa_record["property_class"] == 311
-    assert onypa_record["property_class_description"] == "Residential Vacant Land"
-    assert onypa_record["property_category"] == "Lots and Land"
-    assert onypa_record["front"] == 29
-    assert onypa_record["depth"] == 111.7
-    assert onypa_record["full_market_value"] == 9760
-    assert onypa_record["assessment_land"] is None
-    assert onypa_record["assessment_total"] is None
-    assert len(onypa_record) == 10
-
-
-def test_valid_ny_property_record_missing_optional_parcel_address_parts():
+
+def test_ny_property_record_tuples_match_row_dicts():
+    """Test tuple rows line up with the column names and values of the row dicts."""
+    model = NYPropertyAssessment.model_construct(
+        roll_year=2024,
+        county_name="Onondaga",
+        municipality_code="311500",
+        municipality_name="Syracuse",
+        school_district_code="311500",
+        school_district_name="Syracuse",
+        swis_code="311500",
+        property_class=210,
+        property_class_description="One Family Year-Round Residence",
+        print_key_code="004.-03-34.0",
+        parcel_address_number="1325",
+        parcel_address_street="Lemoyne",
+        parcel_address_suff="Ave",
+        front=59.97,
+        depth=125,
+        full_market_value=124800
+    )
+
+    properties_row = model.to_properties_row()
+    assert tuple(properties_row.keys()) == NYPropertyAssessment.PROPERTIES_COLUMNS
+    assert tuple(properties_row.values()) == model.to_properties_tuple()
+    ny_property_assessments_row = model.to_ny_property_assessments_row()
+    assert tuple(ny_property_assessments_row.keys()) == NYPropertyAssessment.NY_PROPERTY_ASSESSMENTS_COLUMNS
+    assert tuple(ny_property_assessments_row.values()) == model.to_ny_property_assessments_tuple()
+
+
+def test_valid_ny_property_record_missing_optional_parcel_address_parts(base_nypa_data):
     """When parcel_address_number and parcel_address_suff are not present still valid and still produces address_street."""
     valid_data = {
-        "roll_year": "2024",
-        "county_name": "Onondaga",
-        "municipality_code": "311500",
-        "municipality_name": "Syracuse",
-        "school_district_code": "311500",
-        "school_district_name": "Syracuse",
-        "swis_code": "311500",
-        "property_class": "311",
-        "property_class_description": "Residential Vacant Land",
-        "print_key_code": "001.1-01-21.0",
-        "parcel_address_street": "833 Hiawatha Blvd",
-        "front": "29",
-        "depth": "111.7",
-        "full_market_value": "9760"
+        key: value for key, value in base_nypa_data.items()
+        if key not in ("parcel_address_number", "parcel_address_suff")
     }
-    model = NYPropertyAssessment(**valid_data)
+    model = NYPropertyAssessment(**{**valid_data, "parcel_address_street": "833 Hiawatha Blvd"})
     properties_record = model.to_properties_row()
     assert properties_record["address_street"] == "833 Hiawatha Blvd"
     assert len(properties_record) == 11
 
 
-def test_ny_property_assessment_invalid_role_year():
-    invalid_data = {
-        "roll_year": "1980",
-        "county_name": "Onondaga",
-        "municipality_code": "311500",
-        "municipality_name": "Syracuse",
-        "school_district_code": "311500",
-        "school_district_name": "Syracuse",
-        "swis_code": "311500",
-        "property_class": "311",
-        "property_class_description": "Residential Vacant Land",
-        "print_key_code": "001.1-01-21.0",
-        "parcel_address_number": "833",
-        "parcel_address_street": "Hiawatha",
-        "parcel_address_suff": "Blvd",
-        "front": "29",
-        "depth": "111.7",
-        "full_market_value": "9760"
-    }
-
-    try:
-        NYPropertyAssessment(**invalid_data)
-    except ValidationError as exc_info:
-        for error in exc_info.errors():
-            assert error["msg"] == f"Input should be greater than or equal to {MINIMUM_ASSESSMENT_YEAR}"
-            assert error["type"] == "greater_than_equal"
-            assert error["loc"][0] == "roll_year"
-
-
-def test_ny_property_assessment_missing_required_values():
-    invalid_data = {
-        "roll_year": "2024",
-        "county_name": "Onondaga",
-        "municipality_code": "311500",
-        "municipality_name": "Syracuse",
-        "school_district_code": "311500",
-        "school_district_name": "Syracuse",
-        "swis_code": "311500",
-        "property_class": "311",
-        "property_class_description": "Residential Vacant Land",
-        "parcel_address_number": "833",
-        "parcel_address_street": "Hiawatha Blvd",
-        "parcel_address_suff": "",
-        "front": "29",
-        "depth": "111.7"
-    }
-    try:
-        NYPropertyAssessment(**invalid_data)
-    except ValidationError as exc_info:
-        all_errors = exc_info.errors()
-        assert all_errors[0]["msg"] == "Field required"
-        assert all_errors[0]["type"] == "missing"
-        assert all_errors[0]["loc"][0] == "print_key_code"
-        assert all_errors[1]["msg"] == "Field required"
-        assert all_errors[1]["type"] == "missing"
-        assert all_errors[1]["loc"][0] == "full_market_value"
-
-
-def test_ny_property_assessment_required_primary_key_value():
-    invalid_data = {
-        "roll_year": "2024",
-        "county_name": "Onondaga",
-        "municipality_code": "311500",
-        "municipality_name": "Syracuse",
-        "school_district_code": "311500",
-        "school_district_name": "Syracuse",
-        "property_class": "311",
-        "property_class_description": "Residential Vacant Land",
-        "print_key_code": "001.1-01-21.0",
-        "parcel_address_number": "833",
-        "parcel_address_street": "Hiawatha",
-        "parcel_address_suff": "Blvd",
-        "front": "29",
-        "depth": "111.7",
-        "full_market_value": "9760"
-    }
-    try:
-        NYPropertyAssessment(**invalid_data)
-    except ValidationError as exc_info:
-        all_errors = exc_info.errors()
-        assert all_errors[0]["msg"] == "Field required"
-        assert all_errors[0]["type"] == "missing"
-        assert all_errors[0]["loc"][0] == "swis_code"
-        assert len(all_errors) == 1
-
-
-def test_ny_property_assessment_invalid_primary_key_values():
-    invalid_data = {
-        "roll_year": "2024",
-        "county_name": "Onondaga",
-        "municipality_code": "311500",
-        "municipality_name": "Syracuse",
-        "school_district_code": "311500",
-        "school_district_name": "Syracuse",
-        "swis_code": "",
-        "property_class": "311",
-        "property_class_description": "Residential Vacant Land",
-        "parcel_address_number": "833",
-        "parcel_address_street": "Hiawatha",
-        "parcel_address_suff": "Blvd",
-        "front": "29",
-        "depth": "111.7",
-        "full_market_value": "9760"
-    }
-    try:
-        NYPropertyAssessment(**invalid_data)
-    except ValidationError as exc_info:
-        all_errors = exc_info.errors()
-        assert all_errors[0]["msg"] == "String should have at least 6 characters"
-        assert all_errors[0]["type"] == "string_too_short"
-        assert all_errors[0]["loc"][0] == "swis_code"
-        assert all_errors[1]["msg"] == "Field required"
-        assert all_errors[1]["type"] == "missing"
-        assert all_errors[1]["loc"][0] == "print_key_code"
-        assert len(all_errors) == 2
-
-
-def test_is_owner_occupied_handles_empty_or_missing_values():
+@pytest.mark.parametrize(
+    "overlay,omitted_keys,expected_errors",
+    [
+        ({"roll_year": "1980"}, (), [("roll_year", "greater_than_equal", MINIMUM_YEAR_ERROR_MESSAGE)]),
+        (
+            {"parcel_address_street": "Hiawatha Blvd", "parcel_address_suff": ""},
+            ("print_key_code", "full_market_value"),
+            [("print_key_code", "missing", FIELD_REQUIRED_ERROR_MESSAGE), ("full_market_value", "missing", FIELD_REQUIRED_ERROR_MESSAGE)]
+        ),
+        ({}, ("swis_code",), [("swis_code", "missing", FIELD_REQUIRED_ERROR_MESSAGE)]),
+        (
+            {"swis_code": ""},
+            ("print_key_code",),
+            [
+                ("swis_code", "string_too_short", SWIS_CODE_TOO_SHORT_ERROR_MESSAGE),
+                ("print_key_code", "missing", FIELD_REQUIRED_ERROR_MESSAGE)
+            ]
+        ),
+    ],
+    ids=["invalid_roll_year", "missing_required_values", "required_primary_key_value", "invalid_primary_key_values"]
+)
+def test_ny_property_assessment_invalid_payload(base_nypa_data, overlay, omitted_keys, expected_errors):
+    invalid_data = {key: value for key, value in base_nypa_data.items() if key not in omitted_keys}
+
+    with pytest.raises(ValidationError) as exc_info:
+        NYPropertyAssessment(**{**invalid_data, **overlay})
+
+    # Compared sorted, error order is not part of the contract but every error is
+    all_errors = exc_info.value.errors(include_url=False, include_context=False)
+    actual_errors = [(error["loc"][0], error["type"], error["msg"]) for error in all_errors]
+    assert sorted(actual_errors) == sorted(expected_errors)
+
+
+def test_is_owner_occupied_handles_empty_or_missing_values(coerced_nypa_data):
     data = {
-        "roll_year": "2024",
-        "county_name": "Onondaga",
-        "municipality_code": "311500",
-        "municipality_name": "Syracuse",
-        "school_district_code": "311500",
-        "school_district_name": "Syracuse",
-        "swis_code": "311500",
-        "property_class": "311",
-        "property_class_description": "Residential Vacant Land",
-        "print_key_code": "001.1-01-21.0",
-        "parcel_address_number": "833",
-        "parcel_address_street": "Hiawatha",
-        "parcel_address_suff": "Blvd",
+        **coerced_nypa_data,
         "mailing_address_number": "",
         "mailing_address_street": None,
         "mailing_address_suff": "",
         "mailing_address_city": "Syracuse",
-        "mailing_address_state": "NY",
-        "front": "29",
-        "depth": "111.7",
-        "full_market_value": "9760"
+        "mailing_address_state": "NY"
     }
-    model = NYPropertyAssessment(**data)
+    model = NYPropertyAssessment.model_construct(**data)
     assert not model.is_owner_occupied()
 
 
-def test_is_owner_occupied_with_normalization():
+def test_is_owner_occupied_with_normalization(coerced_nypa_data):
     data = {
-        "roll_year": "2024",
-        "county_name": "Onondaga",
-        "municipality_code": "311500",
+        **coerced_nypa_data,
         "municipality_name": "Syracuse ",  # Trailing space in municipality_name
-        "school_district_code": "311500",
-        "school_district_name": "Syracuse",
-        "swis_code": "311500",
-        "property_class": "311",
-        "property_class_description": "Residential Vacant Land",
-        "print_key_code": "001.1-01-21.0",
         "parcel_address_number": "833 ",
         "parcel_address_street": "hIawatha",  # Mixed case
         "parcel_address_suff": " BLVD",  # Leading/trailing space & case difference
@@ -421,12 +287,9 @@ def test_is_owner_occupied_with_normalization():
         "mailing_address_street": "Hiawatha",
         "mailing_address_suff": "Blvd",
         "mailing_address_city": "syracuse",
-        "mailing_address_state": "ny",
-        "front": "29",
-        "depth": "111.7",
-        "full_market_value": "9760"
+        "mailing_address_state": "ny"
     }
-    model = NYPropertyAssessment(**data)
+    model = NYPropertyAssessment.model_construct(**data)
     assert model.is_owner_occupied()
 
 
@@ -458,6 +321,10 @@ def test_to_properties_row_with_full_and_partial_addresses():
     properties_row_full = model_full.to_properties_row()
     assert properties_row_full["address_zip"] == "13000"
 
+    # Owner-occupied with an empty mailing zipcode is stored as NULL
+    model_empty_zip = NYPropertyAssessment(**{**data_full, "mailing_address_zip": ""})
+    assert model_empty_zip.to_properties_row()["address_zip"] is None
+
     # Missing mailing address fields, not owner-occupied
     data_partial = {
         "roll_year": "2024",
@@ -516,8 +383,7 @@ def test_is_owner_occupied_mixed_cities():
     assert properties_row["address_zip"] is None
 
     # Fix the mismatch
-    data["mailing_address_city"] = "Syracuse"
-    model = NYPropertyAssessment(**data)
+    model = NYPropertyAssessment(**{**data, "mailing_address_city": "Syracuse"})
     assert model.is_owner_occupied()
     properties_row = model.to_properties_row()
     assert properties_row["address_zip"] == "13208"
@@ -1,33 +1,48 @@
+from types import MappingProxyType
+from typing import NamedTuple
+from unittest.mock import DEFAULT
 from unittest.mock import MagicMock
+from unittest.mock import call
 from unittest.mock import patch
 
 import pytest
 import requests
 from pydantic import ValidationError
 
+from etl.constants import CNY_COUNTY_LIST
+from etl.constants import CNY_COUNTY_SET
 from etl.zillow_datasets import zillow_zhvi_sfh
 from etl.zillow_datasets.zillow_zhvi_sfh import get_current_download_url
+from etl.zillow_datasets.zillow_zhvi_sfh import get_date_columns
 from etl.zillow_datasets.zillow_zhvi_sfh import get_free_zillow_zhvi_sfh
 from etl.zillow_datasets.zillow_zhvi_sfh import is_cny_county
+from etl.zillow_datasets.zillow_zhvi_sfh import is_cny_csv_row
 from etl.zillow_datasets.zillow_zhvi_sfh import parse_csv_row_into_valid_location_for_db
 from etl.zillow_datasets.zillow_zhvi_sfh import prepare_db_records
 
 
+class MockSession(NamedTuple):
+    session: MagicMock
+    response: MagicMock
+
+
 @pytest.fixture
 def mock_session():
     """Create a mock session object for testing HTTP requests."""
     mock_session = MagicMock()
     mock_response = MagicMock()
     mock_session.get.return_value = mock_response
+    # Support the response being used as a context manager when streamed
+    mock_response.__enter__.return_value = mock_response
     mock_response.ok = True
     mock_response.status_code = 200
-    return mock_session, mock_response
+    return MockSession(mock_session, mock_response)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def valid_city_row():
     """Return a valid city row from CSV data."""
-    return {
+    return MappingProxyType({
         "RegionID": "1234",
         "RegionName": "Syracuse",
         "RegionType": "City",
@@ -40,7 +55,22 @@ def valid_city_row():
         "2020-02-01": "151000",
         "2020-03-01": "",
         "NotADate": "something"
-    }
+    })
+
+
+@pytest.fixture
+def valid_city_csv_rows(valid_city_row):
+    """Return the valid city row as read from the CSV data, a header list and a values list."""
+    return list(valid_city_row), list(valid_city_row.values())
+
+
+@pytest.fixture
+def mock_soup():
+    """Patch BeautifulSoup and return the mock soup it builds from the data page."""
+    with patch('etl.zillow_datasets.zillow_zhvi_sfh.BeautifulSoup') as mock_bs:
+        mock_soup = MagicMock()
+        mock_bs.return_value = mock_soup
+        yield mock_soup
 
 
 class TestGetCurrentDownloadUrl:
@@ -59,7 +89,7 @@ class TestGetCurrentDownloadUrl:
         mock_response.content = html_content.encode('utf-8')
 
         # Mock BeautifulSoup parsing
-        with patch('etl.zillow_datasets.zillow_zhvi_sfh.BeautifulSoup', autospec=True) as mock_bs:
+        with patch('etl.zillow_datasets.zillow_zhvi_sfh.BeautifulSoup') as mock_bs:
             mock_soup = MagicMock()
             mock_bs.return_value = mock_soup
 
@@ -79,109 +109,57 @@ class TestGetCurrentDownloadUrl:
             # Verify the result matches the expected URL
             assert result == "https://example.com/data.csv"
             mock_session.get.assert_called_once()
-
-    def test_missing_dropdown(self, mock_session):
-        """Test when the dropdown element is not found."""
-        mock_session, mock_response = mock_session
-        mock_response.content = "<html><body>No dropdown here</body></html>".encode('utf-8')
-
-        with patch('etl.zillow_datasets.zillow_zhvi_sfh.BeautifulSoup', autospec=True) as mock_bs:
-            mock_soup = MagicMock()
-            mock_bs.return_value = mock_soup
-            mock_soup.find.return_value = None  # No dropdown found
-
-            result = get_current_download_url(session=mock_session)
-
-            assert result is None
-            mock_session.get.assert_called_once()
-
-    def test_city_option_not_found(self, mock_session):
-        """Test when the City option is not found in the dropdown."""
+            mock_bs.assert_called_once_with(
+                mock_response.content,
+                'html.parser',
+                from_encoding="utf-8",
+                parse_only=zillow_zhvi_sfh.zillow_zhvi_dropdown_strainer)
+
+    @pytest.mark.parametrize("scenario, expect_log", [
+        ("missing_dropdown", False),
+        ("no_city_option", False),
+        ("invalid_url", True),
+        ("http_403", True),
+        ("requests_exception", True),
+        ("general_exception", True),
+    ])
+    def test_failure_paths(self, scenario, expect_log, mock_session, mock_soup):
+        """Test no download URL is returned when the page, dropdown or City option can't be used."""
         mock_session, mock_response = mock_session
         mock_response.content = "<html><body>Some content</body></html>".encode('utf-8')
 
-        with patch('etl.zillow_datasets.zillow_zhvi_sfh.BeautifulSoup', autospec=True) as mock_bs:
-            mock_soup = MagicMock()
-            mock_bs.return_value = mock_soup
-
-            # Mock the dropdown element
-            mock_dropdown = MagicMock()
-            mock_soup.find.return_value = mock_dropdown
-
-            # Mock options without the City option
-            mock_option = MagicMock()
+        # Dropdown with a single option, each scenario below breaks one step of finding the City URL
+        mock_dropdown = MagicMock()
+        mock_soup.find.return_value = mock_dropdown
+        mock_option = MagicMock()
+        mock_option.text.strip.return_value = 'City'
+        mock_option.has_attr.return_value = True
+        mock_option.__getitem__.return_value = "https://example.com/data.csv"
+        mock_dropdown.find_all.return_value = [mock_option]
+
+        if scenario == "missing_dropdown":
+            mock_soup.find.return_value = None
+        elif scenario == "no_city_option":
             mock_option.text.strip.return_value = 'County'
-            mock_dropdown.find_all.return_value = [mock_option]
-
-            result = get_current_download_url(session=mock_session)
-
-            assert result is None
-            mock_session.get.assert_called_once()
-
-    def test_invalid_url_format(self, mock_session):
-        """Test when the URL doesn't start with https://."""
-        mock_session, mock_response = mock_session
-        mock_response.content = "<html><body>Some content</body></html>".encode('utf-8')
-
-        with patch('etl.zillow_datasets.zillow_zhvi_sfh.BeautifulSoup', autospec=True) as mock_bs:
-            mock_soup = MagicMock()
-            mock_bs.return_value = mock_soup
-
-            # Mock the dropdown element
-            mock_dropdown = MagicMock()
-            mock_soup.find.return_value = mock_dropdown
-
-            # Mock finding the City option with invalid URL
-            mock_option = MagicMock()
-            mock_option.text.strip.return_value = 'City'
-            mock_option.has_attr.return_value = True
+        elif scenario == "invalid_url":
             mock_option.__getitem__.return_value = "invalid-url"
-            mock_dropdown.find_all.return_value = [mock_option]
-
-            with patch('etl.zillow_datasets.zillow_zhvi_sfh.custom_logger') as mock_logger:
-                result = get_current_download_url(session=mock_session)
-
-                assert result is None
-                mock_session.get.assert_called_once()
-                mock_logger.assert_called_once()
-
-    def test_request_failure(self, mock_session):
-        """Test handling when the HTTP request fails."""
-        mock_session, mock_response = mock_session
-        mock_response.ok = False
-        mock_response.status_code = 403
-        mock_response.text = "Forbidden"
-
-        with patch('etl.zillow_datasets.zillow_zhvi_sfh.custom_logger') as mock_logger:
-            result = get_current_download_url(session=mock_session)
-
-            assert result is None
-            mock_session.get.assert_called_once()
-            mock_logger.assert_called_once()
-
-    def test_request_exception(self, mock_session):
-        """Test handling of request exceptions."""
-        mock_session, _ = mock_session
-        mock_session.get.side_effect = requests.RequestException("Connection error")
+        elif scenario == "http_403":
+            mock_response.ok = False
+            mock_response.status_code = 403
+            mock_response.text = "Forbidden"
+        elif scenario == "requests_exception":
+            mock_session.get.side_effect = requests.RequestException("Connection error")
+        elif scenario == "general_exception":
+            mock_session.get.side_effect = Exception("Unexpected error")
 
         with patch('etl.zillow_datasets.zillow_zhvi_sfh.custom_logger') as mock_logger:
             result = get_current_download_url(session=mock_session)
 
             assert result is None
             mock_session.get.assert_called_once()
-            mock_logger.assert_called_once()
-
-    def test_general_exception(self, mock_session):
-        """Test handling of general exceptions."""
-        mock_session, _ = mock_session
-        mock_session.get.side_effect = Exception("Unexpected error")
 
-        with patch('etl.zillow_datasets.zillow_zhvi_sfh.custom_logger') as mock_logger:
-            result = get_current_download_url(session=mock_session)
-
-            assert result is None
-            mock_session.get.assert_called_once()
-            mock_logger.assert_called_once()
+            if expect_log:
+                mock_logger.assert_called_once()
 
 
 class TestParseCSVRowIntoValidLocationForDB:
@@ -229,11 +207,32 @@ class TestParseCSVRowIntoValidLocationForDB:
             assert mock_logger.call_count >= 2
 
 
+class TestIsCNYCsvRow:
+
+    def test_cny_row(self, valid_city_row):
+        """Test a raw row in a CNY county and NY state passes."""
+        assert is_cny_csv_row(valid_city_row) is True
+
+    @pytest.mark.parametrize("location_row", [
+        {"CountyName": "Erie County", "State": "NY"},
+        {"CountyName": "Onondaga County", "State": "PA"},
+        {"RegionName": "Syracuse"},
+    ])
+    def test_non_cny_row(self, location_row):
+        """Test a raw row in another county or state, or missing either, is skipped."""
+        assert is_cny_csv_row(location_row) is False
+
+
 class TestIsCNYCounty:
 
+    def test_cny_county_set_matches_list(self):
+        """Test membership is checked against a frozenset of the same counties fetched in order from the list."""
+        assert isinstance(CNY_COUNTY_SET, frozenset)
+        assert CNY_COUNTY_SET == set(CNY_COUNTY_LIST)
+
     def test_valid_cny_county(self, monkeypatch):
         """Test with a valid CNY county and NY state."""
-        monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.CNY_COUNTY_LIST", ['Onondaga'])
+        monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.CNY_COUNTY_SET", frozenset({'Onondaga'}))
         monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.ALL_PROPERTIES_STATE", 'NY')
         location = {
             "municipality_name": "Syracuse",
@@ -247,7 +246,7 @@ class TestIsCNYCounty:
 
     def test_invalid_county(self, monkeypatch):
         """Test with a non-CNY county."""
-        monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.CNY_COUNTY_LIST", ['Madison'])
+        monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.CNY_COUNTY_SET", frozenset({'Madison'}))
         monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.ALL_PROPERTIES_STATE", 'NY')
         location = {
             "municipality_name": "New York",
@@ -261,7 +260,7 @@ class TestIsCNYCounty:
 
     def test_invalid_state(self, monkeypatch):
         """Test with a valid county but invalid state."""
-        monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.CNY_COUNTY_LIST", ['Onondaga'])
+        monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.CNY_COUNTY_SET", frozenset({'Onondaga'}))
         monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.ALL_PROPERTIES_STATE", 'NY')
         location = {
             "municipality_name": "Syracuse",
@@ -274,17 +273,35 @@ class TestIsCNYCounty:
         assert result is False
 
 
+class TestGetDateColumns:
+
+    def test_date_columns_found(self, valid_city_csv_rows):
+        """Test only date headings are returned, with their column index and date as YYYY-MM."""
+        csv_header, _ = valid_city_csv_rows
+
+        result = get_date_columns(csv_header)
+
+        assert result == [(8, "2020-01"), (9, "2020-02"), (10, "2020-03")]
+
+    def test_invalid_date_format_skipped(self):
+        """Test headings not in YYYY-MM-DD format are skipped."""
+        result = get_date_columns(["01/01/2020", " 2020-02-01 ", "2020-13-01", "NotADate"])
+
+        assert result == [(1, "2020-02")]
+
+
 class TestPrepareDBRecords:
 
-    def test_prepare_valid_records(self, valid_city_row):
+    def test_prepare_valid_records(self, valid_city_csv_rows):
         """Test preparation of valid database records."""
+        csv_header, csv_row = valid_city_csv_rows
         location = {
             "municipality_name": "Syracuse",
             "county_name": "Onondaga",
             "state": "NY"
         }
 
-        result = prepare_db_records(valid_city_row, location)
+        result = prepare_db_records(csv_row, location, get_date_columns(csv_header))
 
         # Should create two records for the two dates with values
         assert len(result) == 2
@@ -307,13 +324,21 @@ class TestPrepareDBRecords:
             151000.0
         )
 
+    def test_month_keys_shared_across_rows(self):
+        """Test every row's records reuse the month strings of the parsed header rather than new copies."""
+        date_columns = get_date_columns(["RegionName", "2020-01-01"])
+        syracuse = {"municipality_name": "Syracuse", "county_name": "Onondaga", "state": "NY"}
+        salina = {"municipality_name": "Salina", "county_name": "Onondaga", "state": "NY"}
+
+        syracuse_records = prepare_db_records(["Syracuse", "150000"], syracuse, date_columns)
+        salina_records = prepare_db_records(["Salina", "151000"], salina, date_columns)
+
+        assert syracuse_records[0][3] is salina_records[0][3] is date_columns[0][1]
+
     def test_prepare_records_empty_value(self):
         """Test with a date that has an empty value."""
-        csv_row = {
-            "2020-01-01": "",  # Empty value
-            "2020-02-01": "150000",
-            "NotADate": "something"
-        }
+        csv_header = ["2020-01-01", "2020-02-01", "NotADate"]
+        csv_row = ["", "150000", "something"]  # Empty value for first date
 
         location = {
             "municipality_name": "Syracuse",
@@ -321,7 +346,7 @@ class TestPrepareDBRecords:
             "state": "NY"
         }
 
-        result = prepare_db_records(csv_row, location)
+        result = prepare_db_records(csv_row, location, get_date_columns(csv_header))
 
         # Should only create one record for the date with a value
         assert len(result) == 1
@@ -335,10 +360,8 @@ class TestPrepareDBRecords:
 
     def test_prepare_records_no_valid_dates(self):
         """Test with no valid dates in the CSV row."""
-        csv_row = {
-            "NotADate1": "150000",
-            "NotADate2": "something"
-        }
+        csv_header = ["NotADate1", "NotADate2"]
+        csv_row = ["150000", "something"]
 
         location = {
             "municipality_name": "Syracuse",
@@ -346,17 +369,15 @@ class TestPrepareDBRecords:
             "state": "NY"
         }
 
-        result = prepare_db_records(csv_row, location)
+        result = prepare_db_records(csv_row, location, get_date_columns(csv_header))
 
         # Should return an empty list
         assert result == []
 
     def test_prepare_records_invalid_date_format(self):
         """Test with an invalid date format."""
-        csv_row = {
-            "01/01/2020": "150000",  # Wrong format
-            "2020-02-01": "151000",
-        }
+        csv_header = ["01/01/2020", "2020-02-01"]  # First date in wrong format
+        csv_row = ["150000", "151000"]
 
         location = {
             "municipality_name": "Syracuse",
@@ -364,7 +385,7 @@ class TestPrepareDBRecords:
             "state": "NY"
         }
 
-        result = prepare_db_records(csv_row, location)
+        result = prepare_db_records(csv_row, location, get_date_columns(csv_header))
 
         # Should only process the valid date
         assert len(result) == 1
@@ -377,135 +398,151 @@ class TestPrepareDBRecords:
         )
 
 
+@pytest.fixture
+def zhvi_patches():
+    """Patch everything get_free_zillow_zhvi_sfh calls in one patcher and return the mocks by name."""
+    with patch.multiple(
+            "etl.zillow_datasets.zillow_zhvi_sfh",
+            get_current_download_url=DEFAULT,
+            csv=DEFAULT,
+            TextIOWrapper=DEFAULT,
+            insert_or_replace_into_database=DEFAULT,
+            parse_csv_row_into_valid_location_for_db=DEFAULT,
+            is_cny_county=DEFAULT,
+            prepare_db_records=DEFAULT,
+            custom_logger=DEFAULT) as mocks:
+        mocks["get_current_download_url"].return_value = "https://example.com/data.csv"
+        yield mocks
+
+
 class TestGetFreeZillowZHVISFH:
 
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.get_current_download_url')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.csv.DictReader')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.StringIO')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.insert_or_replace_into_database')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.parse_csv_row_into_valid_location_for_db')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.is_cny_county')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.prepare_db_records')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.custom_logger')
-    def test_successful_data_retrieval(
-            self, mock_logger, mock_prepare_records, mock_is_cny,
-            mock_parse_row, mock_db_insert, mock_stringio,
-            mock_dict_reader, mock_get_url, mock_session
-    ):
+    def test_successful_data_retrieval(self, zhvi_patches, mock_session):
         """Test successful retrieval and processing of data."""
         mock_session, mock_response = mock_session
-        mock_get_url.return_value = "https://example.com/data.csv"
-        mock_response.text = "sample,csv,data"
-        mock_csv_rows = [{"row1": "data1"}, {"row2": "data2"}]
-        mock_reader = MagicMock()
-        mock_dict_reader.return_value = mock_reader
-        mock_reader.__iter__.return_value = iter(mock_csv_rows)
+        zhvi_patches["csv"].reader.return_value = iter([
+            ["RegionName", "State", "CountyName", "2020-01-01"],
+            ["Syracuse", "NY", "Onondaga County", "150000"],
+            [],  # Blank line is skipped
+            ["Salina", "NY", "Onondaga County", "151000"],
+            ["Buffalo", "NY", "Erie County", "152000"],  # Skipped before validation
+        ])
         valid_location = {
             "municipality_name": "Syracuse",
             "county_name": "Onondaga",
             "state": "NY"
         }
-        mock_parse_row.return_value = valid_location
-        mock_is_cny.return_value = True
-        mock_prepare_records.return_value = [("Syracuse", "Onondaga", "NY", "2020-01", 150000.0)]
-        mock_db_insert.return_value = (1, 0)
+        zhvi_patches["parse_csv_row_into_valid_location_for_db"].return_value = valid_location
+        zhvi_patches["is_cny_county"].return_value = True
+        zhvi_patches["prepare_db_records"].return_value = [("Syracuse", "Onondaga", "NY", "2020-01", 150000.0)]
+        zhvi_patches["insert_or_replace_into_database"].return_value = (1, 0)
 
         get_free_zillow_zhvi_sfh(mock_session)
 
-        mock_get_url.assert_called_once()
-        mock_session.get.assert_called_once_with("https://example.com/data.csv")
-        mock_dict_reader.assert_called_once()
-        assert mock_parse_row.call_count == 2
-        assert mock_is_cny.call_count == 2
-        assert mock_prepare_records.call_count == 2
-        assert mock_db_insert.call_count == 2
-        mock_logger.assert_called()
-
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.get_current_download_url')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.custom_logger')
-    def test_no_download_url(self, mock_logger, mock_get_url, mock_session):
+        zhvi_patches["get_current_download_url"].assert_called_once()
+        mock_session.get.assert_called_once_with(
+            "https://example.com/data.csv", stream=True, timeout=zillow_zhvi_sfh.TIMEOUT_SECONDS)
+        # Raw stream is decoded as utf-8 with newlines left for csv to handle
+        assert mock_response.raw.decode_content is True
+        zhvi_patches["TextIOWrapper"].assert_called_once_with(mock_response.raw, encoding="utf-8", newline="")
+        zhvi_patches["csv"].reader.assert_called_once_with(zhvi_patches["TextIOWrapper"].return_value)
+        # Only the location columns are validated, dates are read by position
+        assert zhvi_patches["parse_csv_row_into_valid_location_for_db"].call_args_list == [
+            call({"RegionName": "Syracuse", "State": "NY", "CountyName": "Onondaga County"}),
+            call({"RegionName": "Salina", "State": "NY", "CountyName": "Onondaga County"}),
+        ]
+        assert zhvi_patches["is_cny_county"].call_count == 2
+        assert zhvi_patches["prepare_db_records"].call_args_list == [
+            call(["Syracuse", "NY", "Onondaga County", "150000"], valid_location, [(3, "2020-01")]),
+            call(["Salina", "NY", "Onondaga County", "151000"], valid_location, [(3, "2020-01")]),
+        ]
+        # Records of both rows are inserted together in one call
+        zhvi_patches["insert_or_replace_into_database"].assert_called_once_with(
+            table_name="zillow_home_value_index_sfh",
+            column_names=["municipality_name", "county_name", "state", "date", "home_value_index"],
+            data=[
+                ("Syracuse", "Onondaga", "NY", "2020-01", 150000.0),
+                ("Syracuse", "Onondaga", "NY", "2020-01", 150000.0),
+            ]
+        )
+        zhvi_patches["custom_logger"].assert_called()
+
+    def test_records_inserted_when_batch_full(self, zhvi_patches, mock_session, monkeypatch):
+        """Test records are inserted each time the batch fills, with the remainder inserted after the last row."""
+        monkeypatch.setattr("etl.zillow_datasets.zillow_zhvi_sfh.ZILLOW_ZHVI_RECORDS_PER_INSERT", 2)
+        zhvi_patches["csv"].reader.return_value = iter([
+            ["RegionName", "State", "CountyName", "2020-01-01"],
+            ["Syracuse", "NY", "Onondaga County", "150000"],
+            ["Salina", "NY", "Onondaga County", "151000"],
+            ["Dewitt", "NY", "Onondaga County", "152000"],
+        ])
+        zhvi_patches["parse_csv_row_into_valid_location_for_db"].return_value = {
+            "municipality_name": "Syracuse",
+            "county_name": "Onondaga",
+            "state": "NY"
+        }
+        zhvi_patches["is_cny_county"].return_value = True
+        zhvi_patches["prepare_db_records"].side_effect = [[("first",)], [("second",)], [("third",)]]
+        zhvi_patches["insert_or_replace_into_database"].return_value = (2, 0)
+
+        get_free_zillow_zhvi_sfh(mock_session.session)
+
+        assert [
+            db_call.kwargs["data"] for db_call in zhvi_patches["insert_or_replace_into_database"].call_args_list
+        ] == [
+            [("first",), ("second",)],
+            [("third",)],
+        ]
+
+    def test_no_download_url(self, zhvi_patches, mock_session):
         """Test handling when no download URL is found."""
-        mock_get_url.return_value = None
-        get_free_zillow_zhvi_sfh(mock_session[0])
+        zhvi_patches["get_current_download_url"].return_value = None
+        get_free_zillow_zhvi_sfh(mock_session.session)
 
-        mock_get_url.assert_called_once()
-        mock_session[0].get.assert_not_called()
-        mock_logger.assert_called_once()
+        zhvi_patches["get_current_download_url"].assert_called_once()
+        mock_session.session.get.assert_not_called()
+        zhvi_patches["custom_logger"].assert_called_once()
 
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.get_current_download_url')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.custom_logger')
-    def test_download_failure(self, mock_logger, mock_get_url, mock_session):
+    def test_download_failure(self, zhvi_patches, mock_session):
         """Test handling when the download fails."""
         mock_session, mock_response = mock_session
-        mock_get_url.return_value = "https://example.com/data.csv"
         mock_response.ok = False
         mock_response.status_code = 404
         mock_response.text = "Not Found"
 
         get_free_zillow_zhvi_sfh(mock_session)
 
-        mock_get_url.assert_called_once()
+        zhvi_patches["get_current_download_url"].assert_called_once()
         mock_session.get.assert_called_once()
-        assert mock_logger.call_count >= 2
-
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.get_current_download_url')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.csv.DictReader')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.StringIO')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.parse_csv_row_into_valid_location_for_db')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.is_cny_county')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.custom_logger')
-    def test_non_cny_county_skipped(
-            self, mock_logger, mock_is_cny, mock_parse_row,
-            mock_stringio, mock_dict_reader, mock_get_url,
-            mock_session
-    ):
-        """Test that non-CNY counties are skipped."""
-        mock_session, mock_response = mock_session
-        mock_get_url.return_value = "https://example.com/data.csv"
-        mock_response.text = "sample,csv,data"
-        mock_csv_rows = [{"row1": "data1"}]
-        mock_reader = MagicMock()
-        mock_dict_reader.return_value = mock_reader
-        mock_reader.__iter__.return_value = iter(mock_csv_rows)
+        zhvi_patches["csv"].reader.assert_not_called()
+        assert zhvi_patches["custom_logger"].call_count >= 2
 
-        # Mock row validation
-        valid_location = {
-            "municipality_name": "New York",
-            "county_name": "New York",
-            "state": "NY"
-        }
-        mock_parse_row.return_value = valid_location
-        mock_is_cny.return_value = False
+    def test_non_cny_county_skipped(self, zhvi_patches, mock_session):
+        """Test that non-CNY counties are skipped."""
+        mock_session, _ = mock_session
+        zhvi_patches["csv"].reader.return_value = iter([
+            ["RegionName", "State", "CountyName", "2020-01-01"],
+            ["New York", "NY", "New York County", "150000"],
+        ])
 
         get_free_zillow_zhvi_sfh(mock_session)
 
-        mock_get_url.assert_called_once()
+        zhvi_patches["get_current_download_url"].assert_called_once()
         mock_session.get.assert_called_once()
-        mock_dict_reader.assert_called_once()
-        mock_parse_row.assert_called_once()
-        mock_is_cny.assert_called_once()
-        mock_logger.assert_called()
-
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.get_current_download_url')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.csv.DictReader')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.StringIO')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.parse_csv_row_into_valid_location_for_db')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.is_cny_county')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.prepare_db_records')
-    @patch('etl.zillow_datasets.zillow_zhvi_sfh.custom_logger')
-    def test_no_records_to_store(
-            self, mock_logger, mock_prepare_records, mock_is_cny,
-            mock_parse_row, mock_stringio, mock_dict_reader,
-            mock_get_url, mock_session
-    ):
+        zhvi_patches["csv"].reader.assert_called_once()
+        # Raw county is not CNY so the row is never validated
+        zhvi_patches["parse_csv_row_into_valid_location_for_db"].assert_not_called()
+        zhvi_patches["is_cny_county"].assert_not_called()
+        zhvi_patches["prepare_db_records"].assert_not_called()
+        zhvi_patches["custom_logger"].assert_called()
+
+    def test_no_records_to_store(self, zhvi_patches, mock_session):
         """Test handling when there are no records to store."""
-        mock_session, mock_response = mock_session
-        mock_get_url.return_value = "https://example.com/data.csv"
-        mock_response.text = "sample,csv,data"
-        mock_csv_rows = [{"row1": "data1"}]
-        mock_reader = MagicMock()
-        mock_dict_reader.return_value = mock_reader
-        mock_reader.__iter__.return_value = iter(mock_csv_rows)
+        mock_session, _ = mock_session
+        zhvi_patches["csv"].reader.return_value = iter([
+            ["RegionName", "State", "CountyName", "2020-01-01"],
+            ["Syracuse", "NY", "Onondaga County", "150000"],
+        ])
 
         # Mock row validation
         valid_location = {
@@ -513,16 +550,17 @@ class TestGetFreeZillowZHVISFH:
             "county_name": "Onondaga",
             "state": "NY"
         }
-        mock_parse_row.return_value = valid_location
-        mock_is_cny.return_value = True
-        mock_prepare_records.return_value = []
+        zhvi_patches["parse_csv_row_into_valid_location_for_db"].return_value = valid_location
+        zhvi_patches["is_cny_county"].return_value = True
+        zhvi_patches["prepare_db_records"].return_value = []
 
         get_free_zillow_zhvi_sfh(mock_session)
 
-        mock_get_url.assert_called_once()
+        zhvi_patches["get_current_download_url"].assert_called_once()
         mock_session.get.assert_called_once()
-        mock_dict_reader.assert_called_once()
-        mock_parse_row.assert_called_once()
-        mock_is_cny.assert_called_once()
-        mock_prepare_records.assert_called_once()
-        mock_logger.assert_called()
+        zhvi_patches["csv"].reader.assert_called_once()
+        zhvi_patches["parse_csv_row_into_valid_location_for_db"].assert_called_once()
+        zhvi_patches["is_cny_county"].assert_called_once()
+        zhvi_patches["prepare_db_records"].assert_called_once()
+        zhvi_patches["insert_or_replace_into_database"].assert_not_called()
+        zhvi_patches["custom_logger"].assert_called()